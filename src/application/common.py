@@ -1,3 +1,4 @@
+import os
 from platform import platform
 
 from src.sources import PLUGINS
@@ -39,6 +40,28 @@ SUPPORTED_DOCUMENTS = {".docx", ".pdf", ".txt"}
 SKIP_DECODING = [".txt"]  # assume txt file contains standard charset
 RESULTS_FORMAT = ".txt"
 GRAPH_FORMAT = ".ttl"
+QUADS_FORMAT = ".nq"  # graph with per document named graphs (provenance)
+CORPUS_GRAPH = "corpus"
+BINARY_RESULTS_FORMAT = ".tdr"  # packed information extraction results
+RESULTS_DATABASE = "results.sqlite"  # single file results store
+
+STAGING = enum(
+    AUTO="auto", HARDLINK="hardlink", REFLINK="reflink", SYMLINK="symlink", COPY="copy"
+)
+STAGING_CHOICES = [
+    STAGING.AUTO,
+    STAGING.HARDLINK,
+    STAGING.REFLINK,
+    STAGING.SYMLINK,
+    STAGING.COPY,
+]
+
+RESULTS_FORMATS = enum(TEXT="text", BINARY="binary", SQLITE="sqlite")
+RESULTS_FORMATS_CHOICES = [
+    RESULTS_FORMATS.TEXT,
+    RESULTS_FORMATS.BINARY,
+    RESULTS_FORMATS.SQLITE,
+]
 
 PLUGIN_DEFAULT_PATH = PLUGINS.joinpath("default_plugin.py")
 
@@ -116,6 +139,14 @@ class Environment:
         self.in_memory_file_limit = int(env.get("IN_MEMORY_FILE_SIZE", 1024 * 1024))
         self.spacy_model = env.get("MODEL", "en_core_web_lg")
         self.processing_unit = computation_platform(int(env.get("USE_CUDA", 0)))
+        self.corenlp_timeout = float(env.get("CORENLP_TIMEOUT", 2.0))
+        self.nlp_workers = int(env.get("NLP_WORKERS", os.cpu_count() or 1))
+        self.svo_processes = int(env.get("SVO_PROCESSES", 2))
+        self.decode_workers = int(env.get("DECODE_WORKERS", os.cpu_count() or 1))
+        self.upload_batch_size = int(env.get("UPLOAD_BATCH_SIZE", 50_000))
+        self.upload_workers = int(env.get("UPLOAD_WORKERS", 4))
+        self.upload_retries = int(env.get("UPLOAD_RETRIES", 3))
+        self.bulk_shard_size = int(env.get("BULK_SHARD_SIZE", 1_000_000))
         self.os = get_current_os()
 
     @staticmethod
@@ -124,7 +155,29 @@ class Environment:
 
     def to_info_string(self):
         return (
-            "os: {}, " + "in_memory_file_limit: {}, " + "model: {}, " + "running on: {}"
+            "os: {}, "
+            + "in_memory_file_limit: {}, "
+            + "model: {}, "
+            + "running on: {}, "
+            + "corenlp_timeout: {}s, "
+            + "nlp_workers: {}, "
+            + "svo_processes: {}, "
+            + "decode_workers: {}, "
+            + "upload_batch_size: {}, "
+            + "upload_workers: {}, "
+            + "upload_retries: {}, "
+            + "bulk_shard_size: {}"
         ).format(
-            self.os, self.in_memory_file_limit, self.spacy_model, self.processing_unit
+            self.os,
+            self.in_memory_file_limit,
+            self.spacy_model,
+            self.processing_unit,
+            self.corenlp_timeout,
+            self.nlp_workers,
+            self.svo_processes,
+            self.decode_workers,
+            self.upload_batch_size,
+            self.upload_workers,
+            self.upload_retries,
+            self.bulk_shard_size,
         )
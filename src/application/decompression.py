@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import dataclasses
 import os.path
 import pathlib
 import shutil
 import tarfile
+import threading
+import typing
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+COPY_BUFFER_SIZE = 1024 * 1024
 
 
 class DecompressionError(Exception):
@@ -15,62 +21,300 @@ class NotSupportedArchiveFormat(Exception):
     pass
 
 
-def decompress(source: pathlib.Path, destination: pathlib.Path) -> None:
+@dataclasses.dataclass
+class ArchiveMember:
+    name: str  # path inside archive
+    size: int  # uncompressed size in bytes
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.name)
+
+    @property
+    def suffix(self) -> str:
+        return pathlib.PurePath(self.name).suffix.lower()
+
+
+def scan(source: pathlib.Path) -> typing.List[ArchiveMember]:
+    """
+    List archive files without extracting them
+    Args:
+        source (pathlib.Path): file path to archive
+    Returns:
+        archive members (directories are skipped)
+    Raises:
+        DecompressionError: If archive is corrupted or interrupted
+        NotSupportedArchiveFormat: If provided archive is compressed using unsupported format
+    """
+    if zipfile.is_zipfile(source):
+        try:
+            with zipfile.ZipFile(source) as zip_fd:
+                return [
+                    ArchiveMember(zip_info.filename, zip_info.file_size)
+                    for zip_info in zip_fd.infolist()
+                    if not zip_info.is_dir()
+                ]
+        except zipfile.BadZipFile as e:
+            raise DecompressionError(str(e))
+    if tarfile.is_tarfile(source):
+        try:
+            with tarfile.open(source, "r|*") as tar_fd:
+                return [member for member, _ in _tar_members(tar_fd)]
+        except tarfile.TarError as e:
+            raise DecompressionError(str(e))
+    raise NotSupportedArchiveFormat(f"{source.suffix} archive not supported.")
+
+
+def last_per_filename(
+    members: typing.Iterable[ArchiveMember],
+) -> typing.List[ArchiveMember]:
+    """
+    Members are extracted flattened to file name, of members with the same file name in
+    different folders only the last one in archive order is kept (last extracted wins)
+    Args:
+        members: archive members in archive order
+    Returns:
+        members with unique file names in archive order
+    """
+    last = {member.filename: member for member in members}
+    return [member for member in members if last[member.filename] is member]
+
+
+def select(
+    members: typing.Iterable[ArchiveMember], suffixes: typing.Iterable[str] = None
+) -> typing.List[ArchiveMember]:
+    """
+    Args:
+        members: archive members
+        suffixes: accepted file formats e.g. SUPPORTED_DOCUMENTS, None accepts all files
+    Returns:
+        accepted members, largest first to balance work of next stages
+    """
+    suffixes = None if suffixes is None else set(suffixes)
+    return sorted(
+        (m for m in members if suffixes is None or m.suffix in suffixes),
+        key=lambda m: m.size,
+        reverse=True,
+    )
+
+
+def decompress(
+    source: pathlib.Path,
+    destination: pathlib.Path,
+    suffixes: typing.Iterable[str] = None,
+    workers: int = 1,
+) -> typing.List[ArchiveMember]:
     """
     Args:
         source (pathlib.Path): file path to archive
         destination (pathlib.Path): file path to output to directory
+        suffixes: extract only files of given formats, None extracts all files
+        workers: number of threads extracting zip archive members
     Returns:
-        None
+        extracted members, largest first
     Raises:
         DecompressionError: If archive is corrupted or interrupted
         NotSupportedArchiveFormat: If provided archive is compressed using unsupported format
     """
     if zipfile.is_zipfile(source):
-        zip_decompression(source, destination)
+        # parallel threads never write the same file
+        members = select(last_per_filename(scan(source)), suffixes)
+        zip_decompression(source, destination, members, workers)
     elif tarfile.is_tarfile(source):
-        tar_decompression(source, destination)
+        members = select(
+            last_per_filename(tar_decompression(source, destination, suffixes))
+        )
     else:
         raise NotSupportedArchiveFormat(f"{source.suffix} archive not supported.")
+    return members
+
+
+def zip_decompression(
+    source: pathlib.Path,
+    destination: pathlib.Path,
+    members: typing.List[ArchiveMember] = None,
+    workers: int = 1,
+) -> None:
+    """
+    Extract zip members in parallel, zip supports random access so each thread reads
+    members using its own archive handle. Members must have unique file names, see
+    last_per_filename.
+    """
+    if members is None:
+        members = select(last_per_filename(scan(source)))
+    local = threading.local()
+    handles = list()
+    lock = threading.Lock()
 
+    def extract(member: ArchiveMember) -> None:
+        zip_fd = getattr(local, "zip_fd", None)
+        if zip_fd is None:
+            zip_fd = local.zip_fd = zipfile.ZipFile(source)
+            with lock:
+                handles.append(zip_fd)
+        with zip_fd.open(member.name) as src, open(
+            destination.joinpath(member.filename), "wb"
+        ) as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
 
-def zip_decompression(source: pathlib.Path, destination: pathlib.Path):
     try:
-        with zipfile.ZipFile(source) as zip_fd:
-            for zip_info in zip_fd.infolist():
-                if zip_info.is_dir():
-                    continue
-                zip_info.filename = os.path.basename(zip_info.filename)
-                zip_fd.extract(zip_info, destination)
-            return
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            list(executor.map(extract, members))
     except zipfile.BadZipFile as e:
         raise DecompressionError(str(e))
+    finally:
+        for zip_fd in handles:
+            zip_fd.close()
 
 
-def tar_decompression(source: pathlib.Path, destination: pathlib.Path) -> None:
+def _tar_members(
+    tar_fd: tarfile.TarFile, suffixes: typing.Iterable[str] = None
+) -> typing.Iterator[typing.Tuple[ArchiveMember, tarfile.TarInfo]]:
+    suffixes = None if suffixes is None else set(suffixes)
+    for tar_info in tar_fd:
+        member = ArchiveMember(tar_info.name, tar_info.size)
+        if tar_info.isfile() and (suffixes is None or member.suffix in suffixes):
+            yield member, tar_info
+
+
+def tar_decompression(
+    source: pathlib.Path,
+    destination: pathlib.Path,
+    suffixes: typing.Iterable[str] = None,
+) -> typing.List[ArchiveMember]:
+    """
+    Extract tar members in single sequential pass, compressed tar has no random access
+    Returns:
+        extracted members in archive order
+    """
+    extracted = list()
     try:
-        with tarfile.open(source) as tar_fd:
-            for tar_info in tar_fd.getmembers():
-                if tar_info.isdir():
-                    continue
-                tar_info.name = os.path.basename(tar_info.name)
-                tar_fd.extract(tar_info, destination)
-            return
+        with tarfile.open(source, "r|*") as tar_fd:
+            for member, tar_info in _tar_members(tar_fd, suffixes):
+                with open(destination.joinpath(member.filename), "wb") as dst:
+                    shutil.copyfileobj(
+                        tar_fd.extractfile(tar_info), dst, COPY_BUFFER_SIZE
+                    )
+                extracted.append(member)
+        return extracted
     except tarfile.TarError as e:
         raise DecompressionError(str(e))
 
 
-def copydir(source: pathlib.Path, destination: pathlib.Path) -> None:
+def iter_members(
+    source: pathlib.Path,
+    suffixes: typing.Iterable[str] = None,
+) -> typing.Iterator[typing.Tuple[str, typing.IO[bytes]]]:
     """
-    Copy files from source directory to destination dir.
-    If destination dir not exists then create whole tree.
+    Open archive members one by one without extracting them to disk
     Args:
-        source (pathlib.Path): file path to source directory
-        destination (pathlib.Path): file path to output directory
+        source (pathlib.Path): file path to archive
+        suffixes: open only files of given formats, None opens all files
     Returns:
-        None
+        (member file name, binary stream with member content) pairs, stream is valid until next member.
+        Zip members are opened largest first, tar members in archive order.
+    Raises:
+        DecompressionError: If archive is corrupted or interrupted
+        NotSupportedArchiveFormat: If provided archive is compressed using unsupported format
     """
+    if zipfile.is_zipfile(source):
+        members = select(last_per_filename(scan(source)), suffixes)
+        try:
+            with zipfile.ZipFile(source) as zip_fd:
+                for member in members:
+                    with zip_fd.open(member.name) as stream:
+                        yield member.filename, stream
+        except zipfile.BadZipFile as e:
+            raise DecompressionError(str(e))
+    elif tarfile.is_tarfile(source):
+        try:
+            # stream mode, compressed tar is decompressed in single pass
+            with tarfile.open(source, "r|*") as tar_fd:
+                for member, tar_info in _tar_members(tar_fd, suffixes):
+                    yield member.filename, tar_fd.extractfile(tar_info)
+        except tarfile.TarError as e:
+            raise DecompressionError(str(e))
+    else:
+        raise NotSupportedArchiveFormat(f"{source.suffix} archive not supported.")
+
+
+# linux ioctl cloning file extents (copy-on-write) on btrfs, xfs and other reflink capable filesystems
+FICLONE = 0x40049409
+
+
+def reflink(source: pathlib.Path, destination: pathlib.Path) -> None:
+    """
+    Copy-on-write clone of file, data is shared until either file is modified
+    Raises:
+        OSError: filesystem (or operating system) does not support cloning
+    """
+    import fcntl
+
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(destination)
+            raise
+    shutil.copystat(source, destination)
+
+
+STAGING_METHODS = {
+    "hardlink": os.link,
+    "reflink": reflink,
+    "symlink": lambda source, destination: os.symlink(
+        os.path.abspath(source), destination
+    ),
+    "copy": shutil.copy2,
+}
+# cheapest first among methods keeping staged files independent of input files, hardlink
+# and symlink share data with input (in-place write through either path changes both)
+AUTO_STAGING = ["reflink", "copy"]
+
+
+def stage(
+    source: pathlib.Path, destination: pathlib.Path, strategy: str = "auto"
+) -> typing.Dict[str, int]:
+    """
+    Stage input file or directory tree into destination directory without copying data
+    where possible.
+    Args:
+        source (pathlib.Path): file or directory to stage
+        destination (pathlib.Path): output directory
+        strategy: 'hardlink', 'reflink', 'symlink', 'copy' or 'auto' - reflink or copy,
+                  whichever first works (checked per file, unsupported method is not retried)
+    Returns:
+        staging method -> number of staged files
+    Raises:
+        DecompressionError: file cannot be staged using requested strategy
+    """
+    methods = list(AUTO_STAGING) if strategy == "auto" else [strategy]
+    staged = dict()
     if source.is_dir():
-        if not destination.exists():
-            destination.mkdir()
-        shutil.copytree(source, destination, dirs_exist_ok=True)
+        files = list()
+        # symbolic links to directories are followed like in shutil.copytree
+        for root, _, names in os.walk(source, followlinks=True):
+            relative = pathlib.Path(root).relative_to(source)
+            destination.joinpath(relative).mkdir(parents=True, exist_ok=True)
+            files.extend(
+                (pathlib.Path(root, name), destination.joinpath(relative, name))
+                for name in names
+            )
+    else:
+        destination.mkdir(parents=True, exist_ok=True)
+        files = [(source, destination.joinpath(source.name))]
+    for src, dst in files:
+        for method in list(methods):
+            try:
+                STAGING_METHODS[method](src, dst)
+            except OSError as e:
+                if len(methods) == 1:
+                    raise DecompressionError(
+                        f"Unable to stage {src} using {method}. Details: {str(e)}"
+                    ) from e
+                methods.remove(method)
+                continue
+            staged[method] = staged.get(method, 0) + 1
+            break
+    return staged
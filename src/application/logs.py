@@ -2,7 +2,11 @@ import logging
 
 
 def setup_logger(loggername="SKG", filename="execution.log") -> logging.Logger:
-    logger = logging.Logger(loggername)
+    # registered logger, modules falling back to logging.getLogger(name) share handlers
+    logger = logging.getLogger(loggername)
+    if logger.handlers:
+        return logger
+    logger.propagate = False
     logger.setLevel(logging.DEBUG)
     formatter = logging.Formatter(
         "%(asctime)s %(levelname)s:\t%(module)s@%(lineno)s:\t%(message)s"
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import argparse
+import dataclasses
+import itertools
+import json
 import logging
 import os.path
 import pathlib
@@ -8,14 +11,8 @@ import shutil
 import sys
 import traceback
 import typing
+from concurrent.futures import ThreadPoolExecutor
 
-import stardog
-from rdflib import Graph
-
-from src.config.config import Config
-from src.database.stardog_connection import StardogConnection
-from src.knowledge_graph.make_rdf_triples import convert_to_rdf, make_turtle_syntax
-from src.nlp.nlp_job_runner import NLPJobRunner
 from src.application import common, decompression, logs
 from src.application.common import (
     STEPS_CHOICES,
@@ -27,9 +24,17 @@ from src.application.common import (
     PLUGIN_DEFAULT_PATH,
     PIPELINE_CHOICES,
     GRAPH_FORMAT,
+    QUADS_FORMAT,
+    CORPUS_GRAPH,
+    BINARY_RESULTS_FORMAT,
+    RESULTS_FORMATS,
+    RESULTS_FORMATS_CHOICES,
+    RESULTS_DATABASE,
+    STAGING,
+    STAGING_CHOICES,
 )
 from src.application.decompression import DecompressionError, NotSupportedArchiveFormat
-from src.application.plugin_executor import execute_plugin
+from src.application.plugin_executor import execute_plugin, execute_plugin_stream
 from src.application.file_manager import files_in_dir
 
 
@@ -45,6 +50,8 @@ Exit codes:
 Environment variables:
     IN_MEMORY_FILE_SIZE : Maximum file size that can be loaded into program memory in bytes.
                           If file size is greater than resource limit then content is broken down into smaller pieces.
+                          Pieces share term ranking and sentence length bounds of whole document, coreference
+                          resolution does not cross pieces boundaries.
                           Default: 1MB
     MODEL               : Language model used for NLP pipeline. For better accuracy 'en_core_web_lg'.
                           For performance 'en_core_web_sm'
@@ -53,6 +60,24 @@ Environment variables:
                           will handle calculations. Requires CUDA configuration, gives much better performance even on
                           large language models.
                           Default: 0
+    CORENLP_TIMEOUT     : Timeout in seconds for CoreNLP server availability check done during NLP toolkit
+                          compilation. If server does not respond in time SPO extraction is skipped.
+                          Default: 2
+    NLP_WORKERS         : Number of workers used to run independent NLP pipeline stages concurrently.
+                          Default: number of CPU cores
+    SVO_PROCESSES       : Number of processes extracting SVO triples from sentences of large documents. Every
+                          process loads its own copy of the language model (several hundred MB for en_core_web_lg).
+                          Default: 2
+    DECODE_WORKERS      : Number of threads extracting zip archive members and decoding documents concurrently.
+                          Default: number of CPU cores
+    UPLOAD_BATCH_SIZE   : Maximum number of graph statements uploaded in single database transaction.
+                          Default: 50000
+    UPLOAD_WORKERS      : Number of concurrent upload transactions.
+                          Default: 4
+    UPLOAD_RETRIES      : Number of retries of failed upload transaction, with exponential backoff.
+                          Default: 3
+    BULK_SHARD_SIZE     : Maximum number of graph statements in single bulk-load shard written by --bulk_export.
+                          Default: 1000000
     STARDOG_ENDPOINT    : Stardog database endpoint URL
     STARDOG_USERNAME    : Stardog database username
     STARDOG_PASSWORD    : Stardog database password
@@ -64,8 +89,24 @@ Examples:
     python skg_app.py --techdoc_path example.zip --output results_dir --only decompress
     Information extraction only, abandon graph serialization
     python skg_app.py --techdoc_path example.zip --only decompress decode information_extraction
+    Decode documents streamed from archive, without extracting them to disk
+    python skg_app.py --techdoc_path example.zip --stream_archive
     TF-IDF analysis only 
     python skg_app.py --techdoc_path docs.pdf --pipeline term_frequencies_inverse_document_frequency
+    Label known entities using terms found in previous runs results
+    python skg_app.py --techdoc_path docs.zip --output new_results --gazetteer results/information
+    Build one deduplicated graph for whole corpus, keep documents provenance in named graphs
+    python skg_app.py --techdoc_path docs.zip --db_name database_name --corpus_graph --provenance
+    Rebuild graphs from results of previous run without NLP re-execution
+    python skg_app.py --techdoc_path results --output new_results --only make_graph
+    Merge entity variants using mapping shared between runs
+    python skg_app.py --techdoc_path docs.zip --canonical_map entities.json --canonical_similarity 0.9
+    Upload graphs while next documents are processed
+    python skg_app.py --techdoc_path docs.zip --db_name database_name --pipelined_upload
+    Nightly refresh, upload only statements changed since previous run
+    python skg_app.py --techdoc_path docs.zip --db_name database_name --incremental_upload index.sqlite
+    Export graphs as compressed shards for bulk database creation
+    python skg_app.py --techdoc_path docs.zip --corpus_graph --bulk_export bulk --only decompress decode information_extraction make_graph
     Provide custom text processing plugin
     python skg_app.py --techdoc_path input_path --plugin custom_plugin.py
     
@@ -100,15 +141,28 @@ def graph_path(results_dir: pathlib.Path, subdir: str | pathlib.Path) -> pathlib
     return graph
 
 
-def make_graph_step(svo, spo):
+def corpus_graph_path(results_dir: pathlib.Path, provenance: bool) -> pathlib.Path:
+    suffix = QUADS_FORMAT if provenance else GRAPH_FORMAT
+    return graph_path(results_dir, subdir=CORPUS_GRAPH).joinpath(CORPUS_GRAPH + suffix)
+
+
+def make_graph_step(svo, spo, destination: pathlib.Path, validate: bool = False):
+    from src.knowledge_graph.rdf_writer import write_graph
+
     triples = list()
     triples.extend(svo)
     triples.extend(spo)
-    rdf_triples = convert_to_rdf(triples)
-    turtle = make_turtle_syntax(rdf_triples)
-    graph = Graph()
-    graph.parse(data=turtle, format="turtle")
-    return graph
+    return write_graph(triples, destination, validate=validate)
+
+
+@dataclasses.dataclass
+class GraphOutputs:
+    """run wide destinations of generated graphs, shared by all documents"""
+
+    corpus: typing.Any = None  # CorpusGraph
+    store: typing.Any = None  # ResultsStore
+    canonicalizer: typing.Any = None  # Canonicalizer
+    uploader: typing.Any = None  # BackgroundUploader
 
 
 def run_app(
@@ -122,36 +176,86 @@ def run_app(
         logger.info(
             f"Decompressing files from {str(techdoc_path)} to {str(extracted)}..."
         )
-        decompression.decompress(techdoc_path, extracted)
+        members = decompression.decompress(
+            techdoc_path,
+            extracted,
+            common.SUPPORTED_DOCUMENTS,
+            workers=environment.decode_workers,
+        )
+        logger.info(f"Extracted {len(members)} supported documents.")
 
     def copy_step() -> None:
         logger.info(f"Nothing to be decompressed.")
-        if techdoc_path.is_dir():
-            decompression.copydir(techdoc_path, extracted_path(output))
-        else:
-            shutil.copy2(techdoc_path, extracted_path(output))
+        staged = decompression.stage(techdoc_path, extracted_path(output), args.staging)
+        logger.info(
+            "Staged input files: "
+            + ", ".join(f"{method}: {count}" for method, count in staged.items())
+        )
+
+    def decode_file(file: pathlib.Path, decoded: pathlib.Path) -> None:
+        try:
+            if file.suffix.lower() in SKIP_DECODING:
+                shutil.copyfile(file, decoded.joinpath(file.name))
+                return
+            logger.info(f"Decoding {file.name}...")
+            execute_plugin(
+                plugin_path,
+                file,
+                decoded.joinpath(file.stem + RESULTS_FORMAT),
+            )
+            logger.info(f"{file} file has been parsed successfully.")
+        except Exception:
+            logger.warning(
+                f"Unable to decode, skipping {file.name} file. Details: {traceback.format_exc()}"
+            )
 
     def decode_step() -> None:
-        for file in files_in_dir(output):
+        files = [pathlib.Path(file) for file in files_in_dir(output)]
+        # largest documents first, workers finish at similar time
+        files.sort(key=lambda file: file.stat().st_size, reverse=True)
+        decoded = decoded_path(output)
+        with ThreadPoolExecutor(max_workers=environment.decode_workers) as executor:
+            list(executor.map(lambda file: decode_file(file, decoded), files))
+
+    def is_archive() -> bool:
+        return (
+            not techdoc_path.is_dir()
+            and techdoc_path.suffix.lower() not in common.SUPPORTED_DOCUMENTS
+        )
+
+    def stream_archive() -> bool:
+        return args.stream_archive and STEPS.DECODE in args.only and is_archive()
+
+    def stream_decode_step() -> None:
+        decoded = decoded_path(output)
+        logger.info(
+            f"Decoding files streamed from {str(techdoc_path)} to {str(decoded)}..."
+        )
+        for name, member in decompression.iter_members(
+            techdoc_path, common.SUPPORTED_DOCUMENTS
+        ):
             try:
-                file = pathlib.Path(file)
-                if file.suffix in SKIP_DECODING:
-                    shutil.copyfile(file, decoded_path(output).joinpath(file.name))
+                if pathlib.Path(name).suffix.lower() in SKIP_DECODING:
+                    with open(decoded.joinpath(name), "wb") as fd:
+                        shutil.copyfileobj(member, fd)
                     continue
-                logger.info(f"Decoding {file.name}...")
-                execute_plugin(
+                logger.info(f"Decoding {name}...")
+                execute_plugin_stream(
                     plugin_path,
-                    file,
-                    decoded_path(output).joinpath(file.stem + RESULTS_FORMAT),
+                    member,
+                    name,
+                    decoded.joinpath(pathlib.Path(name).stem + RESULTS_FORMAT),
                 )
-                logger.info(f"{file} file has been parsed successfully.")
+                logger.info(f"{name} file has been parsed successfully.")
             except Exception:
                 logger.warning(
-                    f"Unable to decode, skipping {file.name} file. Details: {traceback.format_exc()}"
+                    f"Unable to decode, skipping {name} file. Details: {traceback.format_exc()}"
                 )
                 continue
 
     def information_extraction_step():
+        from src.nlp.nlp_job_runner import NLPJobRunner
+
         nlp_analizer = NLPJobRunner(
             logger,
             pipeline=args.pipeline,
@@ -159,73 +263,363 @@ def run_app(
             tfidf_param=args.tfidf,
             compile_on=environment.processing_unit,
             operating_system=environment.os,
+            corenlp_timeout=environment.corenlp_timeout,
+            workers=environment.nlp_workers,
+            gazetteer=args.gazetteer,
+            svo_processes=environment.svo_processes,
         )
-        for file in files_in_dir(decoded_path(output)):
-            with open(file, encoding="utf-8") as fd:
-                text = fd.read()
-            filename = pathlib.Path(file)
-            nlp_dir = nlp_path(output, subdir=filename.stem)
-            logger.info(
-                f"NLP module started. Processing {filename.name} documentation."
+        outputs = open_graph_outputs(nlp_analizer.lang)
+        try:
+            for file in files_in_dir(decoded_path(output)):
+                document_extraction_step(nlp_analizer, pathlib.Path(file), outputs)
+        finally:
+            nlp_analizer.close()
+            close_graph_outputs(outputs)
+
+    def open_graph_outputs(model=None) -> GraphOutputs:
+        return GraphOutputs(
+            corpus=open_corpus_graph(),
+            store=open_results_store(),
+            canonicalizer=open_canonicalizer(model),
+            uploader=open_uploader(),
+        )
+
+    def close_graph_outputs(outputs: GraphOutputs) -> None:
+        close_corpus_graph(outputs.corpus)
+        close_canonicalizer(outputs.canonicalizer)
+        if outputs.store is not None:
+            outputs.store.close()
+        close_uploader(outputs.uploader)
+
+    def pipelined_upload() -> bool:
+        return (
+            args.pipelined_upload
+            and bool(args.db_name)
+            and STEPS.MAKE_GRAPH in args.only
+            and STEPS.UPLOAD_GRAPH in args.only
+            and not args.corpus_graph
+            and not args.incremental_upload
+        )
+
+    def open_uploader():
+        if not pipelined_upload():
+            return None
+        from src.database.upload import BackgroundUploader
+
+        logger.info(f"Uploading graphs to {args.db_name} database in background...")
+        return BackgroundUploader(upload_engine()).start()
+
+    def close_uploader(uploader) -> None:
+        if uploader is None:
+            return
+        from src.database.upload import UploadError
+
+        # called in finally blocks, error is logged not to hide exception in progress
+        try:
+            report_upload(uploader.close())
+        except UploadError as e:
+            logger.error(f"Pipelined upload failed. Details: {str(e)}")
+
+    def load_canonicalizer():
+        if not args.canonical_map or STEPS.MAKE_GRAPH not in args.only:
+            return None
+        from src.nlp.canonicalization import Canonicalizer, SIMILARITY_THRESHOLD
+
+        # loaded before processing starts, invalid map is reported as input error
+        return Canonicalizer.load(
+            args.canonical_map,
+            threshold=args.canonical_similarity or SIMILARITY_THRESHOLD,
+        )
+
+    def open_canonicalizer(model=None):
+        if canonicalizer is None:
+            return None
+        if args.canonical_similarity is not None:
+            from src.nlp.canonicalization import spacy_vectorizer
+
+            if model is None:
+                import spacy
+
+                model = spacy.load(environment.spacy_model)
+            canonicalizer.vectorize = spacy_vectorizer(model)
+        logger.info(f"Canonical entities map loaded: {len(canonicalizer)} known terms")
+        return canonicalizer
+
+    def close_canonicalizer(canonicalizer) -> None:
+        if canonicalizer is None:
+            return
+        canonicalizer.save(args.canonical_map)
+        logger.info(
+            f"Canonical entities map: {len(canonicalizer)} terms mapped onto "
+            f"{len(set(canonicalizer.mapping.values()))} entities, saved to {args.canonical_map}"
+        )
+
+    def open_results_store():
+        if args.results_format != RESULTS_FORMATS.SQLITE:
+            return None
+        from src.database.results_store import ResultsStore
+
+        return ResultsStore(output.joinpath(RESULTS_DATABASE))
+
+    def open_corpus_graph():
+        if not args.corpus_graph or STEPS.MAKE_GRAPH not in args.only:
+            return None
+        from src.knowledge_graph.rdf_writer import CorpusGraph
+
+        destination = corpus_graph_path(output, args.provenance)
+        logger.info(f"Accumulating corpus graph in {destination}")
+        return CorpusGraph(destination, provenance=args.provenance)
+
+    def close_corpus_graph(corpus) -> None:
+        if corpus is None:
+            return
+        corpus.close()
+        logger.info(
+            f"Corpus graph: {corpus.count} unique statements from {corpus.documents} documents."
+        )
+        if args.validate_graph:
+            from src.knowledge_graph.rdf_writer import validate_graph
+
+            try:
+                validate_graph(corpus.destination)
+            except Exception as e:
+                logger.error(f"Corpus graph validation failed. Details: {str(e)}")
+
+    def document_graph_step(name: str, svo, spo, outputs: GraphOutputs) -> None:
+        logger.info("Preparing RDF triples...")
+        try:
+            if outputs.canonicalizer is not None:
+                svo = outputs.canonicalizer.apply(svo)
+                spo = outputs.canonicalizer.apply(spo)
+            if outputs.corpus is not None:
+                outputs.corpus.add_document(name, itertools.chain(svo, spo))
+                return
+            if outputs.store is None and outputs.uploader is None:
+                destination = graph_path(output, subdir=name).joinpath(
+                    f"{name}{GRAPH_FORMAT}"
+                )
+                make_graph_step(svo, spo, destination, validate=args.validate_graph)
+                return
+            from src.knowledge_graph.rdf_writer import (
+                serialize_graph,
+                validate_content,
             )
-            tfidf, spo, svo = nlp_analizer.execute(
-                text,
-                save=nlp_dir.joinpath(f"{filename.stem}.png")
-                if args.visualize
-                else None,
+
+            # serialized once, stored or written and then queued for upload from memory
+            content = serialize_graph(itertools.chain(svo, spo))
+            if args.validate_graph:
+                validate_content(content)
+            if outputs.store is not None:
+                outputs.store.add_graph(name, content, GRAPH_FORMAT)
+            else:
+                graph_path(output, subdir=name).joinpath(
+                    f"{name}{GRAPH_FORMAT}"
+                ).write_text(content, encoding="utf-8")
+        except Exception as e:
+            logger.error(
+                "Failed to generate RDF graph representation. Details: {}".format(
+                    str(e)
+                )
+            )
+            return
+        if outputs.uploader is not None:
+            upload_graph_step(name, content, outputs.uploader)
+
+    def upload_graph_step(name: str, content: str, uploader) -> None:
+        from src.database.upload import UploadError
+
+        try:
+            uploader.put(f"{name}{GRAPH_FORMAT}", content)
+        except UploadError as e:
+            logger.error(
+                f"Failed to upload graph of {name} to {args.db_name} database. Details: {str(e)}"
+            )
+
+    def save_results_step(nlp_dir: pathlib.Path, name: str, tfidf, spo, svo) -> None:
+        if args.results_format == RESULTS_FORMATS.BINARY:
+            from src.nlp.results_io import save_results
+
+            save_results(
+                nlp_dir.joinpath(f"{name}{BINARY_RESULTS_FORMAT}"),
+                tfidf,
+                itertools.chain(svo, spo),
             )
-            if not tfidf and not spo and not svo:
-                logger.error("No information was extracted.")
-                logger.info("App finished with exit code 4")
-                return sys.exit(4)
-            if tfidf:
-                with open(nlp_dir.joinpath(f"{filename.stem}_tfidf.txt"), "w") as fd:
-                    for data in tfidf:
-                        fd.write(f"{data[0]}: {data[1]}\n")
-            if spo:
-                with open(nlp_dir.joinpath(f"{filename.stem}_spo.txt"), "w") as fd:
-                    for triple in spo:
-                        fd.write(
-                            f"{triple.subj};{triple.pred};{triple.obj};{triple.subj_attrs};{triple.obj_attrs};{triple.subj_ner};{triple.obj_ner}\n"
-                        )
-            if svo:
-                with open(nlp_dir.joinpath(f"{filename.stem}_svo.txt"), "w") as fd:
-                    for triple in svo:
-                        fd.write(
-                            f"{triple.subj};{triple.verb};{triple.obj};{triple.subj_ner};{triple.obj_ner}\n"
-                        )
-            if STEPS.MAKE_GRAPH in args.only:
-                logger.info("Preparing RDF triples...")
-                try:
-                    graph_dir = graph_path(output, subdir=filename.stem)
-                    graph = make_graph_step(svo, spo)
-                    graph.serialize(
-                        graph_dir.joinpath(f"{filename.stem}{GRAPH_FORMAT}"),
-                        format="turtle",
+            return
+        if tfidf:
+            with open(nlp_dir.joinpath(f"{name}_tfidf.txt"), "w") as fd:
+                for data in tfidf:
+                    fd.write(f"{data[0]}: {data[1]}\n")
+        if spo:
+            with open(nlp_dir.joinpath(f"{name}_spo.txt"), "w") as fd:
+                for triple in spo:
+                    fd.write(
+                        f"{triple.subj};{triple.pred};{triple.obj};{triple.subj_attrs};{triple.obj_attrs};{triple.subj_ner};{triple.obj_ner}\n"
                     )
-                except Exception as e:
-                    logger.error(
-                        "Failed to generate RDF graph representation. Details: {}".format(
-                            str(e)
-                        )
+        if svo:
+            with open(nlp_dir.joinpath(f"{name}_svo.txt"), "w") as fd:
+                for triple in svo:
+                    fd.write(
+                        f"{triple.subj};{triple.verb};{triple.obj};{triple.subj_ner};{triple.obj_ner}\n"
                     )
-            nlp_analizer.reset()
 
-    def upload_to_database() -> None:
-        with StardogConnection(Config(), args.db_name) as conn:
-            conn.begin()
-            for file in files_in_dir(output.joinpath("graph")):
-                try:
-                    file = pathlib.Path(file)
-                    logger.info(f"Uploading {file.name} to {args.db_name} database...")
-                    conn.add(stardog.content.File(str(file)))
-                    logger.info(f"{file.name} file has been uploaded successfully.")
-                except Exception:
-                    logger.warning(
-                        f"Unable to upload {file.name} file. Details: {traceback.format_exc()}"
+    def document_extraction_step(
+        nlp_analizer, filename: pathlib.Path, outputs: GraphOutputs
+    ):
+        logger.info(f"NLP module started. Processing {filename.name} documentation.")
+        save = (
+            nlp_path(output, subdir=filename.stem).joinpath(f"{filename.stem}.png")
+            if args.visualize
+            else None
+        )
+        if filename.stat().st_size > environment.in_memory_file_limit:
+            from src.nlp.chunking import text_windows
+
+            # only window under processing is decoded, file content stays memory mapped
+            logger.info(
+                f"{filename.name} exceeds in memory file limit, processing in windows of "
+                f"{environment.in_memory_file_limit} bytes."
+            )
+            tfidf, spo, svo = nlp_analizer.execute_windows(
+                lambda: (
+                    window
+                    for window, _ in text_windows(
+                        filename, environment.in_memory_file_limit
                     )
-                    continue
-            conn.commit()
+                ),
+                save=save,
+            )
+        else:
+            with open(filename, encoding="utf-8") as fd:
+                text = fd.read()
+            tfidf, spo, svo = nlp_analizer.execute(text, save=save)
+        if not tfidf and not spo and not svo:
+            logger.error("No information was extracted.")
+            logger.info("App finished with exit code 4")
+            return sys.exit(4)
+        if outputs.store is not None:
+            outputs.store.add_document(
+                filename.stem,
+                tfidf,
+                itertools.chain(svo, spo),
+                timings=nlp_analizer.timings,
+            )
+        else:
+            nlp_dir = nlp_path(output, subdir=filename.stem)
+            save_results_step(nlp_dir, filename.stem, tfidf, spo, svo)
+            if args.stage_timings:
+                with open(nlp_dir.joinpath(f"{filename.stem}_timings.json"), "w") as fd:
+                    json.dump(nlp_analizer.timings, fd, indent=2)
+        if STEPS.MAKE_GRAPH in args.only:
+            document_graph_step(filename.stem, svo, spo, outputs)
+        nlp_analizer.reset()
+
+    def previous_results() -> typing.Iterator:
+        database = techdoc_path.joinpath(RESULTS_DATABASE)
+        if database.exists():
+            from src.database.results_store import ResultsStore
+
+            logger.info(f"Rebuilding graphs from results store {database}...")
+            with ResultsStore(database) as source:
+                yield from source.iter_documents()
+            return
+        from src.knowledge_graph.get_data import iter_documents
+
+        information = techdoc_path.joinpath("information")
+        if not information.is_dir():
+            information = techdoc_path
+        logger.info(f"Rebuilding graphs from extracted information in {information}...")
+        yield from iter_documents(information, workers=environment.nlp_workers)
+
+    def rebuild_graph_step() -> int:
+        outputs = open_graph_outputs()
+        documents = 0
+        try:
+            for name, triples in previous_results():
+                document_graph_step(name, triples, [], outputs)
+                documents += 1
+        finally:
+            close_graph_outputs(outputs)
+        return documents
+
+    def graph_sources() -> typing.Iterator[typing.Tuple[str, typing.Iterable[str]]]:
+        # graph lines are streamed, file is consumed before the next one is opened
+        for file in files_in_dir(output.joinpath("graph")):
+            file = pathlib.Path(file)
+            with open(file, encoding="utf-8") as fd:
+                yield file.name, fd
+        if output.joinpath(RESULTS_DATABASE).exists():
+            from src.database.results_store import ResultsStore
+
+            with ResultsStore(output.joinpath(RESULTS_DATABASE)) as store:
+                for name, format_, content in store.graphs():
+                    yield f"{name}{format_}", content
+
+    def upload_engine():
+        from src.config.config import Config
+        from src.database.upload import UploadEngine
+
+        return UploadEngine.from_config(
+            Config(),
+            args.db_name,
+            logger=logger,
+            batch_size=environment.upload_batch_size,
+            workers=environment.upload_workers,
+            retries=environment.upload_retries,
+        )
+
+    def report_upload(result) -> None:
+        logger.info(
+            f"Uploaded {result.statements} statements in {result.batches} transactions."
+        )
+        for batch in result.failed:
+            logger.warning(
+                f"Unable to upload {batch.statements} statements from {', '.join(batch.sources)}."
+            )
+        for error in result.errors:
+            logger.error(f"Upload stopped. Details: {error}")
+
+    def bulk_export_step() -> None:
+        from src.database.bulk_export import export_shards
+
+        logger.info(f"Exporting graphs for bulk load to {args.bulk_export}...")
+        manifest = export_shards(
+            graph_sources(), args.bulk_export, environment.bulk_shard_size
+        )
+        logger.info(
+            f"Exported {manifest.statements} statements in {len(manifest.shards)} shards."
+        )
+
+    def incremental_upload() -> None:
+        from src.database.statement_index import StatementIndex
+
+        logger.info(f"Computing changes of {args.db_name} database graphs...")
+        with StatementIndex(args.incremental_upload, args.db_name) as index:
+            delta = index.diff(graph_sources(), prune=True)
+            logger.info(
+                f"{delta.added} statements to add, {delta.removed} statements to remove "
+                f"in {delta.documents} changed documents."
+            )
+            if delta:
+                with upload_engine() as engine:
+                    engine.apply(delta.adds, delta.removes)
+            index.commit()
+        logger.info(f"Database {args.db_name} is up to date.")
+
+    def upload_to_database() -> None:
+        from src.database.upload import UploadError
+
+        if args.incremental_upload:
+            try:
+                incremental_upload()
+            except UploadError as e:
+                logger.error(f"Incremental upload failed. Details: {str(e)}")
+            return
+        logger.info(f"Uploading graphs to {args.db_name} database...")
+        try:
+            with upload_engine() as engine:
+                report_upload(engine.upload(graph_sources()))
+        except UploadError as e:
+            logger.error(f"Upload failed. Details: {str(e)}")
 
     if common.get_current_os() != "linux":
         logger.warning(
@@ -244,19 +638,31 @@ def run_app(
     plugin_path = pathlib.Path(args.plugin)
     if not output.exists():
         output.mkdir()
-    if STEPS.DECOMPRESS not in args.only:
+    # graphs can be rebuilt from results of previous run without NLP re-execution
+    graph_only = STEPS.MAKE_GRAPH in args.only and not set(args.only) - {
+        STEPS.MAKE_GRAPH,
+        STEPS.UPLOAD_GRAPH,
+    }
+    if STEPS.DECOMPRESS not in args.only and not graph_only:
         logger.error(f"Missing required step: 'decompress'.")
         logger.info("App finished with exit code 1")
         return 1
     if not args.db_name:
         logger.warning(f"Missing required arg: 'db_name'.")
+    from src.nlp.canonicalization import CanonicalMapError
+
+    try:
+        canonicalizer = load_canonicalizer()
+    except CanonicalMapError as e:
+        logger.error(str(e))
+        logger.info("App finished with exit code 1")
+        return 1
     if STEPS.DECOMPRESS in args.only:
         try:
-            if (
-                techdoc_path.is_dir()
-                or techdoc_path.suffix in common.SUPPORTED_DOCUMENTS
-            ):
+            if not is_archive():
                 copy_step()
+            elif stream_archive():
+                stream_decode_step()
             else:
                 decompress_step()
         except (
@@ -266,7 +672,9 @@ def run_app(
             logger.error(str(e))
             logger.info("App finished with exit code 1")
             return 1
-    if STEPS.DECODE in args.only:
+    if STEPS.DECODE in args.only and not (
+        STEPS.DECOMPRESS in args.only and stream_archive()
+    ):
         decode_step()
     if STEPS.INFORMATION_EXTRACTION in args.only:
         if len(files_in_dir(decoded_path(output))) == 0:
@@ -279,7 +687,20 @@ def run_app(
             )
         logger.info("Information extraction...")
         information_extraction_step()
-    if STEPS.UPLOAD_GRAPH in args.only:
+    if graph_only:
+        if not techdoc_path.is_dir():
+            logger.error(
+                f"Graph rebuild requires results directory of previous run, got {techdoc_path}"
+            )
+            logger.info("App finished with exit code 1")
+            return 1
+        if rebuild_graph_step() == 0:
+            logger.error(f"No extracted information found in {techdoc_path}.")
+            logger.info("App finished with exit code 4")
+            return 4
+    if args.bulk_export and STEPS.MAKE_GRAPH in args.only:
+        bulk_export_step()
+    if STEPS.UPLOAD_GRAPH in args.only and not pipelined_upload():
         if args.db_name:
             upload_to_database()
     logger.info("App finished with exit code 0")
@@ -318,7 +739,8 @@ def main(argv: typing.List[str], logger=None, environment=None) -> int:
     'decompress' - decompress files from archive pointed by --techdoc_path to the directory pointed by --output
     'decode'     - decode extracted files, cleanup text for NLP processing.
     'information_extraction' - natural language processing for information extraction.
-    'make_graph' - create RDF based graph file.
+    'make_graph' - create RDF based graph file. If used without 'decompress' (optionally with 'upload_graph')
+                   graphs are rebuilt from results directory of previous run pointed by --techdoc_path.
     'upload_graph' - upload graph file to Stardog database pointed by --db_name.
     """,
     )
@@ -348,12 +770,107 @@ def main(argv: typing.List[str], logger=None, environment=None) -> int:
         default="results",
         help="specifies directory, where results should be saved. Has to be empty",
     )
+    parser.add_argument(
+        "--staging",
+        choices=STAGING_CHOICES,
+        default=STAGING.AUTO,
+        help="""how input directory or document is staged into output directory:
+    'auto'     - 'reflink' if supported by filesystem, 'copy' otherwise
+    'hardlink' - hard link, no data is copied (same filesystem only), staged file is the input file
+    'reflink'  - copy-on-write clone (e.g. btrfs, xfs), no data is copied until file is modified
+    'symlink'  - symbolic link to input file, input must not be moved during processing
+    'copy'     - full copy
+    """,
+    )
+    parser.add_argument(
+        "--stream_archive",
+        action="store_true",
+        help="decode archive members streamed directly from archive instead of extracting them "
+        "to disk first, only decoded text is written. Plugin receives document on standard "
+        "input with '-' as input path and document file name as additional argument",
+    )
     parser.add_argument(
         "--tfidf",
         type=int,
         default=5,
         help="specifies how many words to pick from TF-IDF results for topic modeling",
     )
+    parser.add_argument(
+        "--gazetteer",
+        type=str,
+        metavar="path",
+        help="known named entities used to label terms without running statistical NER model. "
+        "Either file with '<term>;<label>' lines or directory with results of previous runs "
+        "(entities are mined from *_svo.txt files)",
+    )
+    parser.add_argument(
+        "--results_format",
+        choices=RESULTS_FORMATS_CHOICES,
+        default=RESULTS_FORMATS.TEXT,
+        help=f"""format of extracted information files:
+    'text'   - semicolon separated '_tfidf.txt', '_svo.txt' and '_spo.txt' files
+    'binary' - single packed '{BINARY_RESULTS_FORMAT}' file per document with string table, fast to reload
+    'sqlite' - single '{RESULTS_DATABASE}' database with results and graphs of all documents
+    """,
+    )
+    parser.add_argument(
+        "--stage_timings",
+        action="store_true",
+        help="save NLP pipeline stage timings of each document to '<document>_timings.json' "
+        "(always kept in results database with 'sqlite' results format)",
+    )
+    parser.add_argument(
+        "--corpus_graph",
+        action="store_true",
+        help=f"accumulate triples from all documents into one deduplicated graph "
+        f"'graph/{CORPUS_GRAPH}/{CORPUS_GRAPH}{GRAPH_FORMAT}' instead of graph per document",
+    )
+    parser.add_argument(
+        "--provenance",
+        action="store_true",
+        help=f"with --corpus_graph keep per document provenance using named graphs, "
+        f"corpus graph is saved in N-Quads format ({QUADS_FORMAT})",
+    )
+    parser.add_argument(
+        "--canonical_map",
+        type=str,
+        metavar="path",
+        help="merge entity variants (case, plural forms) onto canonical entity before graph generation. "
+        "Mapping is loaded from given JSON file if exists and saved back for reuse in next runs",
+    )
+    parser.add_argument(
+        "--canonical_similarity",
+        type=float,
+        metavar="threshold",
+        help="with --canonical_map additionally merge entities with cosine similarity of language "
+        "model vectors above threshold (e.g. 0.9), requires model with word vectors",
+    )
+    parser.add_argument(
+        "--validate_graph",
+        action="store_true",
+        help="parse generated RDF graph files with rdflib to validate syntax (slow for large graphs)",
+    )
+    parser.add_argument(
+        "--pipelined_upload",
+        action="store_true",
+        help="upload graph of each document in background as soon as it is generated, "
+        "overlapping upload with processing of next documents (not used with --corpus_graph)",
+    )
+    parser.add_argument(
+        "--incremental_upload",
+        type=str,
+        metavar="path",
+        help="keep index of statements committed to --db_name database in given file and upload "
+        "only changes since previous run (added and removed statements) in single transaction. "
+        "Graphs of run are treated as complete corpus, documents missing in run are removed",
+    )
+    parser.add_argument(
+        "--bulk_export",
+        type=str,
+        metavar="path",
+        help="write generated graphs into directory as gzip compressed shards with manifest "
+        "for bulk database creation (python -m src.database.main --create_db --bulk_dir path)",
+    )
     parser.add_argument(
         "--visualize",
         action="store_true",
@@ -1,6 +1,11 @@
 import pathlib
+import shutil
 import subprocess
 import sys
+import tempfile
+import typing
+
+STDIN = "-"
 
 
 def execute_plugin(
@@ -27,3 +32,44 @@ def execute_plugin(
 
     if result.returncode != 0:
         raise RuntimeError(f"Script failed with error: {result.stderr.decode()}")
+
+
+def execute_plugin_stream(
+    script_path: pathlib.Path,
+    input_stream: typing.IO[bytes],
+    input_name: str,
+    output_filepath: pathlib.Path,
+):
+    """
+    Run external python script reading input document from standard input. Script is
+    called with '-' as input filepath and input file name (for format detection) as
+    additional argument.
+    Arg
+        script_path: path to python script
+        input_stream: binary stream with input document content
+        input_name: input file name
+        output_filepath: path to output file
+    """
+    if script_path.suffix != ".py":
+        raise ValueError(f"Script path must point to Python script, got {script_path}")
+
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            [sys.executable, script_path, STDIN, output_filepath, input_name],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+        try:
+            shutil.copyfileobj(input_stream, process.stdin)
+        except BrokenPipeError:
+            pass  # script exited without reading whole input, reported by return code
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = process.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"Script failed with error: {stderr.read().decode()}")
@@ -0,0 +1,138 @@
+"""Bulk-load export of generated graphs
+Graphs are written as gzip compressed shards of bounded number of statements with manifest
+describing shards, the database is then created from shards in single bulk-load call
+instead of streaming transactional adds.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import pathlib
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, List, Tuple
+
+from src.database.upload import Content, batches
+
+BULK_SHARD_SIZE = 1_000_000  # statements per shard
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+SHARD_EXTENSIONS = {
+    "text/turtle": ".ttl",
+    "application/n-triples": ".ttl",  # N-Triples is Turtle subset
+    "application/n-quads": ".nq",
+}
+
+
+class ManifestError(Exception):
+    pass
+
+
+@dataclass
+class Shard:
+    file: str
+    content_type: str
+    statements: int
+
+
+@dataclass
+class Manifest:
+    shards: List[Shard] = field(default_factory=list)
+    compression: str = "gzip"
+    version: int = MANIFEST_VERSION
+
+    @property
+    def statements(self) -> int:
+        return sum(shard.statements for shard in self.shards)
+
+    def save(self, directory: pathlib.Path) -> pathlib.Path:
+        path = directory.joinpath(MANIFEST)
+        content = asdict(self)
+        content["statements"] = self.statements
+        with open(path, "w", encoding="utf-8") as fd:
+            json.dump(content, fd, indent=2)
+        return path
+
+    @staticmethod
+    def load(directory: str | pathlib.Path) -> Manifest:
+        """
+        Args:
+            directory: export directory with manifest
+        Returns:
+            manifest
+        Raises:
+            ManifestError: missing or unsupported manifest, missing shard
+        """
+        directory = pathlib.Path(directory)
+        try:
+            with open(directory.joinpath(MANIFEST), encoding="utf-8") as fd:
+                content = json.load(fd)
+        except (OSError, ValueError) as e:
+            raise ManifestError(f"Invalid manifest in {directory}. Details: {str(e)}")
+        if content.get("version") != MANIFEST_VERSION:
+            raise ManifestError(
+                f"Unsupported manifest version: {content.get('version')}"
+            )
+        manifest = Manifest(
+            shards=[Shard(**shard) for shard in content["shards"]],
+            compression=content["compression"],
+        )
+        for shard in manifest.shards:
+            if not directory.joinpath(shard.file).is_file():
+                raise ManifestError(f"Missing shard {shard.file} in {directory}")
+        return manifest
+
+
+def export_shards(
+    sources: Iterable[Tuple[str, Content]],
+    directory: str | pathlib.Path,
+    shard_size: int = BULK_SHARD_SIZE,
+    prefix: str = "graph",
+) -> Manifest:
+    """
+    Write graphs into compressed shards, statements of small graphs of the same content
+    type share shard, graphs with Turtle directives are never split.
+    Args:
+        sources: (graph name, graph content) pairs
+        directory: output directory, created if does not exist
+        shard_size: maximum number of statements per shard
+        prefix: shard file name prefix
+    Returns:
+        manifest, saved in directory
+    """
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest()
+    for number, batch in enumerate(batches(sources, shard_size)):
+        extension = SHARD_EXTENSIONS.get(batch.content_type, ".ttl")
+        name = f"{prefix}-{number:05d}{extension}.gz"
+        with gzip.open(directory.joinpath(name), "wt", encoding="utf-8") as fd:
+            fd.writelines(batch.lines)
+        content_type = "application/n-quads" if extension == ".nq" else "text/turtle"
+        manifest.shards.append(Shard(name, content_type, batch.statements))
+    manifest.save(directory)
+    return manifest
+
+
+def bulk_contents(directory: str | pathlib.Path) -> Tuple[Manifest, list]:
+    """
+    Args:
+        directory: export directory with manifest
+    Returns:
+        manifest and shards as pystardog contents for Admin.new_database
+    Raises:
+        ManifestError: missing or unsupported manifest, missing shard
+    """
+    import stardog
+
+    directory = pathlib.Path(directory)
+    manifest = Manifest.load(directory)
+    contents = [
+        stardog.content.File(
+            str(directory.joinpath(shard.file)),
+            content_type=shard.content_type,
+            content_encoding=manifest.compression,
+            name=shard.file,
+        )
+        for shard in manifest.shards
+    ]
+    return manifest, contents
@@ -6,7 +6,20 @@ import typing
 import stardog
 
 from src.application import common, logs
-from src.database.stardog_connection import StardogConnection
+from src.database.bulk_export import ManifestError, bulk_contents
+from src.database.query_runner import (
+    QUERY_CACHE_TTL,
+    QUERY_FORMATS,
+    QUERY_WORKERS,
+    QueryError,
+    QueryRunner,
+)
+from src.database.stardog_connection import (
+    ConnectionPool,
+    StardogConnection,
+    shared_pool,
+)
+from src.database.upload import CONTENT_TYPES, commit_marker
 from src.config.config import Config
 
 
@@ -15,6 +28,12 @@ def get_help_epilog():
 Examples:
     Execute the query from the file on the sample data from the database 
     python src.database.main --query_path example.sparql
+    Stream results of the query to the CSV file, reuse cached results if database did not change
+    python src.database.main --query_path example.rq --output result.csv --cache_dir .cache example
+    Execute all .rq queries from the directory concurrently, fetch results in pages of 100000 rows
+    python src.database.main --query_path queries --output results --page_size 100000 example
+    Create the database from shards exported by application (--bulk_export)
+    python src.database.main --create_db --bulk_dir bulk example
     Upload the data to the new database
     python src.database.main --ttl_path example.ttf --db_name example
 """
@@ -26,16 +45,102 @@ def run_app(
     logger: logging.Logger,
     environment: common.Environment,
 ) -> int:
+    pool = shared_pool(Config(), logger=logger)
+    try:
+        return execute(args, pool, logger)
+    finally:
+        pool.close()
+
+
+def bulk_load(
+    args: argparse.Namespace, logger: logging.Logger, pool: ConnectionPool
+) -> int:
+    try:
+        manifest, contents = bulk_contents(args.bulk_dir)
+    except ManifestError as e:
+        logger.error(str(e))
+        return 1
+    logger.info(
+        f"Creating database {args.db_name} from {len(manifest.shards)} shards "
+        f"({manifest.statements} statements)..."
+    )
+    with StardogConnection(
+        Config(), is_admin=True, pool=pool, logger=logger
+    ) as admin_conn:
+        # bulk-loaded database starts with commit marker keying query results cache
+        marker = stardog.content.Raw(
+            commit_marker(), CONTENT_TYPES[".nq"], name="meta.nq"
+        )
+        admin_conn.new_database(
+            args.db_name, {}, *contents, marker, copy_to_server=True
+        )
+    logger.info(f"Created new database with name: {args.db_name}")
+    return 0
+
+
+def run_queries(
+    args: argparse.Namespace, logger: logging.Logger, pool: ConnectionPool
+) -> int:
+    with QueryRunner.from_config(
+        Config(),
+        args.db_name,
+        pool=pool,
+        logger=logger,
+        page_size=args.page_size,
+        cache_dir=args.cache_dir,
+        cache_ttl=args.cache_ttl,
+    ) as runner:
+        try:
+            if os.path.isdir(args.query_path):
+                results = runner.run_directory(
+                    args.query_path, args.output, args.format, args.workers
+                )
+            else:
+                with open(args.query_path, encoding="utf-8") as fd:
+                    query = fd.read()
+                results = {
+                    os.path.basename(args.query_path): runner.run(
+                        query, args.output, args.format
+                    )
+                }
+        except QueryError as e:
+            logger.error(str(e))
+            return 1
+    failed = 0
+    for name, result in results.items():
+        if isinstance(result, QueryError):
+            logger.error(f"{name}: {str(result)}")
+            failed += 1
+            continue
+        source = "cache" if result.cached else "database"
+        logger.info(
+            f"{name}: {result.rows} rows from {source} saved to {result.destination} "
+            f"in {result.seconds:.3f} seconds"
+        )
+    return 1 if failed else 0
+
+
+def execute(
+    args: argparse.Namespace, pool: ConnectionPool, logger: logging.Logger
+) -> int:
+    if args.create_db and args.bulk_dir is not None:
+        return bulk_load(args, logger, pool)
     if args.create_db:
-        with StardogConnection(Config(), is_admin=True) as admin_conn:
+        with StardogConnection(
+            Config(), is_admin=True, pool=pool, logger=logger
+        ) as admin_conn:
             database = admin_conn.new_database(args.db_name)
             logger.info(f"Created new database with name: {args.db_name}")
             database.drop()
             logger.info(f"Shut down of database with name: {args.db_name}")
         return 0
 
+    if args.query_path is not None and args.output is not None:
+        return run_queries(args, logger, pool)
     if args.query_path is not None:
-        with StardogConnection(Config(), args.db_name) as conn:
+        with StardogConnection(
+            Config(), args.db_name, pool=pool, logger=logger
+        ) as conn:
             query_file = open(args.query_path, "r")
             result = conn.select(
                 query_file.read(), content_type=stardog.content_types.SPARQL_JSON
@@ -44,10 +149,14 @@ def run_app(
         return 0
 
     if args.ttl_path is not None:
-        with StardogConnection(Config(), is_admin=True) as admin_conn:
+        with StardogConnection(
+            Config(), is_admin=True, pool=pool, logger=logger
+        ) as admin_conn:
             database = admin_conn.new_database(args.db_name)
             logger.info(f"Created new database with name: {args.db_name}")
-            with StardogConnection(Config(), args.db_name) as conn:
+            with StardogConnection(
+                Config(), args.db_name, pool=pool, logger=logger
+            ) as conn:
                 conn.begin()
                 conn.add(stardog.content.File(args.ttl_path))
                 results = conn.select("select * { ?a ?p ?o }")
@@ -74,10 +183,54 @@ def main(argv: typing.List[str], logger=None, environment=None) -> int:
         action="store_true",
         help="specifies if database should be created",
     )
+    parser.add_argument(
+        "--bulk_dir",
+        type=str,
+        help="with --create_db create database from shards exported by application "
+        "(--bulk_export) in single bulk-load call, database is kept",
+    )
     parser.add_argument(
         "--query_path",
         type=str,
-        help="specifies path to the file with query to execute",
+        help="specifies path to the file with query to execute "
+        "or directory with .rq queries (requires --output)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="with --query_path stream query results to this file "
+        "(directory for directory of queries) instead of logging them",
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(QUERY_FORMATS),
+        default="csv",
+        help="format of streamed query results",
+    )
+    parser.add_argument(
+        "--page_size",
+        type=int,
+        help="fetch query results in pages of given number of rows (LIMIT/OFFSET), "
+        "query should have ORDER BY clause for stable pages",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=QUERY_WORKERS,
+        help="number of queries from directory executed concurrently",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        help="cache query results in directory, repeated query returns cached results "
+        "until application uploads to database or cache expires (--cache_ttl)",
+    )
+    parser.add_argument(
+        "--cache_ttl",
+        type=float,
+        default=QUERY_CACHE_TTL,
+        help="seconds cached query results are valid, changes of database made by other "
+        "tools are detected only if number of statements changes",
     )
     parser.add_argument(
         "--ttl_path",
@@ -0,0 +1,318 @@
+"""Streaming SPARQL query runner
+Query results are requested as CSV/TSV and written to file row by row, optionally in pages
+(LIMIT/OFFSET), so result size is not limited by memory. Results are cached by query hash
+and database commit marker, repeated query on unchanged database is answered from cache.
+Commit marker is replaced once by every upload run and bulk-load of this application (see
+upload), changes made by other tools are detected only if they change number of statements, cached
+results are therefore also limited by time to live.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import logging
+import os
+import pathlib
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, TextIO
+
+import requests
+
+from src.database.stardog_connection import ConnectionPool, PooledSessions, shared_pool
+from src.database.upload import COMMIT_GRAPH, COMMIT_PREDICATE
+
+QUERY_FORMATS = {
+    "csv": ("text/csv", ","),
+    "tsv": ("text/tab-separated-values", "\t"),
+}
+QUERY_EXTENSION = ".rq"
+QUERY_WORKERS = 4
+QUERY_CACHE_TTL = 3600.0  # seconds
+COMMIT_QUERY = f"SELECT ?commit {{ GRAPH <{COMMIT_GRAPH}> {{ <{COMMIT_GRAPH}> <{COMMIT_PREDICATE}> ?commit }} }}"
+PROLOGUE = re.compile(
+    r"^((?:\s*(?:#[^\n]*|PREFIX\s+[\w.-]*:\s*<[^>]*>|BASE\s+<[^>]*>))*)(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class QueryError(Exception):
+    pass
+
+
+@dataclass
+class QueryResult:
+    destination: pathlib.Path
+    rows: int
+    seconds: float
+    cached: bool = False
+
+
+def paged_query(query: str, limit: int, offset: int) -> str:
+    """
+    Wrap SELECT query in subquery returning single page, prologue (PREFIX, BASE) is kept
+    in front. Pages are stable only if query has ORDER BY clause.
+    """
+    prologue, body = (part.strip() for part in PROLOGUE.match(query).groups())
+    return f"{prologue}\nSELECT * WHERE {{\n{body}\n}} LIMIT {limit} OFFSET {offset}"
+
+
+def count_rows(lines: Iterable[str], format_: str) -> int:
+    """number of result rows in CSV/TSV lines (without header)"""
+    _, delimiter = QUERY_FORMATS[format_]
+    reader = csv.reader(
+        lines,
+        delimiter=delimiter,
+        quoting=csv.QUOTE_MINIMAL if format_ == "csv" else csv.QUOTE_NONE,
+    )
+    return sum(1 for _ in reader)
+
+
+def _tee(lines: Iterable[str], fd: TextIO) -> Iterator[str]:
+    for line in lines:
+        fd.write(line)
+        yield line
+
+
+class QueryRunner:
+    """
+    Run SPARQL SELECT queries on Stardog database using HTTP query endpoint
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        database: str,
+        username: str = None,
+        password: str = None,
+        logger: logging.Logger = None,
+        page_size: int = None,
+        cache_dir: str | pathlib.Path = None,
+        timeout: float = 300.0,
+        cache_ttl: float = QUERY_CACHE_TTL,
+        pool: ConnectionPool = None,
+    ) -> None:
+        self.url = f"{endpoint.rstrip('/')}/{database}"
+        self.auth = (username, password) if username is not None else None
+        self.logger = logger or logging.getLogger("SKG")
+        self.page_size = page_size
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir is not None else None
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        # HTTP sessions of pooled connections, private sessions without pool
+        self._sessions = PooledSessions(pool, database, self.auth)
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def from_config(
+        config, database: str, pool: ConnectionPool = None, **kwargs
+    ) -> QueryRunner:
+        """sessions are borrowed from given pool, process wide pool by default"""
+        if pool is None:
+            pool = shared_pool(config, logger=kwargs.get("logger"))
+        return QueryRunner(
+            config.STARDOG_ENDPOINT,
+            database,
+            config.STARDOG_USERNAME,
+            config.STARDOG_PASSWORD,
+            pool=pool,
+            **kwargs,
+        )
+
+    def _session(self) -> requests.Session:
+        """HTTP session (kept alive connection) per worker thread"""
+        return self._sessions.get()
+
+    def marker(self) -> str:
+        """
+        Database commit marker, changed by every upload run (combined with number of
+        statements in database)
+        Raises:
+            QueryError: database is not available
+        """
+        try:
+            response = self._session().get(
+                f"{self.url}/size", params={"exact": "true"}, timeout=self.timeout
+            )
+            response.raise_for_status()
+            with self._request(COMMIT_QUERY, "csv") as commit:
+                commits = sorted(commit.text.splitlines()[1:])
+        except requests.RequestException as e:
+            raise QueryError(f"Unable to read database state. Details: {str(e)}") from e
+        state = "\n".join([response.text.strip()] + commits)
+        return hashlib.sha256(state.encode("utf-8")).hexdigest()[:16]
+
+    def _request(self, query: str, format_: str) -> requests.Response:
+        accept, _ = QUERY_FORMATS[format_]
+        response = self._session().post(
+            f"{self.url}/query",
+            data={"query": query},
+            headers={"Accept": accept},
+            stream=True,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        response.raw.decode_content = True
+        # keep raw stream open at end of content, it is closed with response
+        response.raw.auto_close = False
+        return response
+
+    def _write(self, query: str, format_: str, fd: TextIO, header: bool) -> int:
+        """stream single response into fd, returns number of rows"""
+        with self._request(query, format_) as response:
+            lines = io.TextIOWrapper(response.raw, encoding="utf-8", newline="")
+            if not header:
+                next(lines, None)
+            return max(0, count_rows(_tee(lines, fd), format_) - header)
+
+    def _execute(self, query: str, format_: str, fd: TextIO) -> int:
+        if not self.page_size:
+            return self._write(query, format_, fd, header=True)
+        rows, offset = 0, 0
+        while True:
+            page = paged_query(query, self.page_size, offset)
+            count = self._write(page, format_, fd, header=offset == 0)
+            rows += count
+            offset += self.page_size
+            if count < self.page_size:
+                return rows
+
+    def _cached(self, cache: pathlib.Path) -> bool:
+        if not cache.exists():
+            return False
+        return (
+            self.cache_ttl is None
+            or time.time() - cache.stat().st_mtime < self.cache_ttl
+        )
+
+    def _cache_path(self, query: str, format_: str, marker: str) -> pathlib.Path:
+        key = hashlib.sha256(
+            f"{self.url}\n{format_}\n{self.page_size}\n{query}".encode("utf-8")
+        ).hexdigest()
+        return self.cache_dir.joinpath(f"{key}-{marker}.{format_}")
+
+    def run(
+        self,
+        query: str,
+        destination: str | pathlib.Path,
+        format_: str = "csv",
+    ) -> QueryResult:
+        """
+        Args:
+            query: SPARQL SELECT query
+            destination: output file
+            format_: 'csv' or 'tsv'
+        Returns:
+            query summary
+        Raises:
+            QueryError: query failed
+        """
+        destination = pathlib.Path(destination)
+        start = time.perf_counter()
+        cache, marker = None, None
+        if self.cache_dir is not None:
+            marker = self.marker()
+            cache = self._cache_path(query, format_, marker)
+            if self._cached(cache):
+                shutil.copyfile(cache, destination)
+                with open(cache, encoding="utf-8", newline="") as fd:
+                    rows = max(0, count_rows(fd, format_) - 1)
+                return QueryResult(
+                    destination, rows, time.perf_counter() - start, cached=True
+                )
+        partial = destination.with_name(destination.name + ".part")
+        try:
+            with open(partial, "w", encoding="utf-8", newline="") as fd:
+                rows = self._execute(query, format_, fd)
+            os.replace(partial, destination)
+        except requests.RequestException as e:
+            raise QueryError(f"Query failed. Details: {str(e)}") from e
+        finally:
+            # left behind only by failed or interrupted query
+            partial.unlink(missing_ok=True)
+        # database changed during query, results may mix both states
+        if cache is not None and self.marker() == marker:
+            self._store(destination, cache)
+        return QueryResult(destination, rows, time.perf_counter() - start)
+
+    def _store(self, results: pathlib.Path, cache: pathlib.Path) -> None:
+        temporary = cache.with_name(f"{cache.name}.{threading.get_ident()}")
+        try:
+            shutil.copyfile(results, temporary)
+            os.replace(temporary, cache)
+        finally:
+            temporary.unlink(missing_ok=True)
+        self._prune(cache)
+
+    def _prune(self, current: pathlib.Path) -> None:
+        """
+        Remove entries of the same query cached for other database states and expired
+        entries of any query, they are never used again
+        """
+        key = current.name.split("-", 1)[0]
+        now = time.time()
+        for entry in self.cache_dir.iterdir():
+            # temporary files of concurrent queries are skipped
+            if entry == current or entry.suffix[1:] not in QUERY_FORMATS:
+                continue
+            try:
+                if entry.name.startswith(f"{key}-") or (
+                    self.cache_ttl is not None
+                    and now - entry.stat().st_mtime >= self.cache_ttl
+                ):
+                    entry.unlink()
+            except FileNotFoundError:
+                # removed by concurrent query
+                continue
+
+    def run_directory(
+        self,
+        directory: str | pathlib.Path,
+        output: str | pathlib.Path,
+        format_: str = "csv",
+        workers: int = QUERY_WORKERS,
+    ) -> Dict[str, QueryResult | QueryError]:
+        """
+        Run all .rq queries from directory concurrently
+        Args:
+            directory: directory with query files
+            output: directory for results, '<query name>.<format>' per query
+            format_: 'csv' or 'tsv'
+            workers: number of concurrent queries
+        Returns:
+            query file name -> query summary or error
+        """
+        output = pathlib.Path(output)
+        output.mkdir(parents=True, exist_ok=True)
+        queries = sorted(pathlib.Path(directory).glob(f"*{QUERY_EXTENSION}"))
+
+        def run(path: pathlib.Path) -> QueryResult | QueryError:
+            with open(path, encoding="utf-8") as fd:
+                query = fd.read()
+            try:
+                return self.run(
+                    query, output.joinpath(f"{path.stem}.{format_}"), format_
+                )
+            except QueryError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return {
+                path.name: result
+                for path, result in zip(queries, executor.map(run, queries))
+            }
+
+    def close(self) -> None:
+        self._sessions.close()
+
+    def __enter__(self) -> QueryRunner:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,228 @@
+"""Single file SQLite store for information extraction results and generated graphs
+"""
+from __future__ import annotations
+
+import json
+import pathlib
+import sqlite3
+from typing import Iterable, Iterator, List, Tuple
+
+from src.nlp.triples import SVO, SPO
+
+SVO_KIND = 0
+SPO_KIND = 1
+# rollback journal, WAL requires shared memory which does not work on network filesystems
+JOURNAL_MODE = "DELETE"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    timings TEXT
+);
+CREATE TABLE IF NOT EXISTS tfidf (
+    doc INTEGER NOT NULL REFERENCES documents(id),
+    term TEXT NOT NULL,
+    frequency INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS triples (
+    doc INTEGER NOT NULL REFERENCES documents(id),
+    kind INTEGER NOT NULL,
+    subj TEXT NOT NULL,
+    pred TEXT NOT NULL,
+    obj TEXT NOT NULL,
+    subj_ner TEXT NOT NULL,
+    obj_ner TEXT NOT NULL,
+    subj_attrs TEXT NOT NULL,
+    obj_attrs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS graphs (
+    doc INTEGER NOT NULL REFERENCES documents(id),
+    format TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tfidf_doc ON tfidf(doc);
+CREATE INDEX IF NOT EXISTS triples_doc ON triples(doc);
+CREATE INDEX IF NOT EXISTS triples_subj ON triples(subj);
+CREATE INDEX IF NOT EXISTS triples_obj ON triples(obj);
+CREATE INDEX IF NOT EXISTS triples_subj_ner ON triples(subj_ner);
+CREATE INDEX IF NOT EXISTS triples_obj_ner ON triples(obj_ner);
+CREATE INDEX IF NOT EXISTS graphs_doc ON graphs(doc);
+"""
+
+
+def _row(doc: int, triple: SVO | SPO) -> Tuple:
+    if isinstance(triple, SVO):
+        return (
+            doc,
+            SVO_KIND,
+            triple.subj,
+            triple.verb,
+            triple.obj,
+            triple.subj_ner,
+            triple.obj_ner,
+            '""',
+            '""',
+        )
+    return (
+        doc,
+        SPO_KIND,
+        triple.subj,
+        triple.pred,
+        triple.obj,
+        triple.subj_ner,
+        triple.obj_ner,
+        json.dumps(triple.subj_attrs),
+        json.dumps(triple.obj_attrs),
+    )
+
+
+def _triple(row: Tuple) -> SVO | SPO:
+    kind, subj, pred, obj, subj_ner, obj_ner, subj_attrs, obj_attrs = row
+    if kind == SVO_KIND:
+        return SVO(subj=subj, verb=pred, obj=obj, subj_ner=subj_ner, obj_ner=obj_ner)
+    return SPO(
+        subj=subj,
+        subj_attrs=json.loads(subj_attrs),
+        subj_ner=subj_ner,
+        pred=pred,
+        obj=obj,
+        obj_attrs=json.loads(obj_attrs),
+        obj_ner=obj_ner,
+    )
+
+
+class ResultsStore:
+    """
+    Documents, TF-IDF results, SVO/SPO triples and graphs of whole run kept in one SQLite
+    database file. Each document is written in single transaction with batched inserts,
+    results of document added again replace the stored ones.
+    """
+
+    TRIPLE_COLUMNS = "kind, subj, pred, obj, subj_ner, obj_ner, subj_attrs, obj_attrs"
+
+    def __init__(self, path: str | pathlib.Path, batch_size: int = 10_000) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+        self.connection.executescript(SCHEMA)
+
+    def _document_id(self, name: str) -> int:
+        self.connection.execute(
+            "INSERT OR IGNORE INTO documents (name) VALUES (?)", (name,)
+        )
+        (doc,) = self.connection.execute(
+            "SELECT id FROM documents WHERE name = ?", (name,)
+        ).fetchone()
+        return doc
+
+    def _insert(self, sql: str, rows: Iterable[Tuple]) -> int:
+        count, batch = 0, list()
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.connection.executemany(sql, batch)
+                count += len(batch)
+                batch = list()
+        if batch:
+            self.connection.executemany(sql, batch)
+            count += len(batch)
+        return count
+
+    def add_document(
+        self,
+        name: str,
+        tfidf: Iterable[Tuple[str, int]],
+        triples: Iterable[SVO | SPO],
+        timings: List[dict] = None,
+    ) -> int:
+        """
+        Args:
+            name: document name
+            tfidf: (term, frequency) pairs
+            triples: SVO and SPO triples
+            timings: NLP stages timings
+        Returns:
+            number of stored triples
+        """
+        with self.connection:
+            doc = self._document_id(name)
+            self.connection.execute(
+                "UPDATE documents SET timings = ? WHERE id = ?",
+                (json.dumps(timings) if timings is not None else None, doc),
+            )
+            self.connection.execute("DELETE FROM tfidf WHERE doc = ?", (doc,))
+            self.connection.execute("DELETE FROM triples WHERE doc = ?", (doc,))
+            self._insert(
+                "INSERT INTO tfidf (doc, term, frequency) VALUES (?, ?, ?)",
+                ((doc, term, frequency) for term, frequency in tfidf),
+            )
+            return self._insert(
+                f"INSERT INTO triples (doc, {self.TRIPLE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_row(doc, triple) for triple in triples),
+            )
+
+    def add_graph(self, name: str, content: str, format_: str) -> None:
+        with self.connection:
+            doc = self._document_id(name)
+            self.connection.execute(
+                "DELETE FROM graphs WHERE doc = ? AND format = ?", (doc, format_)
+            )
+            self.connection.execute(
+                "INSERT INTO graphs (doc, format, content) VALUES (?, ?, ?)",
+                (doc, format_, content),
+            )
+
+    def documents(self) -> List[str]:
+        return [
+            name
+            for (name,) in self.connection.execute(
+                "SELECT name FROM documents ORDER BY name"
+            )
+        ]
+
+    def tfidf(self, name: str) -> List[Tuple[str, int]]:
+        return self.connection.execute(
+            "SELECT term, frequency FROM tfidf JOIN documents ON documents.id = tfidf.doc "
+            "WHERE documents.name = ? ORDER BY tfidf.rowid",
+            (name,),
+        ).fetchall()
+
+    def triples(self, name: str) -> List[SVO | SPO]:
+        rows = self.connection.execute(
+            f"SELECT {self.TRIPLE_COLUMNS} FROM triples "
+            "JOIN documents ON documents.id = triples.doc "
+            "WHERE documents.name = ? ORDER BY triples.rowid",
+            (name,),
+        )
+        return [_triple(row) for row in rows]
+
+    def iter_documents(self) -> Iterator[Tuple[str, List[SVO | SPO]]]:
+        """
+        Returns:
+            (document name, triples) pairs of documents with extracted triples
+        """
+        for name in self.documents():
+            triples = self.triples(name)
+            if triples:
+                yield name, triples
+
+    def graphs(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Returns:
+            (document name, graph format, graph content) of stored graphs
+        """
+        yield from self.connection.execute(
+            "SELECT documents.name, format, content FROM graphs "
+            "JOIN documents ON documents.id = graphs.doc ORDER BY graphs.rowid"
+        )
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> ResultsStore:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
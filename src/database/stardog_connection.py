@@ -1,5 +1,222 @@
+import logging
+import threading
+import time
+
+import requests
 import stardog
-from src.application import logs
+
+POOL_SIZE = 4
+HEALTH_CHECK_INTERVAL = 30.0  # seconds, idle session is validated before reuse
+
+
+def _close(connection, is_admin: bool) -> None:
+    if is_admin:
+        connection.client.close()
+    else:
+        connection.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of authenticated Stardog sessions (database connections and admin
+    sessions) reused across operations. Session idle longer than health check interval
+    is checked before reuse and replaced if broken.
+    """
+
+    def __init__(
+        self,
+        config,
+        max_size: int = POOL_SIZE,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL,
+        logger: logging.Logger = None,
+    ):
+        self.endpoint = config.STARDOG_ENDPOINT
+        self.username = config.STARDOG_USERNAME
+        self.password = config.STARDOG_PASSWORD
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self.logger = logger or logging.getLogger("SKG")
+        self._condition = threading.Condition()
+        # (db_name, is_admin) -> [(session, last used)]
+        self._idle = dict()
+        self._size = 0
+
+    def _connect(self, db_name, is_admin: bool):
+        if is_admin:
+            return stardog.Admin(self.endpoint, self.username, self.password)
+        return stardog.Connection(db_name, self.endpoint, self.username, self.password)
+
+    @staticmethod
+    def _healthy(connection, is_admin: bool) -> bool:
+        try:
+            if is_admin:
+                return connection.healthcheck()
+            connection.size(exact=False)
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self):
+        """
+        remove least recently used idle session of any kind to make room, caller closes
+        returned (session, is_admin) outside of the lock
+        """
+        candidates = [
+            (sessions[0][1], key) for key, sessions in self._idle.items() if sessions
+        ]
+        if not candidates:
+            return None
+        _, key = min(candidates)
+        connection, _ = self._idle[key].pop(0)
+        return connection, key[1]
+
+    def acquire(self, db_name=None, is_admin: bool = False, timeout: float = None):
+        """
+        Borrow session, new session is opened if none is idle and pool is not full
+        Args:
+            db_name: database name, required for non-admin session
+            is_admin: borrow admin session
+            timeout: maximum time to wait for free session, None waits forever
+        Returns:
+            stardog.Connection or stardog.Admin
+        Raises:
+            TimeoutError: no session released in time
+        """
+        key = (None if is_admin else db_name, is_admin)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        candidate, evicted = None, None
+        with self._condition:
+            while True:
+                sessions = self._idle.get(key)
+                if sessions:
+                    candidate, last_used = sessions.pop()
+                    if time.monotonic() - last_used < self.health_check_interval:
+                        return candidate
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                # evicted session is replaced by the new one, size is unchanged
+                evicted = self._evict_idle()
+                if evicted is not None:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No Stardog session available")
+                self._condition.wait(remaining)
+        # network round-trips run outside of the lock, waiters are not blocked
+        if evicted is not None:
+            _close(*evicted)
+        if candidate is not None:
+            if self._healthy(candidate, is_admin):
+                return candidate
+            self.logger.info("Replacing broken Stardog session")
+            _close(candidate, is_admin)
+        try:
+            return self._connect(db_name, is_admin)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection, db_name=None, is_admin=False, discard=False):
+        """
+        Args:
+            connection: borrowed session
+            db_name: database name session was borrowed for
+            is_admin: admin session
+            discard: close session instead of returning it to pool, e.g. after error
+        """
+        key = (None if is_admin else db_name, is_admin)
+        with self._condition:
+            if discard:
+                self._size -= 1
+            else:
+                self._idle.setdefault(key, list()).append(
+                    (connection, time.monotonic())
+                )
+            self._condition.notify()
+        if discard:
+            try:
+                _close(connection, is_admin)
+            except Exception:
+                pass
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, dict()
+            for (_, is_admin), sessions in idle.items():
+                for connection, _ in sessions:
+                    self._size -= 1
+                    _close(connection, is_admin)
+            self._condition.notify_all()
+
+
+_pools = dict()
+_pools_lock = threading.Lock()
+
+
+def shared_pool(
+    config, max_size: int = POOL_SIZE, logger: logging.Logger = None
+) -> ConnectionPool:
+    """process wide pool per endpoint and user, logger of the first call is kept"""
+    key = (config.STARDOG_ENDPOINT, config.STARDOG_USERNAME)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                config, max_size=max_size, logger=logger
+            )
+        return pool
+
+
+class PooledSessions:
+    """
+    Per thread HTTP sessions of pooled database connections for engines sending raw HTTP
+    requests (transactions, streamed queries). Connection is borrowed on first use in each
+    thread and returned to pool on close. Private session is opened if pool is not given
+    or has no free connection, so engine workers never wait for each other.
+    """
+
+    def __init__(self, pool: ConnectionPool = None, db_name=None, auth=None) -> None:
+        self.pool = pool
+        self.db_name = db_name
+        self.auth = auth
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (borrowed connection or None, session)
+        self._borrowed = list()
+
+    def get(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            return session
+        connection = None
+        if self.pool is not None:
+            try:
+                connection = self.pool.acquire(self.db_name, timeout=0)
+            except TimeoutError:
+                pass
+        if connection is not None:
+            session = connection.client.session
+        else:
+            session = requests.Session()
+            session.auth = self.auth
+        self._local.session = session
+        with self._lock:
+            self._borrowed.append((connection, session))
+        return session
+
+    def close(self) -> None:
+        with self._lock:
+            borrowed, self._borrowed = self._borrowed, list()
+            self._local = threading.local()
+        for connection, session in borrowed:
+            if connection is None:
+                session.close()
+            else:
+                self.pool.release(connection, self.db_name)
 
 
 class StardogConnection:
@@ -7,23 +224,27 @@ class StardogConnection:
     Class for initializing connection with Stardog database based on environment parameters
     """
 
-    def __init__(self, config, db_name=None, is_admin=False):
+    def __init__(self, config, db_name=None, is_admin=False, pool=None, logger=None):
         self.endpoint = config.STARDOG_ENDPOINT
         self.username = config.STARDOG_USERNAME
         self.password = config.STARDOG_PASSWORD
-        self.logger = logs.setup_logger()
+        self.logger = logger or logging.getLogger("SKG")
         self.db_name = db_name
         self.is_admin = is_admin
+        self.pool = pool
         self.connection = None
 
     def __enter__(self):
+        if not self.is_admin and not self.db_name:
+            raise ValueError("db_name must be provided for non-admin connection")
+        if self.pool is not None:
+            self.connection = self.pool.acquire(self.db_name, self.is_admin)
+            return self.connection
         if self.is_admin:
             self.logger.info(f"Establishing admin connection")
             self.connection = stardog.Admin(self.endpoint, self.username, self.password)
             self.logger.info(f"Successfully established admin connection")
         else:
-            if not self.db_name:
-                raise ValueError("db_name must be provided for non-admin connection")
             self.logger.info(f"Connecting to database {self.db_name}")
             self.connection = stardog.Connection(
                 self.db_name, self.endpoint, self.username, self.password
@@ -32,7 +253,12 @@ class StardogConnection:
         return self.connection
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.is_admin:
-            self.connection.client.close()
-        else:
-            self.connection.close()
+        if self.pool is not None:
+            self.pool.release(
+                self.connection,
+                self.db_name,
+                self.is_admin,
+                discard=exc_type is not None,
+            )
+            return
+        _close(self.connection, self.is_admin)
@@ -0,0 +1,197 @@
+"""Local index of statements committed to Stardog databases, used for incremental upload
+Index keeps (database, document, statement hash, statement) rows in SQLite file. Graphs of
+new run are compared with indexed statements of the same documents, only added and removed
+statements are sent to the database. Statement shared by several documents is removed from
+the database when the last document containing it drops it.
+"""
+from __future__ import annotations
+
+import hashlib
+import pathlib
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+from src.database.results_store import JOURNAL_MODE
+from src.database.upload import (
+    DIRECTIVES,
+    Content,
+    UploadError,
+    content_type,
+    statement_lines,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    db TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    hash INTEGER NOT NULL,
+    line TEXT NOT NULL,
+    PRIMARY KEY (db, doc, hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS statements_hash ON statements (db, hash);
+"""
+
+
+def statement_hash(line: str) -> int:
+    """64-bit statement hash, fits SQLite INTEGER"""
+    digest = hashlib.blake2b(line.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+@dataclass
+class Delta:
+    adds: Dict[str, List[str]] = field(default_factory=dict)  # content type -> lines
+    removes: Dict[str, List[str]] = field(default_factory=dict)
+    documents: int = 0
+
+    @staticmethod
+    def _count(changes: Dict[str, List[str]]) -> int:
+        return sum(len(lines) for lines in changes.values())
+
+    @property
+    def added(self) -> int:
+        return self._count(self.adds)
+
+    @property
+    def removed(self) -> int:
+        return self._count(self.removes)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+class StatementIndex:
+    """
+    Statements committed to single database. Changes computed by diff are kept in open
+    SQLite transaction until commit (after successful database transaction) or rollback.
+    """
+
+    def __init__(self, path: str | pathlib.Path, database: str) -> None:
+        self.path = path
+        self.database = database
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(DISTINCT hash) FROM statements WHERE db = ?",
+            (self.database,),
+        ).fetchone()[0]
+
+    def documents(self) -> List[str]:
+        return [
+            doc
+            for (doc,) in self._conn.execute(
+                "SELECT DISTINCT doc FROM statements WHERE db = ? ORDER BY doc",
+                (self.database,),
+            )
+        ]
+
+    def _indexed(self, hash_: int) -> bool:
+        return (
+            self._conn.execute(
+                "SELECT 1 FROM statements WHERE db = ? AND hash = ? LIMIT 1",
+                (self.database, hash_),
+            ).fetchone()
+            is not None
+        )
+
+    def _update(self, name: str, lines: Dict[int, str], delta: Delta, pending) -> None:
+        """
+        Replace indexed statements of document, statements which appear in or disappear
+        from whole database are recorded in pending (hash -> (added, content type, line))
+        """
+        type_ = content_type(name)
+        old = dict(
+            self._conn.execute(
+                "SELECT hash, line FROM statements WHERE db = ? AND doc = ?",
+                (self.database, name),
+            )
+        )
+        added = [(hash_, lines[hash_]) for hash_ in lines.keys() - old.keys()]
+        removed = [(hash_, old[hash_]) for hash_ in old.keys() - lines.keys()]
+        self._conn.executemany(
+            "DELETE FROM statements WHERE db = ? AND doc = ? AND hash = ?",
+            [(self.database, name, hash_) for hash_, _ in removed],
+        )
+        for hash_, line in removed:
+            if self._indexed(hash_):
+                continue
+            if pending.get(hash_, (False,))[0]:
+                del pending[hash_]  # added earlier in this run, never committed
+            else:
+                pending[hash_] = (False, type_, line)
+        for hash_, line in added:
+            if self._indexed(hash_):
+                continue
+            if hash_ in pending and not pending[hash_][0]:
+                del pending[hash_]  # removed earlier in this run, still in database
+            else:
+                pending[hash_] = (True, type_, line)
+        self._conn.executemany(
+            "INSERT INTO statements (db, doc, hash, line) VALUES (?, ?, ?, ?)",
+            [(self.database, name, hash_, line) for hash_, line in added],
+        )
+        delta.documents += bool(added or removed)
+
+    def diff(
+        self, sources: Iterable[Tuple[str, Content]], prune: bool = False
+    ) -> Delta:
+        """
+        Update index with graphs and compute database changes, call commit after changes
+        are applied to database or rollback otherwise
+        Args:
+            sources: (graph name, graph content) pairs, content with one statement per line
+            prune: sources are complete corpus, statements of indexed documents missing
+                   in sources are removed
+        Returns:
+            statements to add and remove grouped by content type
+        Raises:
+            UploadError: graph content uses Turtle directives and cannot be compared by lines
+        """
+        delta = Delta()
+        pending: Dict[int, Tuple[bool, str, str]] = dict()
+        seen = set()
+        try:
+            for name, content in sources:
+                lines = dict()
+                for line in statement_lines(content):
+                    line = line.strip()
+                    if line.startswith("#"):
+                        continue
+                    if line.startswith(DIRECTIVES):
+                        raise UploadError(
+                            f"Incremental upload requires one statement per line, {name} uses Turtle directives"
+                        )
+                    lines[statement_hash(line)] = line
+                seen.add(name)
+                self._update(name, lines, delta, pending)
+            if prune:
+                for name in set(self.documents()) - seen:
+                    self._update(name, dict(), delta, pending)
+        except Exception:
+            self.rollback()
+            raise
+        for added, type_, line in pending.values():
+            changes = delta.adds if added else delta.removes
+            changes.setdefault(type_, list()).append(line + "\n")
+        return delta
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def rollback(self) -> None:
+        self._conn.rollback()
+
+    def close(self) -> None:
+        self._conn.rollback()
+        self._conn.close()
+
+    def __enter__(self) -> StatementIndex:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
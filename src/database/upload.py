@@ -0,0 +1,491 @@
+"""Batched, concurrent and retrying graph upload using Stardog HTTP transaction API
+Graph statements are grouped into batches of bounded size, each batch is uploaded in its
+own transaction: begin -> add (gzip compressed body) -> commit. Failed transaction is rolled
+back and retried with exponential backoff. After all batches are uploaded, commit marker
+kept in separate named graph (COMMIT_GRAPH) is replaced once per upload run, query results
+cache is keyed by it together with database size.
+"""
+from __future__ import annotations
+
+import gzip
+import itertools
+import logging
+import pathlib
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+import requests
+
+from src.database.stardog_connection import ConnectionPool, PooledSessions, shared_pool
+
+UPLOAD_BATCH_SIZE = 50_000  # statements per transaction
+UPLOAD_WORKERS = 4  # concurrent transactions
+UPLOAD_RETRIES = 3
+UPLOAD_BACKOFF = 0.5  # seconds, doubled after each failed attempt
+UPLOAD_QUEUE_SIZE = 16  # graphs waiting for background upload
+
+CONTENT_TYPES = {
+    ".ttl": "text/turtle",
+    ".nt": "application/n-triples",
+    ".nq": "application/n-quads",
+}
+# Turtle directives, content using them cannot be split into batches by lines
+DIRECTIVES = ("@prefix", "@base", "PREFIX", "BASE")
+# named graph with single statement replaced by every upload run of this application,
+# the only statement added by the application outside of document graphs
+COMMIT_GRAPH = "urn:skg:meta"
+COMMIT_PREDICATE = "urn:skg:commit"
+
+
+class UploadError(Exception):
+    pass
+
+
+def encode(lines: List[str], compress: bool) -> bytes:
+    data = "".join(lines).encode("utf-8")
+    return gzip.compress(data, compresslevel=5) if compress else data
+
+
+def commit_marker() -> str:
+    """N-Quads statement with new unique commit marker"""
+    return f'<{COMMIT_GRAPH}> <{COMMIT_PREDICATE}> "{uuid.uuid4().hex}" <{COMMIT_GRAPH}> .\n'
+
+
+@dataclass
+class UploadBatch:
+    index: int
+    content_type: str
+    statements: int
+    sources: List[str]
+    lines: List[str] = field(repr=False)
+
+    def payload(self, compress: bool) -> bytes:
+        return encode(self.lines, compress)
+
+
+@dataclass
+class UploadResult:
+    batches: int = 0
+    statements: int = 0
+    failed: List[UploadBatch] = field(default_factory=list)
+    # errors which stopped reading sources, e.g. graph which cannot be split
+    errors: List[str] = field(default_factory=list)
+
+
+def retryable(error: requests.RequestException) -> bool:
+    """client errors (e.g. authentication, missing database) are not retried"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code in (
+            408,
+            409,
+            429,
+        )
+    return True
+
+
+def content_type(name: str) -> str:
+    return CONTENT_TYPES.get(pathlib.PurePath(name).suffix, CONTENT_TYPES[".ttl"])
+
+
+# graph content, whole text or lines streamed e.g. from open file
+Content = Union[str, Iterable[str]]
+
+
+def statement_lines(content: Content) -> Iterator[str]:
+    """non-empty lines of graph content without line endings, read lazily from iterable"""
+    lines = content.splitlines() if isinstance(content, str) else content
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            yield line
+
+
+def batches(
+    sources: Iterable[Tuple[str, Content]], batch_size: int = UPLOAD_BATCH_SIZE
+) -> Iterator[UploadBatch]:
+    """
+    Split graphs into batches of at most batch_size statements (one statement per line,
+    as written by rdf_writer). Small graphs of the same content type share batch, graphs
+    starting with Turtle directives are never split. Graph content is consumed line by
+    line, only pending batches are kept in memory.
+    Args:
+        sources: (graph name, graph content) pairs, None flushes pending batches
+        batch_size: maximum number of statements per batch
+    Returns:
+        batches in sources order
+    Raises:
+        UploadError: Turtle directive follows statements already batched
+    """
+    pending = dict()  # content type -> batch
+    index = 0
+    for source in sources:
+        if source is None:
+            yield from sorted(pending.values(), key=lambda batch: batch.index)
+            pending = dict()
+            continue
+        name, content = source
+        type_ = content_type(name)
+        lines = statement_lines(content)
+        first = next(lines, None)
+        if first is None:
+            continue
+        if first.startswith(DIRECTIVES):
+            whole = [first + "\n"] + [line + "\n" for line in lines]
+            yield UploadBatch(index, type_, len(whole), [name], whole)
+            index += 1
+            continue
+        for line in itertools.chain([first], lines):
+            if line.startswith(DIRECTIVES):
+                raise UploadError(
+                    f"{name} uses Turtle directives after statements and cannot be split"
+                )
+            batch = pending.get(type_)
+            if batch is None:
+                batch = pending[type_] = UploadBatch(index, type_, 0, [], [])
+                index += 1
+            batch.lines.append(line + "\n")
+            batch.statements += 1
+            if name not in batch.sources:
+                batch.sources.append(name)
+            if batch.statements >= batch_size:
+                yield pending.pop(type_)
+    yield from sorted(pending.values(), key=lambda batch: batch.index)
+
+
+class UploadEngine:
+    """
+    Upload graphs to Stardog database with several concurrent transactions
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        database: str,
+        username: str = None,
+        password: str = None,
+        logger: logging.Logger = None,
+        batch_size: int = UPLOAD_BATCH_SIZE,
+        workers: int = UPLOAD_WORKERS,
+        retries: int = UPLOAD_RETRIES,
+        backoff: float = UPLOAD_BACKOFF,
+        timeout: float = 300.0,
+        compress: bool = True,
+        pool: ConnectionPool = None,
+    ) -> None:
+        self.url = f"{endpoint.rstrip('/')}/{database}"
+        self.auth = (username, password) if username is not None else None
+        self.logger = logger or logging.getLogger("SKG")
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.compress = compress
+        # HTTP sessions of pooled connections, private sessions without pool
+        self._sessions = PooledSessions(pool, database, self.auth)
+
+    @staticmethod
+    def from_config(
+        config, database: str, pool: ConnectionPool = None, **kwargs
+    ) -> UploadEngine:
+        """sessions are borrowed from given pool, process wide pool by default"""
+        if pool is None:
+            pool = shared_pool(config, logger=kwargs.get("logger"))
+        return UploadEngine(
+            config.STARDOG_ENDPOINT,
+            database,
+            config.STARDOG_USERNAME,
+            config.STARDOG_PASSWORD,
+            pool=pool,
+            **kwargs,
+        )
+
+    def _session(self) -> requests.Session:
+        """HTTP session (kept alive connection) per worker thread"""
+        return self._sessions.get()
+
+    def _post(self, path: str, **kwargs) -> requests.Response:
+        response = self._session().post(
+            f"{self.url}/{path}", timeout=self.timeout, **kwargs
+        )
+        response.raise_for_status()
+        return response
+
+    def _headers(self, content_type: str) -> Dict[str, str]:
+        headers = {"Content-Type": content_type}
+        if self.compress:
+            headers["Content-Encoding"] = "gzip"
+        return headers
+
+    def _mark(self, transaction: str) -> None:
+        """replace commit marker within transaction"""
+        self._post(f"{transaction}/clear", params={"graph-uri": COMMIT_GRAPH})
+        self._post(
+            f"{transaction}/add",
+            data=encode([commit_marker()], self.compress),
+            headers=self._headers(CONTENT_TYPES[".nq"]),
+        )
+
+    def _mark_transaction(self) -> None:
+        transaction = self._post("transaction/begin").text.strip()
+        try:
+            self._mark(transaction)
+            self._post(f"transaction/commit/{transaction}")
+        except Exception:
+            try:
+                self._post(f"transaction/rollback/{transaction}")
+            except requests.RequestException:
+                pass
+            raise
+
+    def mark(self) -> None:
+        """
+        Replace commit marker in its own transaction, called once after upload run
+        Raises:
+            UploadError: all attempts failed
+        """
+        self._retry(self._mark_transaction, "Commit marker update")
+
+    def _transaction(self, batch: UploadBatch) -> None:
+        transaction = self._post("transaction/begin").text.strip()
+        try:
+            self._post(
+                f"{transaction}/add",
+                data=batch.payload(self.compress),
+                headers=self._headers(batch.content_type),
+            )
+            self._post(f"transaction/commit/{transaction}")
+        except Exception:
+            try:
+                self._post(f"transaction/rollback/{transaction}")
+            except requests.RequestException:
+                pass
+            raise
+
+    def _retry(self, action, description: str) -> None:
+        """
+        Run action, retried with exponential backoff
+        Raises:
+            UploadError: all attempts failed
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                return action()
+            except requests.RequestException as e:
+                if attempt == self.retries or not retryable(e):
+                    raise UploadError(
+                        f"{description} failed after {attempt + 1} attempts. "
+                        f"Details: {str(e)}"
+                    ) from e
+                delay = self.backoff * 2**attempt
+                self.logger.warning(
+                    f"{description} failed, retrying in {delay:.1f}s. Details: {str(e)}"
+                )
+                time.sleep(delay)
+
+    def send(self, batch: UploadBatch) -> UploadBatch:
+        """
+        Upload batch in single transaction, retried with exponential backoff
+        Raises:
+            UploadError: all attempts failed
+        """
+        self._retry(
+            lambda: self._transaction(batch),
+            f"Batch {batch.index} ({', '.join(batch.sources)}) upload",
+        )
+        return batch
+
+    def _changes(
+        self, transaction: str, operation: str, changes: Dict[str, List[str]]
+    ) -> None:
+        for type_, lines in changes.items():
+            for start in range(0, len(lines), self.batch_size):
+                self._post(
+                    f"{transaction}/{operation}",
+                    data=encode(lines[start : start + self.batch_size], self.compress),
+                    headers=self._headers(type_),
+                )
+
+    def _delta_transaction(
+        self, adds: Dict[str, List[str]], removes: Dict[str, List[str]]
+    ) -> None:
+        transaction = self._post("transaction/begin").text.strip()
+        try:
+            self._changes(transaction, "remove", removes)
+            self._changes(transaction, "add", adds)
+            self._mark(transaction)
+            self._post(f"transaction/commit/{transaction}")
+        except Exception:
+            try:
+                self._post(f"transaction/rollback/{transaction}")
+            except requests.RequestException:
+                pass
+            raise
+
+    def apply(self, adds: Dict[str, List[str]], removes: Dict[str, List[str]]) -> None:
+        """
+        Add and remove statements in single transaction, large changes are sent in
+        several requests of at most batch_size statements
+        Args:
+            adds: content type -> statement lines to add
+            removes: content type -> statement lines to remove
+        Raises:
+            UploadError: all attempts failed
+        """
+        self._retry(lambda: self._delta_transaction(adds, removes), "Graph update")
+
+    def upload(self, sources: Iterable[Tuple[str, Content]]) -> UploadResult:
+        """
+        Args:
+            sources: (graph name, graph content) pairs, consumed lazily
+        Returns:
+            upload summary, failed batches and errors stopping upload of remaining
+            sources are reported instead of raised
+        """
+        result = UploadResult()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = dict()
+
+            def collect(futures) -> None:
+                for future in futures:
+                    batch = running.pop(future)
+                    try:
+                        future.result()
+                    except UploadError as e:
+                        result.failed.append(batch)
+                        self.logger.error(str(e))
+                        continue
+                    result.batches += 1
+                    result.statements += batch.statements
+                    self.logger.info(
+                        f"Uploaded batch {batch.index}: {batch.statements} statements "
+                        f"from {', '.join(batch.sources)} "
+                        f"[{result.statements} statements, {time.perf_counter() - start:.1f}s]"
+                    )
+
+            try:
+                for batch in batches(sources, self.batch_size):
+                    # bounded number of batches kept in memory
+                    if len(running) >= 2 * self.workers:
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    running[executor.submit(self.send, batch)] = batch
+            except UploadError as e:
+                result.errors.append(str(e))
+            collect(list(running))
+        if result.batches:
+            try:
+                self.mark()
+            except UploadError as e:
+                self.logger.warning(
+                    f"{str(e)} Cached query results may be stale until they expire."
+                )
+        return result
+
+    def upload_files(self, paths: Iterable[str | pathlib.Path]) -> UploadResult:
+        def read() -> Iterator[Tuple[str, Content]]:
+            # file is consumed by batches before the next one is opened
+            for path in map(pathlib.Path, paths):
+                with open(path, encoding="utf-8") as fd:
+                    yield path.name, fd
+
+        return self.upload(read())
+
+    def close(self) -> None:
+        self._sessions.close()
+
+    def __enter__(self) -> UploadEngine:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class BackgroundUploader:
+    """
+    Upload graphs in background thread while producer generates next graphs. Graphs are
+    passed through bounded queue, producer is blocked when uploader falls behind.
+    """
+
+    _DONE = object()
+
+    def __init__(self, engine: UploadEngine, maxsize: int = UPLOAD_QUEUE_SIZE) -> None:
+        self.engine = engine
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(
+            target=self._run, name="background-uploader", daemon=True
+        )
+
+    def start(self) -> BackgroundUploader:
+        self.thread.start()
+        return self
+
+    def _sources(self) -> Iterator[Tuple[str, str] | None]:
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                # producer is busy, upload what is already queued instead of waiting
+                yield None
+                item = self.queue.get()
+            if item is self._DONE:
+                return
+            yield item
+
+    def _run(self) -> None:
+        try:
+            self.result = self.engine.upload(self._sources())
+        except Exception as e:
+            self.error = e
+
+    def _offer(self, item) -> bool:
+        """put item into queue unless background thread stopped"""
+        while self.thread.is_alive():
+            try:
+                self.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def put(self, name: str, content: str) -> None:
+        """
+        Args:
+            name: graph name
+            content: graph content
+        Raises:
+            UploadError: background upload stopped with error
+        """
+        if not self._offer((name, content)):
+            raise UploadError(f"Background upload stopped. Details: {self.error}")
+
+    def close(self) -> UploadResult:
+        """
+        Wait until all queued graphs are uploaded
+        Returns:
+            upload summary
+        Raises:
+            UploadError: background upload stopped with error
+        """
+        if self._offer(self._DONE):
+            self.thread.join()
+        self.engine.close()
+        if self.error is not None:
+            raise UploadError(
+                f"Background upload stopped. Details: {self.error}"
+            ) from self.error
+        return self.result
+
+    def __enter__(self) -> BackgroundUploader:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -1,7 +1,20 @@
+from __future__ import annotations
+
+import ast
+import collections
 import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from src.application.common import BINARY_RESULTS_FORMAT
+from src.nlp.results_io import load_results
 from src.nlp.triples import SVO, SPO
 
-full_path = os.path.join(os.path.dirname(os.getcwd()), "results\information")
+SVO_SUFFIX = "_svo.txt"
+SPO_SUFFIX = "_spo.txt"
+RESULTS_SUFFIXES = (SVO_SUFFIX, SPO_SUFFIX, BINARY_RESULTS_FORMAT)
+IN_FLIGHT_PER_WORKER = 2  # parsed documents submitted ahead of consumer per process
 
 
 def get_results(path):
@@ -10,27 +23,100 @@ def get_results(path):
     Args:
         path: full path to the corresponding directory
     Returns:
-        turtle_file: turtle file of a graph for each information
+        rdf_triples: list of svo and spo triples for each information directory
     """
 
-    svo = []
-    spo = []
-    rdf_triples = []
-    for directory, subdirectory, files in os.walk(path):
-        for file in files:
-            file_path = os.path.join(directory, file)
-            if file.endswith("_svo.txt"):
-                svo = convert_txt_to_svo(file_path)
-            elif file.endswith("_spo.txt"):
-                spo = convert_txt_to_spo(file_path)
+    return [triples for _, triples in iter_documents(path)]
 
-        if svo != [] or spo != []:
-            triples = svo + spo
-            svo = []
-            spo = []
-            rdf_triples.append(triples)
 
-    return rdf_triples
+def find_documents(path: str | pathlib.Path) -> List[Tuple[str, List[str]]]:
+    """
+    Find extracted information files (text or binary format) grouped by document
+    Args:
+        path: results 'information' directory
+    Returns:
+        (document name, result files) sorted by document name
+    """
+    documents = dict()
+    for directory, _, files in os.walk(path):
+        for file in sorted(files):
+            for suffix in RESULTS_SUFFIXES:
+                if file.endswith(suffix):
+                    name = file[: -len(suffix)]
+                    documents.setdefault(name, list()).append(
+                        os.path.join(directory, file)
+                    )
+    return sorted(documents.items())
+
+
+def load_document(files: List[str]) -> List[SVO | SPO]:
+    """
+    Args:
+        files: extracted information files of single document
+    Returns:
+        svo and spo triples
+    """
+    triples = list()
+    for file in files:
+        if file.endswith(SVO_SUFFIX):
+            triples.extend(convert_txt_to_svo(file))
+        elif file.endswith(SPO_SUFFIX):
+            triples.extend(convert_txt_to_spo(file))
+        elif file.endswith(BINARY_RESULTS_FORMAT):
+            _, store = load_results(file)
+            triples.extend(store)
+    return triples
+
+
+def iter_documents(
+    path: str | pathlib.Path, workers: int = 1
+) -> Iterator[Tuple[str, List[SVO | SPO]]]:
+    """
+    Stream triples of documents from results directory, documents are parsed in parallel
+    but yielded in stable (document name) order. At most IN_FLIGHT_PER_WORKER documents
+    per worker are parsed ahead of consumer.
+    Args:
+        path: results 'information' directory
+        workers: number of parsing processes
+    Returns:
+        (document name, triples) pairs
+    """
+    documents = find_documents(path)
+    names = [name for name, _ in documents]
+    files = [files for _, files in documents]
+    if workers <= 1 or len(documents) <= 1:
+        yield from zip(names, map(load_document, files))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # sliding window of submitted documents, results of finished documents waiting
+        # for slower consumer are bounded
+        pending = collections.deque()
+        for name, document in zip(names, files):
+            pending.append((name, executor.submit(load_document, document)))
+            if len(pending) >= IN_FLIGHT_PER_WORKER * workers:
+                name, future = pending.popleft()
+                yield name, future.result()
+        while pending:
+            name, future = pending.popleft()
+            yield name, future.result()
+
+
+def parse_attrs(value: str) -> str | List[str]:
+    """
+    Restore SPO attributes saved with Python list representation
+    Args:
+        value: attributes column content
+    Returns:
+        list of attributes or plain string
+    """
+    if value.startswith("[") and value.endswith("]"):
+        try:
+            attrs = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return value
+        if isinstance(attrs, list):
+            return [str(attr) for attr in attrs]
+    return value
 
 
 def convert_txt_to_svo(file_path):
@@ -42,20 +128,20 @@ def convert_txt_to_svo(file_path):
         svo_list: list of svo triples
     """
 
-    file = open(file_path, "r", encoding="utf-8")
     svo_list = []
-    for line in file:
-        line = line.strip()
-        if line:
-            elem_svo = line.split(";")
-            svo = SVO(
-                subj=elem_svo[0].strip(),
-                verb=elem_svo[1].strip(),
-                obj=elem_svo[2].strip(),
-                subj_ner=elem_svo[3].strip(),
-                obj_ner=elem_svo[4].strip(),
-            )
-            svo_list.append(svo)
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                elem_svo = line.split(";")
+                svo = SVO(
+                    subj=elem_svo[0].strip(),
+                    verb=elem_svo[1].strip(),
+                    obj=elem_svo[2].strip(),
+                    subj_ner=elem_svo[3].strip(),
+                    obj_ner=elem_svo[4].strip(),
+                )
+                svo_list.append(svo)
 
     return svo_list
 
@@ -69,24 +155,21 @@ def convert_txt_to_spo(file_path):
         spo_list: list of spo triples
     """
 
-    file = open(file_path, "r", encoding="utf-8")
     spo_list = []
-    for line in file:
-        line = line.strip()
-        if line:
-            elem_spo = line.split(";")
-            spo = SPO(
-                subj=elem_spo[0].strip(),
-                subj_attrs=elem_spo[3].strip(),
-                subj_ner=elem_spo[5].strip(),
-                pred=elem_spo[1].strip(),
-                obj=elem_spo[2].strip(),
-                obj_attrs=elem_spo[4].strip(),
-                obj_ner=elem_spo[6].strip(),
-            )
-            spo_list.append(spo)
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                elem_spo = line.split(";")
+                spo = SPO(
+                    subj=elem_spo[0].strip(),
+                    subj_attrs=parse_attrs(elem_spo[3].strip()),
+                    subj_ner=elem_spo[5].strip(),
+                    pred=elem_spo[1].strip(),
+                    obj=elem_spo[2].strip(),
+                    obj_attrs=parse_attrs(elem_spo[4].strip()),
+                    obj_ner=elem_spo[6].strip(),
+                )
+                spo_list.append(spo)
 
     return spo_list
-
-
-get_results(full_path)
@@ -0,0 +1,121 @@
+import argparse
+import itertools
+import logging
+import os.path
+import sys
+import time
+import typing
+
+from src.application import common, logs
+from src.knowledge_graph.query import LocalGraph, QuerySyntaxError, parse_query
+
+
+def get_help_epilog():
+    return """
+Examples:
+    Find libraries used by modules in graphs generated by application
+    python -m src.knowledge_graph.main query --graph results "?module :use ?library . ?library a :LIBRARY"
+    Execute SPARQL-like query from the file on the results store
+    python -m src.knowledge_graph.main query --graph results/results.sqlite --query_path example.rq
+"""
+
+
+def query_command(args: argparse.Namespace, logger: logging.Logger) -> int:
+    if args.query_path is not None:
+        with open(args.query_path, encoding="utf-8") as fd:
+            text = fd.read()
+    elif args.query is not None:
+        text = args.query
+    else:
+        logger.error("Missing query, provide query text or --query_path.")
+        return 1
+    try:
+        variables, patterns = parse_query(text)
+    except QuerySyntaxError as e:
+        logger.error(f"Invalid query. Details: {str(e)}")
+        return 1
+    start = time.perf_counter()
+    graph = LocalGraph()
+    for path in args.graph:
+        graph.load(path)
+    logger.info(
+        f"Loaded {len(graph)} triples in {time.perf_counter() - start:.3f} seconds"
+    )
+    start = time.perf_counter()
+    solutions = itertools.islice(graph.query(patterns), args.limit)
+    print("\t".join(variables))
+    count = 0
+    for solution in solutions:
+        print("\t".join(solution.get(variable, "") for variable in variables))
+        count += 1
+    logger.info(
+        f"Query returned {count} results in {time.perf_counter() - start:.3f} seconds"
+    )
+    return 0
+
+
+def run_app(
+    args: argparse.Namespace,
+    argv: typing.List[str],
+    logger: logging.Logger,
+    environment: common.Environment,
+) -> int:
+    if args.command == "query":
+        return query_command(args, logger)
+    logger.error("Missing command.")
+    return 1
+
+
+def main(argv: typing.List[str], logger=None, environment=None) -> int:
+    if logger is None:
+        logger = logs.setup_logger()
+    if environment is None:
+        environment = common.Environment.from_env(os.environ)
+    parser = argparse.ArgumentParser(
+        description="This is a command line tool for exploring generated knowledge graphs offline",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    query = subparsers.add_parser(
+        "query",
+        help="run basic graph pattern query on local graph",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    query.add_argument(
+        "--graph",
+        action="append",
+        required=True,
+        metavar="path",
+        help="graph file (.ttl, .nt, .nq), results store or results directory to query, "
+        "can be repeated",
+    )
+    query.add_argument(
+        "--query_path",
+        type=str,
+        help="specifies path to the file with query to execute",
+    )
+    query.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="maximum number of returned results",
+    )
+    query.add_argument(
+        "query",
+        nargs="?",
+        help="""triple patterns separated by '.', optionally wrapped in 'SELECT ?vars WHERE { ... }'.
+Terms: ?variable, <iri>, "literal", 'a' (rdf:type) and prefixed names
+':' (application namespace), 'rdf:', 'rdfs:', 'dbr:' (DBpedia resource)""",
+    )
+    parser.epilog = get_help_epilog()
+    return run_app(parser.parse_args(argv[1:]), argv, logger, environment)
+
+
+if __name__ == "__main__":
+    if sys.version_info[:2] < (3, 8):
+        sys.exit(
+            "Python {}.{}.{} is not supported. You should run app with Python 3.8 or later".format(
+                *sys.version_info[:3]
+            )
+        )
+    sys.exit(main(sys.argv))
@@ -0,0 +1,300 @@
+"""Local in-memory graph with triple indexes and basic graph pattern queries
+Terms are kept in N-Triples syntax ('<iri>' and '"literal"'), the same form as written by
+rdf_writer, so generated graphs are loaded without RDF parser.
+"""
+from __future__ import annotations
+
+import os
+import pathlib
+import re
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from src.application.common import GRAPH_FORMAT, QUADS_FORMAT, RESULTS_DATABASE
+from src.knowledge_graph.rdf_writer import DBPEDIA, PREFIX, RDF_TYPE
+
+PREFIXES = {
+    "": PREFIX,
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "dbr": DBPEDIA,
+}
+
+TERM = r'<[^>]*>|"(?:[^"\\]|\\.)*"(?:@[\w-]+|\^\^<[^>]*>)?|_:\S+'
+STATEMENT = re.compile(rf"^\s*({TERM})\s+({TERM})\s+({TERM})\s*(?:({TERM})\s*)?\.\s*$")
+TOKEN = re.compile(rf"{TERM}|\?\w+|[{{}}.]|[^\s{{}}]*[^\s{{}}.]")
+
+Triple = Tuple[str, str, str]
+Pattern = Tuple[str, str, str]
+Bindings = Dict[str, str]
+
+
+class QuerySyntaxError(Exception):
+    pass
+
+
+def _add(index: Dict[str, Dict[str, Set[str]]], first: str, second: str, third: str):
+    index.setdefault(first, dict()).setdefault(second, set()).add(third)
+
+
+def is_variable(term: str) -> bool:
+    return term.startswith("?")
+
+
+class LocalGraph:
+    """
+    Triples indexed by subject (spo), predicate (pos) and object (osp), each pattern with
+    at least one bound term is answered by index lookup.
+    """
+
+    def __init__(self) -> None:
+        self.spo: Dict[str, Dict[str, Set[str]]] = dict()
+        self.pos: Dict[str, Dict[str, Set[str]]] = dict()
+        self.osp: Dict[str, Dict[str, Set[str]]] = dict()
+        # predicate -> number of triples, cardinality estimate for query planning
+        self.predicates: Dict[str, int] = dict()
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, subject: str, predicate: str, object_: str) -> bool:
+        """
+        Returns:
+            True if triple was added, False if graph already contains triple
+        """
+        if object_ in self.spo.get(subject, {}).get(predicate, ()):
+            return False
+        _add(self.spo, subject, predicate, object_)
+        _add(self.pos, predicate, object_, subject)
+        _add(self.osp, object_, subject, predicate)
+        self.predicates[predicate] = self.predicates.get(predicate, 0) + 1
+        self.count += 1
+        return True
+
+    def add_text(self, content: str, source: str = "<data>") -> int:
+        """
+        Args:
+            content: N-Triples or N-Quads statements (graph name is ignored)
+            source: content origin used in error messages
+        Returns:
+            number of added triples
+        Raises:
+            ValueError: line is not N-Triples/N-Quads statement
+        """
+        added = 0
+        for number, line in enumerate(content.splitlines(), start=1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            statement = STATEMENT.match(line)
+            if statement is None:
+                raise ValueError(f"{source}:{number}: invalid statement")
+            added += self.add(*statement.groups()[:3])
+        return added
+
+    def load(self, path: str | pathlib.Path) -> int:
+        """
+        Load graph file, results store or directory with graph files and results stores
+        Args:
+            path: .ttl, .nt, .nq file, results store database or directory
+        Returns:
+            number of added triples
+        """
+        path = pathlib.Path(path)
+        if path.is_dir():
+            added = 0
+            for root, _, files in os.walk(path):
+                for file in sorted(files):
+                    file = pathlib.Path(root).joinpath(file)
+                    if file.name == RESULTS_DATABASE or file.suffix in (
+                        GRAPH_FORMAT,
+                        QUADS_FORMAT,
+                        ".nt",
+                    ):
+                        added += self.load(file)
+            return added
+        if path.name == RESULTS_DATABASE:
+            from src.database.results_store import ResultsStore
+
+            with ResultsStore(path) as store:
+                return sum(
+                    self.add_text(content, source=f"{path}:{name}")
+                    for name, _, content in store.graphs()
+                )
+        with open(path, encoding="utf-8") as fd:
+            content = fd.read()
+        try:
+            return self.add_text(content, source=str(path))
+        except ValueError:
+            if path.suffix != GRAPH_FORMAT:
+                raise
+        return self._load_turtle(path)
+
+    def _load_turtle(self, path: pathlib.Path) -> int:
+        """full Turtle syntax (prefixes, abbreviations) handled by rdflib"""
+        from rdflib import Graph
+
+        graph = Graph().parse(str(path), format="turtle")
+        return sum(self.add(s.n3(), p.n3(), o.n3()) for s, p, o in graph)
+
+    def match(
+        self, subject: str = None, predicate: str = None, object_: str = None
+    ) -> Iterator[Triple]:
+        """
+        Args:
+            subject, predicate, object_: bound terms, None matches any term
+        Returns:
+            matching triples
+        """
+        if subject is not None:
+            predicates = self.spo.get(subject, {})
+            if predicate is not None:
+                objects = predicates.get(predicate, ())
+                if object_ is not None:
+                    if object_ in objects:
+                        yield subject, predicate, object_
+                    return
+                for o in objects:
+                    yield subject, predicate, o
+                return
+            if object_ is not None:
+                for p in self.osp.get(object_, {}).get(subject, ()):
+                    yield subject, p, object_
+                return
+            for p, objects in predicates.items():
+                for o in objects:
+                    yield subject, p, o
+            return
+        if predicate is not None:
+            objects = self.pos.get(predicate, {})
+            if object_ is not None:
+                for s in objects.get(object_, ()):
+                    yield s, predicate, object_
+                return
+            for o, subjects in objects.items():
+                for s in subjects:
+                    yield s, predicate, o
+            return
+        if object_ is not None:
+            for s, predicates in self.osp.get(object_, {}).items():
+                for p in predicates:
+                    yield s, p, object_
+            return
+        for s, predicates in self.spo.items():
+            for p, objects in predicates.items():
+                for o in objects:
+                    yield s, p, o
+
+    def types(self, entity: str) -> Set[str]:
+        """rdf:type objects of entity"""
+        return set(self.spo.get(entity, {}).get(RDF_TYPE, ()))
+
+    def instances(self, type_: str) -> Set[str]:
+        """subjects with rdf:type type_"""
+        return set(self.pos.get(RDF_TYPE, {}).get(type_, ()))
+
+    def _estimate(self, pattern: Pattern, bindings: Bindings) -> int:
+        subject, predicate, object_ = (
+            bindings.get(term, None) if is_variable(term) else term for term in pattern
+        )
+        if subject is not None:
+            return len(self.spo.get(subject, ()))
+        if object_ is not None:
+            return len(self.osp.get(object_, ()))
+        if predicate is not None:
+            return self.predicates.get(predicate, 0)
+        return self.count
+
+    def query(self, patterns: Iterable[Pattern]) -> Iterator[Bindings]:
+        """
+        Basic graph pattern matching, most selective pattern is evaluated first
+        Args:
+            patterns: (subject, predicate, object) with N-Triples terms or '?variables'
+        Returns:
+            variable bindings of each solution
+        """
+        yield from self._solve(list(patterns), dict())
+
+    def _solve(self, patterns: List[Pattern], bindings: Bindings) -> Iterator[Bindings]:
+        if not patterns:
+            yield dict(bindings)
+            return
+        pattern = min(patterns, key=lambda p: self._estimate(p, bindings))
+        rest = [p for p in patterns if p is not pattern]
+        bound = [bindings.get(t) if is_variable(t) else t for t in pattern]
+        for triple in self.match(*bound):
+            extended = dict(bindings)
+            consistent = True
+            for term, value in zip(pattern, triple):
+                if is_variable(term):
+                    if extended.setdefault(term, value) != value:
+                        consistent = False
+                        break
+            if consistent:
+                yield from self._solve(rest, extended)
+
+
+def expand_term(token: str, prefixes: Dict[str, str] = None) -> str:
+    """
+    Args:
+        token: '?variable', '<iri>', '"literal"', 'a' or prefixed name e.g. ':planner', 'rdf:type'
+        prefixes: prefix -> namespace mapping
+    Returns:
+        N-Triples term or variable
+    Raises:
+        QuerySyntaxError: unknown prefix
+    """
+    if token.startswith(("?", "<", '"', "_:")):
+        return token
+    if token == "a":
+        return RDF_TYPE
+    prefixes = PREFIXES if prefixes is None else prefixes
+    prefix, separator, name = token.partition(":")
+    if not separator or prefix not in prefixes:
+        raise QuerySyntaxError(f"Unknown prefix in term '{token}'")
+    return f"<{prefixes[prefix]}{name}>"
+
+
+def parse_query(text: str) -> Tuple[List[str], List[Pattern]]:
+    """
+    Parse query: 'SELECT ?vars WHERE { patterns }' or just patterns separated by '.',
+    e.g. '?module :use ?library . ?library a :LIBRARY'
+    Returns:
+        projected variables (all variables for 'SELECT *' or plain patterns) and patterns
+    Raises:
+        QuerySyntaxError: malformed query
+    """
+    tokens = TOKEN.findall(text)
+    variables = list()
+    if tokens and tokens[0].upper() == "SELECT":
+        try:
+            where = next(
+                i for i, token in enumerate(tokens) if token.upper() in ("WHERE", "{")
+            )
+        except StopIteration:
+            raise QuerySyntaxError("Missing WHERE clause") from None
+        variables = [token for token in tokens[1:where] if token != "*"]
+        tokens = tokens[where:]
+        if tokens[0].upper() == "WHERE":
+            tokens = tokens[1:]
+        if not tokens or tokens[0] != "{" or tokens[-1] != "}":
+            raise QuerySyntaxError("Patterns must be enclosed in braces")
+        tokens = tokens[1:-1]
+    patterns, current = list(), list()
+    for token in tokens + ["."]:
+        if token != ".":
+            current.append(expand_term(token))
+            continue
+        if not current:
+            continue
+        if len(current) != 3:
+            raise QuerySyntaxError(f"Pattern must have 3 terms: {' '.join(current)}")
+        patterns.append(tuple(current))
+        current = list()
+    if not patterns:
+        raise QuerySyntaxError("Empty query")
+    if not variables:
+        for pattern in patterns:
+            for term in pattern:
+                if is_variable(term) and term not in variables:
+                    variables.append(term)
+    return variables, patterns
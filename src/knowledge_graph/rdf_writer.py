@@ -0,0 +1,275 @@
+"""Streaming RDF serialization of SVO and SPO triples
+Statements are written as N-Triples lines (valid Turtle subset) straight to the output file,
+without building intermediate Turtle document and rdflib graph. Duplicated statements are
+not written.
+"""
+from __future__ import annotations
+
+import io
+import pathlib
+from typing import Iterable, Iterator, List, TextIO, Tuple
+from urllib.parse import quote
+
+from src.nlp.triples import SVO, SPO
+
+PREFIX = "http://api.stardog.com/"
+DOCUMENT_PREFIX = PREFIX + "document/"
+DBPEDIA = "https://dbpedia.org/resource/"
+RDF_TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+RDFS_SEE_ALSO = "<http://www.w3.org/2000/01/rdf-schema#seeAlso>"
+RDFS_COMMENT = "<http://www.w3.org/2000/01/rdf-schema#comment>"
+
+# characters allowed in IRI local names without percent-encoding
+IRI_SAFE = "_-.~!$&'()*+,;=:@/"
+LITERAL_ESCAPES = str.maketrans(
+    {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+)
+
+Statement = Tuple[str, str, str]
+
+
+def local_name(term: str) -> str:
+    """IRI-safe local name, spaces are replaced with underscores"""
+    return quote(term.strip().replace(" ", "_"), safe=IRI_SAFE)
+
+
+def iri(term: str, namespace: str = PREFIX) -> str:
+    return f"<{namespace}{local_name(term)}>"
+
+
+def dbpedia_iri(term: str) -> str:
+    name = local_name(term)
+    return f"<{DBPEDIA}{name[:1].upper()}{name[1:]}>"
+
+
+def literal(text: str) -> str:
+    return f'"{text.translate(LITERAL_ESCAPES)}"'
+
+
+def _values(value: str | List[str]) -> List[str]:
+    if isinstance(value, list):
+        return [item for item in value if item]
+    return [value] if value else []
+
+
+class IRIMinter:
+    """
+    Mint RDF terms for a single graph. Every term is escaped once (memo tables),
+    entity description statements (DBpedia link, types, comments) and repeated
+    relations are emitted once per graph.
+    """
+
+    def __init__(self) -> None:
+        self._iris = dict()
+        self._dbpedia = dict()
+        self._literals = dict()
+        self._described = set()
+        self._emitted = set()
+
+    def iri(self, term: str) -> str:
+        minted = self._iris.get(term)
+        if minted is None:
+            minted = self._iris[term] = iri(term)
+        return minted
+
+    def dbpedia_iri(self, term: str) -> str:
+        minted = self._dbpedia.get(term)
+        if minted is None:
+            minted = self._dbpedia[term] = dbpedia_iri(term)
+        return minted
+
+    def literal(self, text: str) -> str:
+        minted = self._literals.get(text)
+        if minted is None:
+            minted = self._literals[text] = literal(text)
+        return minted
+
+    def reset(self) -> None:
+        """start new graph, memo tables are kept"""
+        self._described = set()
+        self._emitted = set()
+
+    def _once(self, statement: Statement) -> bool:
+        if statement in self._emitted:
+            return False
+        self._emitted.add(statement)
+        return True
+
+    def _describe(self, entity: str, term: str) -> Iterator[Statement]:
+        if entity not in self._described:
+            self._described.add(entity)
+            yield entity, RDFS_SEE_ALSO, self.dbpedia_iri(term)
+
+    def statements(self, triple: SVO | SPO) -> Iterator[Statement]:
+        """
+        Map SVO/SPO triple to RDF statements: relation between subject and object,
+        DBpedia links, named entity types and SPO attributes comments
+        Args:
+            triple: SVO or SPO triple
+        Returns:
+            (subject, predicate, object) statements with N-Triples terms, not emitted
+            before by this minter
+        """
+        if not triple.subj or not triple.obj:
+            return
+        subject = self.iri(triple.subj)
+        object_ = self.iri(triple.obj)
+        relation = triple.verb if isinstance(triple, SVO) else triple.pred
+        if relation:
+            statement = (subject, self.iri(relation), object_)
+            if self._once(statement):
+                yield statement
+        yield from self._describe(subject, triple.subj)
+        yield from self._describe(object_, triple.obj)
+        described = [
+            (subject, RDF_TYPE, self.iri(ner)) for ner in _values(triple.subj_ner)
+        ]
+        described.extend(
+            (object_, RDF_TYPE, self.iri(ner)) for ner in _values(triple.obj_ner)
+        )
+        if isinstance(triple, SPO):
+            described.extend(
+                (subject, RDFS_COMMENT, self.literal(attr))
+                for attr in _values(triple.subj_attrs)
+            )
+            described.extend(
+                (object_, RDFS_COMMENT, self.literal(attr))
+                for attr in _values(triple.obj_attrs)
+            )
+        for statement in described:
+            if self._once(statement):
+                yield statement
+
+
+def statements(triple: SVO | SPO) -> Iterator[Statement]:
+    """RDF statements of single triple, see IRIMinter.statements"""
+    return IRIMinter().statements(triple)
+
+
+def write_statements(
+    statements_: Iterable[Statement], fd: TextIO, graph: str = None
+) -> int:
+    """
+    Args:
+        statements_: RDF statements
+        fd: output text stream
+        graph: named graph IRI, if provided statements are written as N-Quads
+    Returns:
+        number of written statements
+    """
+    count = 0
+    suffix = f" {graph} .\n" if graph else " .\n"
+    for subject, predicate, object_ in statements_:
+        fd.write(f"{subject} {predicate} {object_}{suffix}")
+        count += 1
+    return count
+
+
+def write_graph(
+    triples: Iterable[SVO | SPO], destination: pathlib.Path, validate: bool = False
+) -> int:
+    """
+    Serialize triples into RDF graph file
+    Args:
+        triples: SVO and SPO triples
+        destination: output file path
+        validate: parse written file with rdflib to check syntax
+    Returns:
+        number of written statements
+    Raises:
+        Exception: rdflib parser error if validation is requested and graph is invalid
+    """
+    minter = IRIMinter()
+    with open(destination, "w", encoding="utf-8") as fd:
+        count = write_statements(
+            (
+                statement
+                for triple in triples
+                for statement in minter.statements(triple)
+            ),
+            fd,
+        )
+    if validate:
+        validate_graph(destination)
+    return count
+
+
+def serialize_graph(triples: Iterable[SVO | SPO]) -> str:
+    """
+    Serialize triples into RDF graph kept in memory, see write_graph
+    Returns:
+        graph content
+    """
+    minter = IRIMinter()
+    fd = io.StringIO()
+    write_statements(
+        (statement for triple in triples for statement in minter.statements(triple)),
+        fd,
+    )
+    return fd.getvalue()
+
+
+def validate_graph(path: pathlib.Path) -> None:
+    from rdflib import ConjunctiveGraph
+
+    ConjunctiveGraph().parse(
+        str(path), format="nquads" if path.suffix == ".nq" else "turtle"
+    )
+
+
+def validate_content(content: str) -> None:
+    from rdflib import ConjunctiveGraph
+
+    ConjunctiveGraph().parse(data=content, format="turtle")
+
+
+class CorpusGraph:
+    """
+    Accumulate statements of all documents into one deduplicated corpus graph file.
+    Each (subject, predicate, object) statement is written once for whole corpus.
+    With provenance statements are written as N-Quads into per document named graphs,
+    then statement is written once per document.
+    """
+
+    def __init__(self, destination: pathlib.Path, provenance: bool = False) -> None:
+        self.destination = destination
+        self.provenance = provenance
+        self.minter = IRIMinter()
+        self.count = 0
+        self.documents = 0
+        self._fd = open(destination, "w", encoding="utf-8")
+
+    def add_document(self, name: str, triples: Iterable[SVO | SPO]) -> int:
+        """
+        Args:
+            name: document name, used for named graph IRI
+            triples: document SVO and SPO triples
+        Returns:
+            number of statements written for document
+        """
+        graph = None
+        if self.provenance:
+            self.minter.reset()
+            graph = iri(name, namespace=DOCUMENT_PREFIX)
+        count = write_statements(
+            (
+                statement
+                for triple in triples
+                for statement in self.minter.statements(triple)
+            ),
+            self._fd,
+            graph=graph,
+        )
+        self.count += count
+        self.documents += 1
+        return count
+
+    def close(self) -> None:
+        if not self._fd.closed:
+            self._fd.close()
+
+    def __enter__(self) -> CorpusGraph:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
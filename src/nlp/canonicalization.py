@@ -0,0 +1,279 @@
+"""Entity canonicalization, maps surface variants of entity ('path planner', 'Path planner',
+'path planners', 'Path Planners') onto single canonical form before graph generation.
+Single capitalized words ('Windows') are proper nouns and are not singularized.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import pathlib
+from typing import Callable, Dict, Iterable, List, Sequence, TypeVar
+
+from src.nlp.triples import SVO, SPO
+
+SIMILARITY_THRESHOLD = 0.9
+# suffixes which look like plural but are not, e.g. 'process', 'status', 'analysis'
+NOT_PLURAL = ("ss", "us", "is")
+# words ending with plural suffix which are singular (or have no singular form)
+NOT_PLURAL_WORDS = frozenset(
+    (
+        "series",
+        "species",
+        "news",
+        "means",
+        "physics",
+        "mathematics",
+        "electronics",
+        "economics",
+        "ethics",
+        "lens",
+        "gas",
+        "canvas",
+        "alias",
+        "bias",
+        "atlas",
+        "chassis",
+        "headquarters",
+        "whereabouts",
+    )
+)
+
+Vectorizer = Callable[[Sequence[str]], "numpy.ndarray"]
+Triple = TypeVar("Triple", SVO, SPO)
+
+
+def singular(word: str) -> str:
+    """
+    Rule based English plural to singular conversion
+    Args:
+        word: word in its original case
+    Returns:
+        singular form, capitalized words (proper nouns e.g. 'Windows', 'Kubernetes',
+        acronyms e.g. 'GPS') and NOT_PLURAL_WORDS are returned unchanged
+    """
+    if word != word.lower() or word in NOT_PLURAL_WORDS:
+        return word
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(NOT_PLURAL):
+        return word[:-1]
+    return word
+
+
+def normalize(term: str) -> str:
+    """
+    Args:
+        term: entity surface form
+    Returns:
+        lower case form with collapsed whitespace and singular head (last) word
+    """
+    words = term.split()
+    if words:
+        head = words[-1]
+        # title case head of multi-word term belongs to capitalized phrase ('Path Planners'),
+        # single capitalized word is kept as proper noun, acronyms are kept
+        if len(words) > 1 and head.istitle() and not head.isupper():
+            head = head.lower()
+        words[-1] = singular(head)
+    return " ".join(words).lower()
+
+
+def block(key: str) -> str:
+    """similarity pass compares only keys sharing first word"""
+    return key.split(" ", 1)[0]
+
+
+def spacy_vectorizer(model) -> Vectorizer:
+    """
+    Args:
+        model: spaCy language model (preferably with static word vectors, e.g. 'en_core_web_lg')
+    Returns:
+        function mapping batch of terms to matrix of document vectors
+    """
+    import numpy as np
+
+    def vectorize(terms: Sequence[str]):
+        return np.array([doc.vector for doc in model.pipe(terms)], dtype=np.float32)
+
+    return vectorize
+
+
+class CanonicalMapError(Exception):
+    pass
+
+
+class Canonicalizer:
+    """
+    Term -> canonical term mapping. Terms with equal normalized form share canonical term
+    (first seen surface form). With vectorizer, new normalized forms are compared in
+    batches with known forms from the same block using cosine similarity.
+    """
+
+    def __init__(
+        self,
+        mapping: Dict[str, str] = None,
+        vectorize: Vectorizer = None,
+        threshold: float = SIMILARITY_THRESHOLD,
+    ) -> None:
+        self.mapping: Dict[str, str] = dict()
+        # normalized form -> canonical term
+        self.keys: Dict[str, str] = dict()
+        self.vectorize = vectorize
+        self.threshold = threshold
+        # block -> (normalized forms, unit vectors)
+        self._vectors: Dict[str, tuple] = dict()
+        for term, canonical in (mapping or {}).items():
+            self.mapping[term] = canonical
+            self.keys.setdefault(normalize(canonical), canonical)
+            self.keys.setdefault(normalize(term), canonical)
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def canonical(self, term: str) -> str:
+        if term not in self.mapping:
+            self.update([term])
+        return self.mapping[term]
+
+    def update(self, terms: Iterable[str]) -> None:
+        """
+        Assign canonical terms to unknown terms
+        Args:
+            terms: entity surface forms
+        """
+        pending: Dict[str, List[str]] = dict()
+        for term in terms:
+            if not term or term in self.mapping:
+                continue
+            key = normalize(term)
+            if key in self.keys:
+                self.mapping[term] = self.keys[key]
+            else:
+                pending.setdefault(key, list()).append(term)
+        if pending and self.vectorize is not None:
+            self._merge_similar(pending)
+        for key, surfaces in pending.items():
+            canonical = self.keys.setdefault(key, surfaces[0])
+            for surface in surfaces:
+                self.mapping[surface] = canonical
+
+    def _unit_vectors(self, keys: Sequence[str]):
+        import numpy as np
+
+        vectors = np.asarray(self.vectorize(keys), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def _block_vectors(self, blocks: Iterable[str]) -> None:
+        """vectorize known forms of blocks seen first time, e.g. loaded from mapping file"""
+        import numpy as np
+
+        missing = set(blocks) - self._vectors.keys()
+        if not missing:
+            return
+        known = [key for key in self.keys if block(key) in missing]
+        vectors = self._unit_vectors(known) if known else None
+        for name in missing:
+            rows = [i for i, key in enumerate(known) if block(key) == name]
+            self._vectors[name] = (
+                [known[i] for i in rows],
+                vectors[rows] if rows else np.zeros((0, 0), dtype=np.float32),
+            )
+
+    def _merge_similar(self, pending: Dict[str, List[str]]) -> None:
+        """
+        Assign canonical terms to new normalized forms, form similar to known or earlier
+        form of batch shares its canonical term, otherwise first surface form is used
+        """
+        import numpy as np
+
+        keys = list(pending)
+        self._block_vectors(block(key) for key in keys)
+        vectors = self._unit_vectors(keys)
+        by_block: Dict[str, List[int]] = dict()
+        for i, key in enumerate(keys):
+            by_block.setdefault(block(key), list()).append(i)
+        for name, rows in by_block.items():
+            known, matrix = self._vectors[name]
+            new = vectors[rows]
+            similarity = new @ matrix.T if len(known) else None
+            # similarity between new forms of block, only earlier forms are candidates
+            inner = new @ new.T
+            for position, row in enumerate(rows):
+                best, score = None, self.threshold
+                if similarity is not None:
+                    candidate = int(np.argmax(similarity[position]))
+                    if similarity[position, candidate] >= score:
+                        best = known[candidate]
+                        score = similarity[position, candidate]
+                if position:
+                    candidate = int(np.argmax(inner[position, :position]))
+                    if inner[position, candidate] >= score:
+                        best = keys[rows[candidate]]
+                key = keys[row]
+                if best is None:
+                    self.keys[key] = pending[key][0]
+                else:
+                    self.keys[key] = self.keys[best]
+            self._vectors[name] = (
+                known + [keys[row] for row in rows],
+                np.vstack([matrix, new]) if len(known) else new,
+            )
+
+    def apply(self, triples: Iterable[Triple]) -> List[Triple]:
+        """
+        Args:
+            triples: SVO or SPO triples
+        Returns:
+            copies of triples with canonical subjects and objects
+        """
+        triples = list(triples)
+        self.update(term for triple in triples for term in (triple.subj, triple.obj))
+        canonical = list()
+        for triple in triples:
+            triple = copy.copy(triple)
+            triple.subj = self.mapping.get(triple.subj, triple.subj)
+            triple.obj = self.mapping.get(triple.obj, triple.obj)
+            canonical.append(triple)
+        return canonical
+
+    @staticmethod
+    def load(
+        path: str | pathlib.Path,
+        vectorize: Vectorizer = None,
+        threshold: float = SIMILARITY_THRESHOLD,
+    ) -> Canonicalizer:
+        """
+        Args:
+            path: mapping file saved by previous run, new mapping is created if file does not exist
+            vectorize: optional vectorizer for similarity pass
+            threshold: cosine similarity threshold
+        Returns:
+            canonicalizer
+        Raises:
+            CanonicalMapError: mapping file is not readable JSON object of terms
+        """
+        mapping = dict()
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as fd:
+                    mapping = json.load(fd)
+            except (OSError, ValueError) as e:
+                raise CanonicalMapError(
+                    f"Invalid canonical map {path}. Details: {str(e)}"
+                )
+            if not isinstance(mapping, dict) or not all(
+                isinstance(canonical, str) for canonical in mapping.values()
+            ):
+                raise CanonicalMapError(
+                    f"Invalid canonical map {path}. Details: expected JSON object "
+                    "mapping terms to canonical terms"
+                )
+        return Canonicalizer(mapping, vectorize=vectorize, threshold=threshold)
+
+    def save(self, path: str | pathlib.Path) -> None:
+        with open(path, "w", encoding="utf-8") as fd:
+            json.dump(self.mapping, fd, indent=2, ensure_ascii=False, sort_keys=True)
@@ -0,0 +1,159 @@
+"""Split long documents into sentence aligned chunks
+"""
+from __future__ import annotations
+
+import mmap
+import pathlib
+import re
+from typing import Generator, List, Tuple
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+WHITESPACE = re.compile(r"\s+")
+# boundaries in UTF-8 encoded text, ASCII bytes never occur inside multi-byte characters
+PARAGRAPH_BOUNDARY_BYTES = re.compile(rb"\n[ \t\r\f\v]*\n")
+SENTENCE_BOUNDARY_BYTES = re.compile(rb"[.!?]\s")
+WHITESPACE_BYTES = re.compile(rb"\s")
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Find sentences boundaries
+    Args:
+        text: document content
+    Returns:
+        (start, end) character offsets of sentences
+    """
+    spans, start = list(), 0
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        spans.append((start, boundary.start()))
+        start = boundary.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def _split_long_sentence(
+    text: str, start: int, end: int, max_chars: int
+) -> List[Tuple[int, int]]:
+    """split sentence exceeding chunk size on whitespaces (hard split if no whitespace found)"""
+    spans = list()
+    while end - start > max_chars:
+        split = start + max_chars
+        whitespaces = [
+            m.start() for m in WHITESPACE.finditer(text, start + 1, start + max_chars)
+        ]
+        if whitespaces:
+            split = whitespaces[-1]
+        spans.append((start, split))
+        start = split
+        while start < end and text[start].isspace():
+            start += 1
+    if start < end:
+        spans.append((start, end))
+    return spans
+
+
+def _bounded_sentence_spans(
+    text: str, max_chars: int
+) -> Generator[Tuple[int, int], None, None]:
+    for start, end in sentence_spans(text):
+        yield from _split_long_sentence(text, start, end, max_chars)
+
+
+def sentences(text: str, max_chars: int) -> Generator[Tuple[str, int], None, None]:
+    """
+    Iterate over document sentences, sentences longer than max_chars are split on whitespaces
+    Args:
+        text: document content
+        max_chars: maximum sentence length in characters
+    Returns:
+        (sentence, offset of the sentence in text) tuples
+    """
+    for start, end in _bounded_sentence_spans(text, max_chars):
+        yield text[start:end], start
+
+
+def sentence_chunks(
+    text: str, max_chars: int, overlap: int = 1
+) -> Generator[Tuple[str, int], None, None]:
+    """
+    Group consecutive sentences into chunks not longer than max_chars
+    Args:
+        text: document content
+        max_chars: maximum chunk length in characters
+        overlap: number of trailing sentences repeated at the beginning of the next chunk,
+                 gives context for entities placed on chunk boundaries
+    Returns:
+        (chunk, offset of the chunk in text) tuples, ready for Language.pipe(as_tuples=True)
+    """
+    sentences_ = list(_bounded_sentence_spans(text, max_chars))
+
+    first = 0
+    while first < len(sentences_):
+        last = first
+        while (
+            last + 1 < len(sentences_)
+            and sentences_[last + 1][1] - sentences_[first][0] <= max_chars
+        ):
+            last += 1
+        start, end = sentences_[first][0], sentences_[last][1]
+        yield text[start:end], start
+        if last + 1 >= len(sentences_):
+            break
+        first = max(first + 1, last + 1 - overlap)
+
+
+def _last_boundary(buffer, pattern: re.Pattern, start: int, end: int) -> int:
+    """end offset of the last pattern match in buffer[start:end], -1 if not found"""
+    last = -1
+    for match in pattern.finditer(buffer, start, end):
+        last = match.end()
+    return last
+
+
+def _window_end(buffer, start: int, max_bytes: int) -> int:
+    """
+    End of window starting at start, paragraph boundary preferred over sentence boundary,
+    sentence boundary over whitespace. Boundaries are searched in second half of window,
+    windows without any boundary are split on UTF-8 character boundary.
+    """
+    end = start + max_bytes
+    if end >= len(buffer):
+        return len(buffer)
+    middle = start + max_bytes // 2
+    for pattern in (
+        PARAGRAPH_BOUNDARY_BYTES,
+        SENTENCE_BOUNDARY_BYTES,
+        WHITESPACE_BYTES,
+    ):
+        boundary = _last_boundary(buffer, pattern, middle, end)
+        if boundary > start:
+            return boundary
+    while end > start + 1 and buffer[end] & 0xC0 == 0x80:  # UTF-8 continuation byte
+        end -= 1
+    return end
+
+
+def text_windows(
+    path: str | pathlib.Path, max_bytes: int
+) -> Generator[Tuple[str, int], None, None]:
+    """
+    Iterate over memory mapped UTF-8 text file in paragraph/sentence aligned windows,
+    only the window under processing is decoded into str
+    Args:
+        path: decoded text file
+        max_bytes: maximum window size in bytes
+    Returns:
+        (window text, byte offset of the window in file) tuples
+    """
+    with open(path, "rb") as fd:
+        if pathlib.Path(path).stat().st_size == 0:
+            return
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            start = 0
+            while start < len(buffer):
+                end = _window_end(buffer, start, max_bytes)
+                window = buffer[start:end].decode("utf-8", errors="replace").strip()
+                if window:
+                    yield window, start
+                start = end
@@ -1,7 +1,6 @@
 from typing import List, Tuple
 
 import spacy
-import crosslingual_coreference
 from spacy import Language
 
 from src.sources import NLP
@@ -14,6 +13,8 @@ def compile_nlp(
     lang = spacy.load(model)
     ner = None
     if PIPELINE.CROSS_COREF in pipeline:
+        import crosslingual_coreference  # registers "xx_coref" factory
+
         lang.add_pipe(
             "xx_coref",
             config={
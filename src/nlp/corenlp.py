@@ -0,0 +1,57 @@
+"""CoreNLP server availability check
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from nltk.parse.corenlp import CoreNLPParser
+
+VALIDATION_TEXT = "Validation phase"
+VALIDATION_PROPERTIES = {"annotators": "tokenize,ssplit,pos"}
+
+# health check results cached per server url for the process lifetime
+_health_checks = dict()
+_lock = threading.Lock()
+
+
+def _probe(tagger: CoreNLPParser, timeout: float) -> bool:
+    try:
+        tagger.api_call(
+            VALIDATION_TEXT, properties=VALIDATION_PROPERTIES, timeout=timeout
+        )
+    except Exception:
+        return False
+    return True
+
+
+def check_corenlp(tagger: CoreNLPParser, timeout: float = 2.0) -> Future:
+    """
+    Start non-blocking CoreNLP server health check
+    Args:
+        tagger: CoreNLP parser pointing to the server
+        timeout: connection and response timeout in seconds
+    Returns:
+        future resolved with server availability, shared by all callers
+        asking for the same server
+    """
+    with _lock:
+        health = _health_checks.get(tagger.url)
+        if health is None:
+            executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="corenlp-health"
+            )
+            health = executor.submit(_probe, tagger, timeout)
+            executor.shutdown(wait=False)
+            _health_checks[tagger.url] = health
+    return health
+
+
+def is_corenlp_available(tagger: CoreNLPParser, timeout: float = 2.0) -> bool:
+    """
+    Wait for (cached) CoreNLP server health check result
+    Args:
+        tagger: CoreNLP parser pointing to the server
+        timeout: connection and response timeout in seconds
+    Returns:
+        True if server is able to tag text, False otherwise
+    """
+    return check_corenlp(tagger, timeout).result()
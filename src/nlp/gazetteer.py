@@ -0,0 +1,140 @@
+"""Gazetteer of known named entities, labels closed vocabulary terms without statistical model
+"""
+from __future__ import annotations
+
+import os
+import pathlib
+from typing import Dict, Iterator, List, Tuple
+
+import spacy
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc, Span
+from spacy.util import filter_spans
+
+from src.application.common import BINARY_RESULTS_FORMAT
+from src.nlp.information_extraction import RESOLVED
+from src.nlp.results_io import load_results
+
+# <subj>;<verb>;<obj>;<subj_ner>;<obj_ner> lines written by information extraction step
+SVO_RESULTS_SUFFIX = "_svo.txt"
+
+
+class Gazetteer:
+    """
+    Phrase matcher over known term -> label vocabulary.
+    Term list file format: one '<term>;<label>' entry per line.
+    """
+
+    def __init__(self, terms: Dict[str, str]) -> None:
+        self.terms = terms
+        self.tokenizer = spacy.blank("en")
+        self.matcher = PhraseMatcher(self.tokenizer.vocab, attr="LOWER")
+        by_label = dict()
+        for term, label in terms.items():
+            by_label.setdefault(label, list()).append(term)
+        for label, label_terms in by_label.items():
+            self.matcher.add(
+                label, list(self.tokenizer.tokenizer.pipe(label_terms, batch_size=1000))
+            )
+        # statistics of last routing
+        self.matched = 0
+        self.routed = 0
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def match(self, text: str) -> Tuple[Doc, List[Span]]:
+        """
+        Label known terms in text
+        Args:
+            text: sentence
+        Returns:
+            tokenized sentence and non-overlapping labeled spans (longest wins)
+        """
+        doc = self.tokenizer.make_doc(text)
+        spans = [
+            Span(doc, start, end, label=match_id)
+            for match_id, start, end in self.matcher(doc)
+        ]
+        return doc, filter_spans(spans)
+
+    @staticmethod
+    def requires_model(doc: Doc, spans: List[Span]) -> bool:
+        """
+        Decide if statistical model has to be run on sentence: no gazetteer hit or
+        capitalized token (except sentence start) not covered by gazetteer
+        """
+        if not spans:
+            return True
+        covered = set()
+        for span in spans:
+            covered.update(range(span.start, span.end))
+        for token in doc[1:]:
+            if token.i in covered or token.is_punct:
+                continue
+            if token.text[:1].isupper():
+                return True
+        return False
+
+    @staticmethod
+    def from_file(path: str | pathlib.Path) -> Gazetteer:
+        terms = dict()
+        with open(path, encoding="utf-8") as fd:
+            for line in fd:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                term, label = line.rsplit(";", 1)
+                terms[term.strip()] = label.strip()
+        return Gazetteer(terms)
+
+    @staticmethod
+    def from_results(directory: str | pathlib.Path) -> Gazetteer:
+        """
+        Mine vocabulary from NER columns of previous runs results
+        Args:
+            directory: results directory searched recursively for *_svo.txt and
+                binary results files
+        Returns:
+            gazetteer
+        """
+        terms = dict()
+        for root, _, files in os.walk(directory):
+            for file in files:
+                path = os.path.join(root, file)
+                if file.endswith(SVO_RESULTS_SUFFIX):
+                    entities = Gazetteer._text_entities(path)
+                elif file.endswith(BINARY_RESULTS_FORMAT):
+                    entities = (
+                        (triple.subj, triple.obj, triple.subj_ner, triple.obj_ner)
+                        for triple in load_results(path)[1].svo()
+                    )
+                else:
+                    continue
+                for subj, obj, subj_ner, obj_ner in entities:
+                    for term, label in ((subj, subj_ner), (obj, obj_ner)):
+                        if term and label and label != RESOLVED.upper():
+                            terms.setdefault(term, label)
+        return Gazetteer(terms)
+
+    @staticmethod
+    def _text_entities(path: str) -> Iterator[Tuple[str, str, str, str]]:
+        with open(path, encoding="utf-8") as fd:
+            for line in fd:
+                columns = [column.strip() for column in line.split(";")]
+                if len(columns) != 5:
+                    continue
+                subj, _, obj, subj_ner, obj_ner = columns
+                yield subj, obj, subj_ner, obj_ner
+
+    @staticmethod
+    def load(path: str | pathlib.Path) -> Gazetteer:
+        """
+        Args:
+            path: term list file or directory with previous runs results
+        Returns:
+            gazetteer
+        """
+        if pathlib.Path(path).is_dir():
+            return Gazetteer.from_results(path)
+        return Gazetteer.from_file(path)
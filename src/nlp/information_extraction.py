@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import List, Tuple, Optional, Set
+from typing import Generator, List, Tuple, Optional, Set
 
 import nltk.tokenize
 from nltk.parse.corenlp import CoreNLPParser
@@ -9,6 +9,7 @@ from nltk.tree import ParentedTree
 from scipy.stats import norm
 from spacy import Language
 
+from src.nlp.chunking import sentence_chunks, sentences
 from src.nlp.tfidf import FUNCTION_WORDS
 from src.nlp.triples import SVO, SPO
 from src.nlp.triples import WordAttr
@@ -37,6 +38,11 @@ EXECUTION_UNIT = ["COMPUTING PLATFORM", "PROCESSING UNIT"]
 DATA_STRUCTURE = ["DATA STRUCTURE"]
 AS_MODULE = ["AUTONOMOUS VEHICLE MODULE"]
 
+"""named entity recognition chunking, characters per chunk and chunks per batch
+"""
+NER_CHUNK_SIZE = 100_000
+NER_BATCH_SIZE = 8
+
 
 def content_filtering(sentences: List[str], patterns: List[str]):
     content_related = list()
@@ -55,14 +61,21 @@ def threshold(distribution: List[int]) -> Tuple[int, int]:
     return 2, int(mean + mean * 2)
 
 
-def filter_sents(sentences: List[str]):
-    distribution = list()
-    for sent in sentences:
-        words = nltk.tokenize.word_tokenize(sent)
-        distribution.append(len(words))
+def filter_sents(sentences: List[str], bounds: Tuple[int, int] = None):
+    """
+    Args:
+        sentences: sentences to filter
+        bounds: (lower, upper) sentence length in words, computed from sentences if not provided
+    """
+    if bounds is None:
+        distribution = list()
+        for sent in sentences:
+            words = nltk.tokenize.word_tokenize(sent)
+            distribution.append(len(words))
+        bounds = threshold(distribution)
 
     # filter
-    lower_bound, upper_bound = threshold(distribution)
+    lower_bound, upper_bound = bounds
     filtered_sents = list()
     for sent in sentences:
         if lower_bound < len(nltk.tokenize.word_tokenize(sent)) < upper_bound:
@@ -128,6 +141,7 @@ def classify(desc: str, entities) -> str:
 
 def svo_triples(svo_ls: List[str], model: Language, ner: Language) -> List[SVO]:
     triples = []
+    seen = set()
     for svo in svo_ls:
         svo_obj = SVO()
         if len(svo.split()) == 3:
@@ -169,12 +183,13 @@ def svo_triples(svo_ls: List[str], model: Language, ner: Language) -> List[SVO]:
                     svo_obj.obj_ner = ent.label_
         if svo_obj.invalid():
             continue
-        if svo_obj in triples:
+        if svo_obj in seen:
             continue
         if svo_obj.subj == RESOLVED:
             svo_obj.subj_ner = RESOLVED.upper()
         if svo_obj.obj == RESOLVED:
             svo_obj.obj = RESOLVED.upper()
+        seen.add(svo_obj)
         triples.append(svo_obj)
     return triples
 
@@ -183,7 +198,7 @@ def spo(text: List[str], tagger: CoreNLPParser, ner: Language) -> Set[SPO]:
     spo_ls = list()
     for sent in text:
         triplet = spo_extract(sent, tagger, ner)
-        if triplet and triplet not in spo_ls:
+        if triplet:
             spo_ls.append(triplet)
     return set(spo_ls)
 
@@ -292,16 +307,116 @@ def get_attributes(word) -> List[str]:
     return clean_attrs
 
 
-def named_entity_recognition(text: str, model: Language) -> Set[SVO]:
-    ner = model(text)
+def named_entity_recognition(
+    text: str,
+    model: Language,
+    chunk_size: int = NER_CHUNK_SIZE,
+    batch_size: int = NER_BATCH_SIZE,
+    gazetteer=None,
+) -> Set[SVO]:
+    """
+    Run NER over sentence aligned chunks of the document streamed through model.pipe,
+    memory stays flat regardless of document length and model max_length is never exceeded.
+    Entities found twice in overlapping chunk boundaries are linked once, of overlapping
+    spans (e.g. entity cut at the end of one chunk and complete in the next) the longer
+    is kept.
+    Args:
+        text: documentation content
+        model: named entity recognition model
+        chunk_size: maximum chunk length in characters
+        batch_size: number of chunks processed by model at once
+        gazetteer: optional known terms gazetteer, sentences fully explained by gazetteer
+                   are not processed by the statistical model
+    Returns:
+        linked entities
+    """
+    if model is None and gazetteer is None:
+        return set()
+    if model is not None:
+        chunk_size = min(chunk_size, model.max_length)
     svo_ls = list()
-    for entity in ner.ents:
-        linked_entities = assembly_ner(entity)
-        if linked_entities:
-            svo_ls.extend(linked_entities)
+    seen = set()
+    # entities of overlapping chunks, linked once no later chunk can contain them
+    pending = dict()
+
+    def link(entities, offset: int) -> None:
+        for entity in entities:
+            span = (
+                offset + entity.start_char,
+                offset + entity.end_char,
+                entity.label_,
+            )
+            if span in seen:
+                continue
+            seen.add(span)
+            linked_entities = assembly_ner(entity)
+            if linked_entities:
+                svo_ls.extend(linked_entities)
+
+    def resolve(entities, offset: int) -> None:
+        for entity in entities:
+            start, end = offset + entity.start_char, offset + entity.end_char
+            overlapping = [
+                span for span in pending if span[0] < end and start < span[1]
+            ]
+            if any(span[1] - span[0] >= end - start for span in overlapping):
+                continue
+            for span in overlapping:
+                del pending[span]
+            pending[(start, end, entity.label_)] = entity
+
+    def flush(offset: int = None) -> None:
+        """link pending entities which ended before offset (all if offset is None)"""
+        for span in list(pending):
+            if offset is None or span[1] <= offset:
+                linked_entities = assembly_ner(pending.pop(span))
+                if linked_entities:
+                    svo_ls.extend(linked_entities)
+
+    if gazetteer is None:
+        chunks = sentence_chunks(text, chunk_size)
+    else:
+        chunks = gazetteer_routing(text, chunk_size, gazetteer, link)
+    if model is None:
+        for _ in chunks:
+            continue
+        return set(svo_ls)
+    for doc, offset in model.pipe(chunks, as_tuples=True, batch_size=batch_size):
+        if gazetteer is None:
+            # entities which ended before current chunk can not be overlapped again
+            flush(offset)
+            resolve(doc.ents, offset)
+        else:
+            # sentences routed by gazetteer do not overlap
+            link(doc.ents, offset)
+    flush()
     return set(svo_ls)
 
 
+def gazetteer_routing(
+    text: str, max_chars: int, gazetteer, link
+) -> Generator[Tuple[str, int], None, None]:
+    """
+    Link known terms found by gazetteer and pass through only sentences which need statistical model
+    Args:
+        text: documentation content
+        max_chars: maximum sentence length in characters
+        gazetteer: known terms gazetteer
+        link: callback linking labeled spans found at given offset
+    Returns:
+        (sentence, offset) tuples to process by statistical model
+    """
+    gazetteer.matched, gazetteer.routed = 0, 0
+    for sentence, offset in sentences(text, max_chars):
+        doc, spans = gazetteer.match(sentence)
+        if spans:
+            gazetteer.matched += 1
+            link(spans, offset)
+        if gazetteer.requires_model(doc, spans):
+            gazetteer.routed += 1
+            yield sentence, offset
+
+
 def assembly_ner(entity) -> List[SVO]:
     svo_ls = list()
     if (
@@ -1,24 +1,27 @@
+from __future__ import annotations
+
+import dataclasses
 import pathlib
 import time
-from typing import Tuple, Set, List
+from typing import Callable, Iterable, Tuple, Set, List
 
-import networkx as nx
 import nltk.tokenize
-import pandas as pd
-from matplotlib import pyplot as plt
 from nltk import CoreNLPParser
 
 from src.application import logs
 from src.application.common import NLP_PIPELINE_JOBS, PIPELINE
 from src.nlp.compile import compile_nlp
+from src.nlp.corenlp import check_corenlp
 from src.nlp.cross_coref import cross_coref
+from src.nlp.gazetteer import Gazetteer
 from src.nlp.information_extraction import (
     content_filtering,
     filter_sents,
-    svo,
-    spo,
     named_entity_recognition,
+    threshold,
 )
+from src.nlp.parallel import ParallelExtractor
+from src.nlp.scheduler import SharedModel, Stage, StageScheduler
 from src.nlp.pre_processing import (
     remove_whitespace_characters,
     remove_unicode,
@@ -29,6 +32,11 @@ from src.nlp.triples import SVO, SPO
 
 
 def dummy_save(svo_, spo_, file):
+    # visualization is optional, keep plotting stack out of the import path
+    import networkx as nx
+    import pandas as pd
+    from matplotlib import pyplot as plt
+
     edge = []
     subj = []
     obj = []
@@ -70,6 +78,10 @@ class NLPJobRunner:
         model="en_core_web_sm",
         compile_on: str = "CPU",
         operating_system: str = "linux",
+        corenlp_timeout: float = 2.0,
+        workers: int = 1,
+        gazetteer: str | pathlib.Path = None,
+        svo_processes: int = 1,
     ):
         self.logger = logger
         self.pipeline = NLP_PIPELINE_JOBS if pipeline is None else pipeline
@@ -79,17 +91,27 @@ class NLPJobRunner:
             else "http://0.0.0.0:9000"
         )
         self.pos_tagger = CoreNLPParser(url=url, tagtype="pos")
-        try:
-            self.pos_tagger.parse("Validation phase")
-        except Exception:
-            if PIPELINE.SPO in self.pipeline:
-                self.pipeline.remove(PIPELINE.SPO)
-                self.logger.warn(
-                    "CoreNLP engine is not working, skipping SPO extraction step."
-                )
+        # server validation overlaps with language models loading
+        corenlp_health = (
+            check_corenlp(self.pos_tagger, corenlp_timeout)
+            if PIPELINE.SPO in self.pipeline
+            else None
+        )
         self.logger.info("Compiling NLP pipeline toolkit...")
         self.lang, self.ner = compile_nlp(model, self.pipeline, compile_on)
+        # stages running concurrently share models through serialized calls
+        self._shared_lang = SharedModel(self.lang)
+        self._shared_ner = SharedModel(self.ner) if self.ner is not None else None
         self.logger.info(f"Toolkit loaded successfully: model {model}")
+        self.gazetteer = None
+        if gazetteer and PIPELINE.NER in self.pipeline:
+            self.gazetteer = Gazetteer.load(gazetteer)
+            self.logger.info(f"Gazetteer loaded: {len(self.gazetteer)} known terms")
+        if corenlp_health is not None and not corenlp_health.result():
+            self.pipeline.remove(PIPELINE.SPO)
+            self.logger.warn(
+                "CoreNLP engine is not working, skipping SPO extraction step."
+            )
 
         # docs file text
         self.documentation = None
@@ -102,142 +124,316 @@ class NLPJobRunner:
         self.svo = set()
         self.spo = set()
 
+        self.timings = list()
+
         # parameters
         self.tfidf_top = tfidf_param
+        self.workers = workers
+        self.extractor = ParallelExtractor(model, workers, processes=svo_processes)
 
     def execute(
-        self, text: str, save: pathlib.Path = None
+        self,
+        text: str,
+        save: pathlib.Path = None,
+        ranking: List[Tuple[str, int]] = None,
+        bounds: Tuple[int, int] = None,
     ) -> Tuple[List[Tuple[str, int]], Set[SPO], Set[SVO]]:
-        self.documentation = text
-        start = time.time()
-        if PIPELINE.CLEAN in self.pipeline:
-            self.documentation = remove_whitespace_characters(self.documentation)
-            self.documentation = remove_unicode(self.documentation)
+        """
+        Args:
+            text: document text
+            save: graph visualization destination
+            ranking: term frequencies used instead of the ones computed from text, e.g.
+                     ranking of whole document when text is its window
+            bounds: sentence length bounds of batch stage used instead of the ones
+                    computed from text
+        Returns:
+            term frequencies, SPO and SVO triples
+        """
+        pipeline = set(self.pipeline)
+        if PIPELINE.TOKENIZE not in pipeline:
+            self.logger.error(
+                f"Invalid pipeline setup, {PIPELINE.TOKENIZE} not found, required for further execution."
+            )
+            pipeline &= {PIPELINE.CLEAN, PIPELINE.CROSS_COREF, PIPELINE.TFIDF}
+        scheduler = StageScheduler(
+            self.stages(pipeline, ranking, bounds), max_workers=self.workers
+        )
+        try:
+            data = scheduler.run({"text": text})
+        except RuntimeError as e:
+            self.logger.error(str(e))
+            return list(), set(), set()
+        finally:
+            self.timings = [
+                dataclasses.asdict(timing)
+                for timing in sorted(scheduler.timings, key=lambda t: t.start)
+            ]
+
+        self.documentation = data["documentation"]
+        self.tfidf = data["tfidf"]
+        self.sentences = data["batch"]
+        self.filtered_content = data["filtered_content"]
+        self.spo = data["spo"]
+        self.svo = data["svo"]
+        if data["named_entities"]:
+            self.svo.update(data["named_entities"])
+
+        if save and (self.svo or self.spo):
+            dummy_save(self.svo, self.spo, save)
+
+        return self.tfidf, self.spo, self.svo
+
+    def statistics(
+        self, windows: Iterable[str]
+    ) -> Tuple[List[Tuple[str, int]], Tuple[int, int] | None]:
+        """
+        Term frequencies and batch sentence length bounds of whole document computed
+        window by window, text is preprocessed like in clean stage (coreference
+        resolution is not applied)
+        Returns:
+            (term frequencies, sentence length bounds) of document
+        """
+        frequencies = dict()  # insertion order keeps ties ordered like in single read
+        lengths = list()
+        for window in windows:
+            if PIPELINE.CLEAN in self.pipeline:
+                window = remove_unicode(remove_whitespace_characters(window))
+            if PIPELINE.TFIDF in self.pipeline:
+                for term, count in tfidf(window):
+                    frequencies[term] = frequencies.get(term, 0) + count
+            if PIPELINE.BATCH in self.pipeline:
+                lengths.extend(
+                    len(nltk.tokenize.word_tokenize(sentence))
+                    for sentence in nltk.tokenize.sent_tokenize(window)
+                )
+        ranking = sorted(frequencies.items(), key=lambda item: item[1], reverse=True)
+        return ranking, threshold(lengths) if lengths else None
+
+    def execute_windows(
+        self, windows: Callable[[], Iterable[str]], save: pathlib.Path = None
+    ) -> Tuple[List[Tuple[str, int]], Set[SPO], Set[SVO]]:
+        """
+        Run pipeline on consecutive windows of large document and merge results. Term
+        frequencies and sentence length distribution of whole document are computed in
+        first pass over windows and used by content filtering and batch stages of every
+        window, so sentences are selected like in single read. Coreference resolution and
+        sentence tokenization do not cross window boundaries, triples depending on
+        context of previous window may differ from single read.
+        Args:
+            windows: callable returning document text windows, e.g. chunking.text_windows,
+                     called twice
+            save: graph visualization destination
+        Returns:
+            the same as execute for whole document
+        """
+        ranking, bounds = self.statistics(windows())
+        spo, svo, timings = set(), set(), list()
+        sentences, filtered_content = list(), list()
+        for window in windows():
+            _, spo_, svo_ = self.execute(window, ranking=ranking, bounds=bounds)
+            spo.update(spo_)
+            svo.update(svo_)
+            sentences.extend(self.sentences)
+            filtered_content.extend(self.filtered_content)
+            timings.extend(self.timings)
+        self.tfidf, self.spo, self.svo, self.timings = ranking, spo, svo, timings
+        self.sentences, self.filtered_content = sentences, filtered_content
+        if save and (self.svo or self.spo):
+            dummy_save(self.svo, self.spo, save)
+        return self.tfidf, self.spo, self.svo
+
+    def stages(
+        self,
+        pipeline: Set[str],
+        ranking: List[Tuple[str, int]] = None,
+        bounds: Tuple[int, int] = None,
+    ) -> List[Stage]:
+        """
+        Declare information extraction stages, stage not enabled in pipeline passes its input through
+        Args:
+            pipeline: enabled pipeline jobs
+            ranking: precomputed term frequencies returned by term frequencies stage
+            bounds: precomputed sentence length bounds used by batch stage
+        Returns:
+            stages with explicit inputs and outputs
+        """
+
+        def clean(text):
+            start = time.time()
+            if PIPELINE.CLEAN not in pipeline:
+                self.logger.warn("Skipping text preprocessing job.")
+                return {"cleaned": text}
+            text = remove_whitespace_characters(text)
+            text = remove_unicode(text)
             self.logger.info(
                 f"Text preprocessing execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.warn("Skipping text preprocessing job.")
-        start = time.time()
-        if PIPELINE.CROSS_COREF in self.pipeline:
-            try:
-                self.documentation = cross_coref(self.documentation, self.lang)
-                self.documentation = remove_quotes_and_apostrophes(self.documentation)
-                self.logger.info(
-                    f"Coreference resolution execution time: {time.time() - start:.2f}s"
+            return {"cleaned": text}
+
+        def coreference(cleaned):
+            start = time.time()
+            if PIPELINE.CROSS_COREF not in pipeline:
+                self.logger.warn(
+                    "Skipping coreference resolution, linked entities might be corrupted."
                 )
-            except RuntimeError as e:
-                self.logger.error(str(e))
-                return list(), set(), set()
-        else:
-            self.logger.warn(
-                "Skipping coreference resolution, linked entities might be corrupted."
-            )
-        start = time.time()
-        if PIPELINE.TFIDF in self.pipeline:
-            self.tfidf = tfidf(self.documentation)
-            self.tfidf_top = (
-                self.tfidf_top
-                if self.tfidf_top < len(self.tfidf)
-                else len(self.tfidf) - 1
+                return {"documentation": cleaned}
+            documentation = cross_coref(cleaned, self._shared_lang)
+            documentation = remove_quotes_and_apostrophes(documentation)
+            self.logger.info(
+                f"Coreference resolution execution time: {time.time() - start:.2f}s"
             )
+            return {"documentation": documentation}
+
+        def term_frequencies(documentation):
+            start = time.time()
+            if PIPELINE.TFIDF not in pipeline:
+                self.logger.warn(
+                    "Skipping term frequencies inverse document frequency analysis."
+                )
+                return {"tfidf": list()}
+            if ranking is not None:
+                return {"tfidf": ranking}
+            ranking_ = tfidf(documentation)
             self.logger.info(
                 f"Term frequencies inverse document frequency analysis execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.warn(
-                "Skipping term frequencies inverse document frequency analysis."
-            )
-        start = time.time()
-        if PIPELINE.TOKENIZE in self.pipeline:
-            self.sentences = nltk.tokenize.sent_tokenize(self.documentation)
+            return {"tfidf": ranking_}
+
+        def tokenize(documentation):
+            start = time.time()
+            if PIPELINE.TOKENIZE not in pipeline:
+                return {"sentences": list()}
+            sentences = nltk.tokenize.sent_tokenize(documentation)
             self.logger.info(
                 f"Sentence tokenization execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.error(
-                f"Invalid pipeline setup, {PIPELINE.TOKENIZE} not found, required for further execution."
-            )
-            self.pipeline = []
-        start = time.time()
-        if PIPELINE.TOPIC_MODELING in self.pipeline and self.human_knowledge:
+            return {"sentences": sentences}
+
+        def topic_modeling(sentences):
+            start = time.time()
+            if PIPELINE.TOPIC_MODELING not in pipeline or not self.human_knowledge:
+                self.logger.warn(
+                    "Skipping topic modelling based on human knowledge (user does not provided subject matter info)."
+                )
+                return {"topic_content": list()}
             pattern = [subject for subject in self.human_knowledge]
-            self.filtered_content = content_filtering(self.sentences, pattern)
+            topic_content = content_filtering(sentences, pattern)
             self.logger.info(
                 f"Topic modelling execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.warn(
-                "Skipping topic modelling based on human knowledge (user does not provided subject matter info)."
-            )
-        start = time.time()
-        if PIPELINE.CONTENT_FILTERING in self.pipeline:
-            top_occur = [
-                content_word[0] for content_word in self.tfidf[: self.tfidf_top]
-            ]
-            content_filtered = content_filtering(self.sentences, top_occur)
-            if len(self.filtered_content) > 0:
-                self.filtered_content.extend(content_filtered)
+            return {"topic_content": topic_content}
+
+        def filtering(sentences, tfidf, topic_content):
+            start = time.time()
+            if PIPELINE.CONTENT_FILTERING not in pipeline:
+                self.logger.warn(
+                    "Content filtering based on document additional TFIDF or human knowledge data not invoked."
+                )
+                return {"filtered_content": topic_content}
+            tfidf_top = min(self.tfidf_top, len(tfidf) - 1)
+            top_occur = [content_word[0] for content_word in tfidf[:tfidf_top]]
+            content_filtered = content_filtering(sentences, top_occur)
+            filtered_content = list(topic_content)
+            if len(filtered_content) > 0:
+                filtered_content.extend(content_filtered)
             else:
-                self.filtered_content = content_filtered
+                filtered_content = content_filtered
             self.logger.info(
                 f"Content filtering execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.warn(
-                "Content filtering based on document additional TFIDF or human knowledge data not invoked."
-            )
-        start = time.time()
-        if PIPELINE.BATCH in self.pipeline:
-            self.sentences = filter_sents(self.sentences)
-            self.sentences.extend(
-                [sent for sent in self.filtered_content if sent not in self.sentences]
-            )
+            return {"filtered_content": filtered_content}
+
+        def batch(sentences, filtered_content):
+            start = time.time()
+            if PIPELINE.BATCH not in pipeline:
+                self.logger.warn(
+                    "Further processing will be performed on unfiltered data."
+                )
+                return {"batch": sentences}
+            batch_ = filter_sents(sentences, bounds)
+            batch_.extend([sent for sent in filtered_content if sent not in batch_])
             self.logger.info(
                 f"Batch data based on document structure analysis procedure execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.warn("Further processing will be performed on unfiltered data.")
-        start = time.time()
-        if PIPELINE.SVO in self.pipeline:
-            self.svo = svo(self.sentences, self.lang, self.ner)
+            return {"batch": batch_}
+
+        def subject_verb_object(batch):
+            start = time.time()
+            if PIPELINE.SVO not in pipeline:
+                self.logger.warn(
+                    "SVO triples extraction not utilized in information extraction process."
+                )
+                return {"svo": set()}
+            triples = self.extractor.svo(batch, self._shared_lang, self._shared_ner)
             self.logger.info(
                 f"SVO triples extraction execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.warn(
-                "SVO triples extraction not utilized in information extraction process."
-            )
-        start = time.time()
-        if PIPELINE.SPO in self.pipeline:
-            self.spo = spo(self.sentences, self.pos_tagger, self.ner)
+            return {"svo": triples}
+
+        def subject_predicate_object(batch):
+            start = time.time()
+            if PIPELINE.SPO not in pipeline:
+                self.logger.warn(
+                    "SPO triples extraction not utilized in information extraction process."
+                )
+                return {"spo": set()}
+            triples = self.extractor.spo(batch, self.pos_tagger, self._shared_ner)
             self.logger.info(
                 f"SPO triples extraction execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.warn(
-                "SPO triples extraction not utilized in information extraction process."
-            )
-        start = time.time()
-        if PIPELINE.NER in self.pipeline:
+            return {"spo": triples}
+
+        def named_entities(documentation):
+            start = time.time()
+            if PIPELINE.NER not in pipeline:
+                self.logger.warn("Named Entity Recognition analysis was not executed.")
+                return {"named_entities": set()}
             self.logger.warn(
                 "Named entity recognition run on pre-trained model specified for autonomous cars industry. "
                 "If documentation is not related to topic, results might be corrupted. "
                 "Consider turning off NER job from Information Extraction pipeline."
             )
-            named_entities = named_entity_recognition(self.documentation, self.ner)
-            if named_entities:
-                self.svo.update(named_entities)
+            entities = named_entity_recognition(
+                documentation, self._shared_ner, gazetteer=self.gazetteer
+            )
+            if self.gazetteer is not None:
+                self.logger.info(
+                    f"Gazetteer matched {self.gazetteer.matched} sentences, "
+                    f"statistical NER run on {self.gazetteer.routed} sentences"
+                )
             self.logger.info(
                 f"Named Entities Recognition execution time: {time.time() - start:.2f}s"
             )
-        else:
-            self.logger.warn("Named Entity Recognition analysis was not executed.")
+            return {"named_entities": entities}
 
-        if save and (self.svo or self.spo):
-            dummy_save(self.svo, self.spo, save)
+        return [
+            Stage(PIPELINE.CLEAN, clean, ("text",), ("cleaned",)),
+            Stage(PIPELINE.CROSS_COREF, coreference, ("cleaned",), ("documentation",)),
+            Stage(PIPELINE.TFIDF, term_frequencies, ("documentation",), ("tfidf",)),
+            Stage(PIPELINE.TOKENIZE, tokenize, ("documentation",), ("sentences",)),
+            Stage(
+                PIPELINE.TOPIC_MODELING,
+                topic_modeling,
+                ("sentences",),
+                ("topic_content",),
+            ),
+            Stage(
+                PIPELINE.CONTENT_FILTERING,
+                filtering,
+                ("sentences", "tfidf", "topic_content"),
+                ("filtered_content",),
+            ),
+            Stage(PIPELINE.BATCH, batch, ("sentences", "filtered_content"), ("batch",)),
+            Stage(PIPELINE.SVO, subject_verb_object, ("batch",), ("svo",)),
+            Stage(PIPELINE.SPO, subject_predicate_object, ("batch",), ("spo",)),
+            Stage(
+                PIPELINE.NER, named_entities, ("documentation",), ("named_entities",)
+            ),
+        ]
 
-        return self.tfidf, self.spo, self.svo
+    def close(self):
+        """release worker processes used for sentence level parallelism"""
+        self.extractor.close()
 
     def reset(self):
         # docs file text
@@ -250,6 +446,7 @@ class NLPJobRunner:
         self.filtered_content = list()
         self.svo = set()
         self.spo = set()
+        self.timings = list()
 
 
 if __name__ == "__main__":
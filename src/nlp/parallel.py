@@ -0,0 +1,146 @@
+"""Sentence level parallelism for triples extraction within single document
+"""
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Set, TypeVar
+
+from nltk.parse.corenlp import CoreNLPParser
+from spacy import Language
+
+from src.application.common import PIPELINE
+from src.nlp.compile import compile_nlp
+from src.nlp.information_extraction import svo, svo_extract, spo, spo_extract
+from src.nlp.triples import SVO, SPO
+
+# documents with less sentences are not worth to distribute
+PARALLEL_MIN_SENTENCES = 256
+# more shards than workers keeps processes busy when sentences differ in length
+SHARDS_PER_WORKER = 4
+# every SVO process loads its own language model (several hundred MB for en_core_web_lg)
+SVO_PROCESSES = 2
+
+T = TypeVar("T")
+
+# language models loaded once per SVO worker process
+_worker_lang = None
+_worker_ner = None
+
+
+def shard(items: List[T], shards: int) -> List[List[T]]:
+    """
+    Split list into contiguous, balanced shards preserving items order
+    Args:
+        items: list to split
+        shards: number of shards
+    Returns:
+        non-empty shards
+    """
+    shards = max(1, min(shards, len(items)))
+    size, rest = divmod(len(items), shards)
+    result, start = list(), 0
+    for i in range(shards):
+        end = start + size + (1 if i < rest else 0)
+        result.append(items[start:end])
+        start = end
+    return [part for part in result if part]
+
+
+def ordered_merge(shards: Iterable[List[T]]) -> Set[T]:
+    """
+    Merge per shard results in shard order, the first occurrence of equal
+    triples wins exactly like in serial extraction
+    """
+    merged = list()
+    for part in shards:
+        merged.extend(part)
+    return set(merged)
+
+
+def _init_svo_worker(model: str, with_ner: bool) -> None:
+    global _worker_lang, _worker_ner
+    pipeline = [PIPELINE.NER] if with_ner else []
+    _worker_lang, _worker_ner = compile_nlp(model, pipeline, "CPU")
+
+
+def _svo_shard(sentences: List[str]) -> List[SVO]:
+    triples = list()
+    for sent in sentences:
+        triples.extend(svo_extract(sent, _worker_lang, _worker_ner))
+    return triples
+
+
+def _spo_shard(sentences: List[str], tagger: CoreNLPParser, ner: Language) -> List[SPO]:
+    triples = list()
+    for sent in sentences:
+        triplet = spo_extract(sent, tagger, ner)
+        if triplet:
+            triples.append(triplet)
+    return triples
+
+
+class ParallelExtractor:
+    """
+    Distribute sentences of a single document across workers: processes for
+    spaCy based SVO extraction, threads with in-flight requests for CoreNLP
+    based SPO extraction. Number of SVO processes is bounded separately, each
+    process holds its own copy of the language model and NER.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        workers: int = 1,
+        min_sentences: int = PARALLEL_MIN_SENTENCES,
+        processes: int = SVO_PROCESSES,
+    ) -> None:
+        self.model = model
+        self.workers = max(1, workers)
+        self.processes = max(1, processes)
+        self.min_sentences = min_sentences
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._processes_ner = None
+
+    def parallel(self, sentences: List[str], workers: int) -> bool:
+        return workers > 1 and len(sentences) >= self.min_sentences
+
+    def svo(self, sentences: List[str], model: Language, ner: Language) -> Set[SVO]:
+        if not self.parallel(sentences, self.processes):
+            return svo(sentences, model, ner)
+        pool = self._process_pool(with_ner=ner is not None)
+        shards = shard(sentences, self.processes * SHARDS_PER_WORKER)
+        return ordered_merge(pool.map(_svo_shard, shards))
+
+    def spo(
+        self, sentences: List[str], tagger: CoreNLPParser, ner: Language
+    ) -> Set[SPO]:
+        if not self.parallel(sentences, self.workers):
+            return spo(sentences, tagger, ner)
+        shards = shard(sentences, self.workers)
+        with ThreadPoolExecutor(
+            max_workers=len(shards), thread_name_prefix="spo"
+        ) as executor:
+            results = executor.map(
+                _spo_shard, shards, [tagger] * len(shards), [ner] * len(shards)
+            )
+            return ordered_merge(results)
+
+    def close(self) -> None:
+        if self._processes is not None:
+            self._processes.shutdown()
+            self._processes = None
+
+    def _process_pool(self, with_ner: bool) -> ProcessPoolExecutor:
+        if self._processes is not None and self._processes_ner != with_ner:
+            self.close()
+        if self._processes is None:
+            # spawn, fork is unsafe when parent already runs stage threads
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_svo_worker,
+                initargs=(self.model, with_ner),
+            )
+            self._processes_ner = with_ner
+        return self._processes
@@ -0,0 +1,134 @@
+"""Packed binary format of information extraction results
+Layout (little-endian): magic, version, string table, attributes table, triples columns
+and TF-IDF columns. Strings are stored once in UTF-8 blob indexed by offsets, triples
+and TF-IDF terms are integer ids into string table (see TripleStore).
+"""
+from __future__ import annotations
+
+import pathlib
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterable, List, Tuple
+
+from src.nlp.triples import SVO, SPO, StringTable, TripleStore
+
+MAGIC = b"TDAR"
+VERSION = 1
+ATTRS_STR = 0
+ATTRS_LIST = 1
+
+
+class ResultsFormatError(Exception):
+    pass
+
+
+def _write_array(fd: BinaryIO, values: array) -> None:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    fd.write(struct.pack("<Q", len(values)))
+    fd.write(values.tobytes())
+
+
+def _read_array(fd: BinaryIO, typecode: str) -> array:
+    (length,) = struct.unpack("<Q", fd.read(8))
+    values = array(typecode)
+    data = fd.read(length * values.itemsize)
+    if len(data) != length * values.itemsize:
+        raise ResultsFormatError("Unexpected end of results file")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _write_strings(fd: BinaryIO, strings: StringTable) -> None:
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for string in strings.strings:
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+    _write_array(fd, offsets)
+    fd.write(blob)
+
+
+def _read_strings(fd: BinaryIO) -> StringTable:
+    offsets = _read_array(fd, "Q")
+    blob = fd.read(offsets[-1])
+    if len(blob) != offsets[-1]:
+        raise ResultsFormatError("Unexpected end of results file")
+    table = StringTable(strings=())
+    for start, end in zip(offsets, offsets[1:]):
+        table.id(blob[start:end].decode("utf-8"))
+    return table
+
+
+def save_results(
+    path: str | pathlib.Path,
+    tfidf: Iterable[Tuple[str, int]],
+    triples: Iterable[SVO | SPO],
+) -> int:
+    """
+    Args:
+        path: output file path
+        tfidf: (term, frequency) pairs
+        triples: SVO and SPO triples
+    Returns:
+        number of saved triples, duplicates are stored once
+    """
+    store = TripleStore()
+    store.extend(triples)
+    terms, frequencies = array("I"), array("q")
+    for term, frequency in tfidf:
+        terms.append(store.strings.id(term))
+        frequencies.append(frequency)
+    attrs_kind, attrs_offsets, attrs_items = array("B"), array("I", [0]), array("I")
+    for key in store.attrs:
+        attrs_kind.append(ATTRS_LIST if key[0] == "list" else ATTRS_STR)
+        attrs_items.extend(key[1:])
+        attrs_offsets.append(len(attrs_items))
+    with open(path, "wb") as fd:
+        fd.write(MAGIC + struct.pack("<B", VERSION))
+        _write_strings(fd, store.strings)
+        for values in (attrs_kind, attrs_offsets, attrs_items, store.kind):
+            _write_array(fd, values)
+        for column in TripleStore.COLUMNS:
+            _write_array(fd, store.columns[column])
+        _write_array(fd, terms)
+        _write_array(fd, frequencies)
+    return len(store)
+
+
+def load_results(path: str | pathlib.Path) -> Tuple[List[Tuple[str, int]], TripleStore]:
+    """
+    Args:
+        path: results file saved with save_results
+    Returns:
+        (term, frequency) pairs and triples store
+    Raises:
+        ResultsFormatError: file is not results file or is truncated
+    """
+    with open(path, "rb") as fd:
+        header = fd.read(len(MAGIC) + 1)
+        if header[: len(MAGIC)] != MAGIC:
+            raise ResultsFormatError(f"{path} is not results file")
+        if header[len(MAGIC)] != VERSION:
+            raise ResultsFormatError(
+                f"Unsupported results format version {header[len(MAGIC)]}"
+            )
+        strings = _read_strings(fd)
+        attrs_kind = _read_array(fd, "B")
+        attrs_offsets = _read_array(fd, "I")
+        attrs_items = _read_array(fd, "I")
+        kind = _read_array(fd, "B")
+        columns = {column: _read_array(fd, "I") for column in TripleStore.COLUMNS}
+        terms = _read_array(fd, "I")
+        frequencies = _read_array(fd, "q")
+    attrs = [
+        ("list" if kind_ == ATTRS_LIST else "str",) + tuple(attrs_items[start:end])
+        for kind_, start, end in zip(attrs_kind, attrs_offsets, attrs_offsets[1:])
+    ]
+    store = TripleStore.from_columns(strings, attrs, kind, columns)
+    tfidf = [(strings[term], frequency) for term, frequency in zip(terms, frequencies)]
+    return tfidf, store
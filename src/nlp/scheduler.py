@@ -0,0 +1,146 @@
+"""Dependency graph executor for NLP pipeline stages
+"""
+from __future__ import annotations
+
+import dataclasses
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+
+class SchedulingError(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class Stage:
+    """pipeline stage declaration, fn takes inputs as keyword arguments
+    and returns dict with all declared outputs"""
+
+    name: str
+    fn: Callable[..., Dict[str, Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+
+@dataclasses.dataclass
+class StageTiming:
+    """struct for storing stage execution time relative to scheduler start"""
+
+    stage: str
+    start: float
+    duration: float
+
+
+class SharedModel:
+    """
+    spaCy Language shared by concurrently running stages. Language and its pipes are not
+    thread-safe, calls are serialized, documents of pipe are produced one at a time under
+    the lock. Other attributes are delegated to the model.
+    """
+
+    def __init__(self, model) -> None:
+        self.model = model
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            return self.model(*args, **kwargs)
+
+    def pipe(self, *args, **kwargs) -> Iterator:
+        with self._lock:
+            docs = iter(self.model.pipe(*args, **kwargs))
+        while True:
+            with self._lock:
+                try:
+                    doc = next(docs)
+                except StopIteration:
+                    return
+            yield doc
+
+    def __getattr__(self, name: str):
+        return getattr(self.model, name)
+
+
+class StageScheduler:
+    """
+    Run stages as soon as all of their inputs are available, independent stages
+    are executed concurrently on a thread pool.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: int = 1) -> None:
+        producers = dict()
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise SchedulingError(
+                        f"'{output}' produced by both '{producers[output]}' and '{stage.name}' stages."
+                    )
+                producers[output] = stage.name
+        self.stages = stages
+        self.max_workers = max(1, max_workers)
+        self.timings = list()
+
+    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute stages
+        Args:
+            data: initial inputs
+        Returns:
+            initial inputs updated with outputs of all stages
+        Raises:
+            SchedulingError: If stage inputs can not be satisfied (missing or cyclic dependencies)
+            Exception: first exception raised by any stage, pending stages are cancelled
+        """
+        data = dict(data)
+        self.timings = list()
+        pending = list(self.stages)
+        running = dict()
+        origin = time.time()
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="nlp-stage"
+        ) as executor:
+            while pending or running:
+                for stage in [s for s in pending if all(i in data for i in s.inputs)]:
+                    pending.remove(stage)
+                    inputs = {name: data[name] for name in stage.inputs}
+                    future = executor.submit(self._timed, stage, inputs)
+                    running[future] = stage
+                if not running:
+                    raise SchedulingError(
+                        "Unsatisfied stage inputs: {}".format(
+                            ", ".join(f"{s.name}{s.inputs}" for s in pending)
+                        )
+                    )
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        outputs, start, duration = future.result()
+                    except Exception:
+                        self._cancel(running)
+                        raise
+                    missing = set(stage.outputs) - set(outputs)
+                    if missing:
+                        self._cancel(running)
+                        raise SchedulingError(
+                            f"Stage '{stage.name}' did not produce: {', '.join(sorted(missing))}"
+                        )
+                    data.update({name: outputs[name] for name in stage.outputs})
+                    self.timings.append(
+                        StageTiming(stage.name, start - origin, duration)
+                    )
+        return data
+
+    @staticmethod
+    def _cancel(running) -> None:
+        """cancel stages not started yet, started stages finish before executor shutdown"""
+        for future in running:
+            future.cancel()
+
+    @staticmethod
+    def _timed(stage: Stage, inputs: Dict[str, Any]):
+        start = time.time()
+        outputs = stage.fn(**inputs)
+        return outputs, start, time.time() - start
@@ -1,18 +1,60 @@
 from __future__ import annotations
 
-import dataclasses
-from typing import List
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 
-@dataclasses.dataclass
-class SVO:
+def _intern(value):
+    """share single copy of equal strings across all triples"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return [sys.intern(item) if isinstance(item, str) else item for item in value]
+    return value
+
+
+class _Struct:
+    """base for slotted structs without per-instance __dict__"""
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __repr__(self) -> str:
+        return "{}({})".format(
+            type(self).__name__,
+            ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields),
+        )
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def __setstate__(self, state) -> None:
+        for field, value in zip(self._fields, state):
+            setattr(self, field, _intern(value))
+
+
+class SVO(_Struct):
     """struct for storing SVO triples"""
 
-    subj: str = ""
-    verb: str = ""
-    obj: str = ""
-    subj_ner: str = ""
-    obj_ner: str = ""
+    # plain slots, strings are interned once on construction, attribute access
+    # stays native slot lookup
+    __slots__ = ("subj", "verb", "obj", "subj_ner", "obj_ner")
+    _fields = __slots__
+
+    def __init__(
+        self,
+        subj: str = "",
+        verb: str = "",
+        obj: str = "",
+        subj_ner: str = "",
+        obj_ner: str = "",
+    ) -> None:
+        self.subj = _intern(subj)
+        self.verb = _intern(verb)
+        self.obj = _intern(obj)
+        self.subj_ner = _intern(subj_ner)
+        self.obj_ner = _intern(obj_ner)
 
     def invalid(self):
         if self.subj == "" or self.obj == "":
@@ -37,17 +79,37 @@ class SVO:
         return hash((self.subj, self.obj, self.verb))
 
 
-@dataclasses.dataclass
-class SPO:
+class SPO(_Struct):
     """struct for storing SPO triples"""
 
-    subj: str = ""
-    subj_attrs: str | List[str] = ""
-    subj_ner: str = ""
-    pred: str = ""
-    obj: str = ""
-    obj_attrs: str | List[str] = ""
-    obj_ner: str = ""
+    __slots__ = (
+        "subj",
+        "subj_attrs",
+        "subj_ner",
+        "pred",
+        "obj",
+        "obj_attrs",
+        "obj_ner",
+    )
+    _fields = __slots__
+
+    def __init__(
+        self,
+        subj: str = "",
+        subj_attrs: str | List[str] = "",
+        subj_ner: str = "",
+        pred: str = "",
+        obj: str = "",
+        obj_attrs: str | List[str] = "",
+        obj_ner: str = "",
+    ) -> None:
+        self.subj = _intern(subj)
+        self.subj_attrs = _intern(subj_attrs)
+        self.subj_ner = _intern(subj_ner)
+        self.pred = _intern(pred)
+        self.obj = _intern(obj)
+        self.obj_attrs = _intern(obj_attrs)
+        self.obj_ner = _intern(obj_ner)
 
     def __eq__(self, other: SPO):
         if (
@@ -65,12 +127,194 @@ class SPO:
         return hash((self.subj, self.obj, self.pred))
 
 
-@dataclasses.dataclass
-class WordAttr:
+class WordAttr(_Struct):
     """struct for storing relations between text parts"""
 
-    word: str = ""
-    attributes: List[str] = dataclasses.field(default_factory=lambda: [])
+    __slots__ = ("word", "attributes")
+    _fields = __slots__
+
+    def __init__(self, word: str = "", attributes: List[str] = None) -> None:
+        self.word = _intern(word)
+        self.attributes = [] if attributes is None else _intern(attributes)
 
     def __eq__(self, other):
         return self.word == other.word and self.attributes == other.attributes
+
+
+class StringTable:
+    """bidirectional mapping between strings and consecutive integer ids"""
+
+    __slots__ = ("strings", "ids")
+
+    def __init__(self, strings: Iterable[str] = ("",)) -> None:
+        self.strings: List[str] = list()
+        self.ids: Dict[str, int] = dict()
+        for string in strings:
+            self.id(string)
+
+    def id(self, string: str) -> int:
+        identifier = self.ids.get(string)
+        if identifier is None:
+            identifier = len(self.strings)
+            string = sys.intern(string)
+            self.strings.append(string)
+            self.ids[string] = identifier
+        return identifier
+
+    def __getitem__(self, identifier: int) -> str:
+        return self.strings[identifier]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class TripleStore:
+    """
+    Columnar, deduplicated storage for SVO and SPO triples. Strings are kept once in
+    shared string table, triples are rows of integer ids in array backed columns.
+    SVO verb and SPO predicate share 'pred' column.
+    """
+
+    SVO_KIND = 0
+    SPO_KIND = 1
+    COLUMNS = ("subj", "pred", "obj", "subj_ner", "obj_ner", "subj_attrs", "obj_attrs")
+
+    def __init__(self) -> None:
+        self.strings = StringTable()
+        # attributes values: id 0 is reserved for empty string
+        self.attrs: List[Tuple] = [("str", 0)]
+        self._attrs_ids: Dict[Tuple, int] = {("str", 0): 0}
+        self.kind = array("B")
+        self.columns: Dict[str, array] = {name: array("I") for name in self.COLUMNS}
+        # (kind, subj, pred, obj) -> row
+        self.index: Dict[Tuple[int, int, int, int], int] = dict()
+
+    @classmethod
+    def from_columns(
+        cls,
+        strings: StringTable,
+        attrs: List[Tuple],
+        kind: array,
+        columns: Dict[str, array],
+    ) -> TripleStore:
+        """restore store from its tables, e.g. loaded from results file"""
+        store = cls()
+        store.strings = strings
+        store.attrs = attrs
+        store._attrs_ids = {key: identifier for identifier, key in enumerate(attrs)}
+        store.kind = kind
+        store.columns = columns
+        store.index = {
+            key: row
+            for row, key in enumerate(
+                zip(kind, columns["subj"], columns["pred"], columns["obj"])
+            )
+        }
+        return store
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def _attrs_id(self, value: str | List[str]) -> int:
+        if isinstance(value, list):
+            key = ("list",) + tuple(self.strings.id(item) for item in value)
+        else:
+            key = ("str", self.strings.id(value))
+        identifier = self._attrs_ids.get(key)
+        if identifier is None:
+            identifier = len(self.attrs)
+            self.attrs.append(key)
+            self._attrs_ids[key] = identifier
+        return identifier
+
+    def _attrs_value(self, identifier: int) -> str | List[str]:
+        key = self.attrs[identifier]
+        if key[0] == "list":
+            return [self.strings[item] for item in key[1:]]
+        return self.strings[key[1]]
+
+    def _key(self, triple: SVO | SPO) -> Tuple[int, int, int, int]:
+        if isinstance(triple, SVO):
+            kind, pred = self.SVO_KIND, triple.verb
+        else:
+            kind, pred = self.SPO_KIND, triple.pred
+        strings = self.strings
+        return kind, strings.id(triple.subj), strings.id(pred), strings.id(triple.obj)
+
+    def add(self, triple: SVO | SPO) -> bool:
+        """
+        Args:
+            triple: SVO or SPO triple
+        Returns:
+            True if triple was added, False if equal triple is already stored
+        """
+        key = self._key(triple)
+        if key in self.index:
+            return False
+        self.index[key] = len(self.kind)
+        kind, subj, pred, obj = key
+        self.kind.append(kind)
+        columns = self.columns
+        columns["subj"].append(subj)
+        columns["pred"].append(pred)
+        columns["obj"].append(obj)
+        columns["subj_ner"].append(self.strings.id(triple.subj_ner))
+        columns["obj_ner"].append(self.strings.id(triple.obj_ner))
+        if kind == self.SPO_KIND:
+            columns["subj_attrs"].append(self._attrs_id(triple.subj_attrs))
+            columns["obj_attrs"].append(self._attrs_id(triple.obj_attrs))
+        else:
+            columns["subj_attrs"].append(0)
+            columns["obj_attrs"].append(0)
+        return True
+
+    def extend(self, triples: Iterable[SVO | SPO]) -> int:
+        """
+        Returns:
+            number of added triples
+        """
+        return sum(1 for triple in triples if self.add(triple))
+
+    def __contains__(self, triple: SVO | SPO) -> bool:
+        if isinstance(triple, SVO):
+            kind, pred = self.SVO_KIND, triple.verb
+        else:
+            kind, pred = self.SPO_KIND, triple.pred
+        ids = self.strings.ids
+        key = (kind, ids.get(triple.subj), ids.get(pred), ids.get(triple.obj))
+        return key in self.index
+
+    def row(self, row: int) -> SVO | SPO:
+        """materialize triple stored in given row"""
+        columns, strings = self.columns, self.strings
+        if self.kind[row] == self.SVO_KIND:
+            return SVO(
+                subj=strings[columns["subj"][row]],
+                verb=strings[columns["pred"][row]],
+                obj=strings[columns["obj"][row]],
+                subj_ner=strings[columns["subj_ner"][row]],
+                obj_ner=strings[columns["obj_ner"][row]],
+            )
+        return SPO(
+            subj=strings[columns["subj"][row]],
+            subj_attrs=self._attrs_value(columns["subj_attrs"][row]),
+            subj_ner=strings[columns["subj_ner"][row]],
+            pred=strings[columns["pred"][row]],
+            obj=strings[columns["obj"][row]],
+            obj_attrs=self._attrs_value(columns["obj_attrs"][row]),
+            obj_ner=strings[columns["obj_ner"][row]],
+        )
+
+    def __iter__(self) -> Iterator[SVO | SPO]:
+        for row in range(len(self)):
+            yield self.row(row)
+
+    def svo(self) -> Iterator[SVO]:
+        for row, kind in enumerate(self.kind):
+            if kind == self.SVO_KIND:
+                yield self.row(row)
+
+    def spo(self) -> Iterator[SPO]:
+        for row, kind in enumerate(self.kind):
+            if kind == self.SPO_KIND:
+                yield self.row(row)
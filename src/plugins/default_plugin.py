@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import os
 import sys
 import pathlib
@@ -60,7 +61,7 @@ class TextProvider:
         self.docx_extractor = DocxDecoder()
 
     def supported_format(self, extension) -> bool:
-        return extension in self.supported_formats
+        return extension.lower() in self.supported_formats
 
     def get_file_content(self, filepath: pathlib.Path) -> str:
         """
@@ -74,13 +75,33 @@ class TextProvider:
             raise NotSupportedDocumentFormat(
                 f"Document format {filepath.suffix} is not supported."
             )
-        if filepath.suffix == ".pdf":
+        if filepath.suffix.lower() == ".pdf":
             with open(filepath, "rb") as pdf_:
                 return _read_all(pdf_, self.pdf_extractor.read_all)
-        elif filepath.suffix == ".docx":
+        elif filepath.suffix.lower() == ".docx":
             with open(filepath, "rb") as docx_:
                 return _read_all(docx_, self.docx_extractor.read_all)
 
+    def get_stream_content(self, fd: typing.IO[bytes], suffix: str) -> str:
+        """
+        Read whole .pdf, .docx document from binary stream to program memory
+        Args:
+            fd: binary stream with document content, e.g. standard input
+            suffix: document format
+        Returns:
+            decoded and cleaned text from provided stream.
+        """
+        if not self.supported_format(suffix):
+            raise NotSupportedDocumentFormat(
+                f"Document format {suffix} is not supported."
+            )
+        # decoders require random access
+        buffer = io.BytesIO(fd.read())
+        if suffix.lower() == ".pdf":
+            return _read_all(buffer, self.pdf_extractor.read_all)
+        elif suffix.lower() == ".docx":
+            return _read_all(buffer, self.docx_extractor.read_all)
+
     def get_file_chunk(
         self, filepath: pathlib.Path
     ) -> typing.Generator[str, None, None]:
@@ -95,7 +116,7 @@ class TextProvider:
             raise NotSupportedDocumentFormat(
                 f"Document format {filepath.suffix} is not supported."
             )
-        if filepath.suffix == ".pdf":
+        if filepath.suffix.lower() == ".pdf":
             with open(filepath, "rb") as pdf_:
                 while True:
                     try:
@@ -103,7 +124,7 @@ class TextProvider:
                     except StopIteration:
                         self.pdf_extractor.reset()
                         break
-        elif filepath.suffix == ".docx":
+        elif filepath.suffix.lower() == ".docx":
             with open(filepath, "rb") as docx_:
                 while True:
                     try:
@@ -231,8 +252,12 @@ if __name__ == "__main__":
     file_size_limit = int(os.environ.get("IN_MEMORY_FILE_SIZE", 1024 * 1024))
     text_provider = TextProvider()
 
-    file = pathlib.Path(args[0])
-
-    decoded_text = text_provider.get_file_content(file)
+    if args[0] == "-":
+        # document streamed on standard input, file name passed as additional argument
+        decoded_text = text_provider.get_stream_content(
+            sys.stdin.buffer, pathlib.Path(args[2]).suffix
+        )
+    else:
+        decoded_text = text_provider.get_file_content(pathlib.Path(args[0]))
 
     save_parsed_text(pathlib.Path(args[1]), decoded_text)
@@ -4,7 +4,17 @@ import tempfile
 import unittest
 
 
-from src.application.decompression import decompress, copydir
+import tarfile
+import zipfile
+
+from src.application.decompression import (
+    DecompressionError,
+    decompress,
+    iter_members,
+    scan,
+    select,
+    stage,
+)
 from tests.utils import files_in_dir
 
 
@@ -38,9 +48,128 @@ class TestDecompression(unittest.TestCase):
             actual = files_in_dir(pathlib.Path(temp))
             self.assertEqual(self.expected_archive, sorted(actual))
 
-    def test_copyfileobj(self) -> None:
+    def test_iter_members(self) -> None:
+        for archive in ("tarfile.tar.xz", "zipfile.zip"):
+            members = {
+                name: member.read()
+                for name, member in iter_members(self.archives.joinpath(archive))
+            }
+            self.assertEqual(self.expected_archive, sorted(members))
+            self.assertTrue(members["lorem-ipsum.pdf"].startswith(b"%PDF"))
+
+    def test_scan(self) -> None:
+        for archive in ("tarfile.tar.xz", "zipfile.zip"):
+            members = scan(self.archives.joinpath(archive))
+            self.assertEqual(
+                [("lorem-ipsum.pdf", 77123), ("text1.txt", 15), ("text2.txt", 15)],
+                sorted((member.filename, member.size) for member in members),
+            )
+
+    def test_select_supported_largest_first(self) -> None:
+        members = select(
+            scan(self.archives.joinpath("zipfile.zip")), suffixes={".pdf", ".txt"}
+        )
+        self.assertEqual("lorem-ipsum.pdf", members[0].filename)
+        self.assertEqual([], select(members, suffixes={".docx"}))
+
+    def test_extract_supported_only(self) -> None:
+        with tempfile.TemporaryDirectory() as temp:
+            temp = pathlib.Path(temp)
+            content = {f"docs/{i}.txt": "x" * i for i in range(1, 9)}
+            content["docs/image.png"] = "png"
+            with zipfile.ZipFile(temp.joinpath("docs.zip"), "w") as zip_fd:
+                for name, text in content.items():
+                    zip_fd.writestr(name, text)
+            with tarfile.open(temp.joinpath("docs.tar.xz"), "w:xz") as tar_fd:
+                tar_fd.add(temp.joinpath("docs.zip"), "docs/docs.zip")
+                tar_fd.add(temp.joinpath("docs.zip"), "docs/docs.pdf")
+            for archive, expected in (
+                ("docs.zip", [f"{i}.txt" for i in range(8, 0, -1)]),
+                ("docs.tar.xz", ["docs.pdf"]),
+            ):
+                destination = temp.joinpath(archive + ".out")
+                destination.mkdir()
+                members = decompress(
+                    temp.joinpath(archive), destination, {".txt", ".pdf"}, workers=4
+                )
+                self.assertEqual(expected, [member.filename for member in members])
+                self.assertEqual(sorted(expected), sorted(files_in_dir(destination)))
+            self.assertEqual("xxxx", temp.joinpath("docs.zip.out", "4.txt").read_text())
+
+    def test_colliding_file_names_last_wins(self) -> None:
+        with tempfile.TemporaryDirectory() as temp:
+            temp = pathlib.Path(temp)
+            with zipfile.ZipFile(temp.joinpath("docs.zip"), "w") as zip_fd:
+                for folder in range(8):
+                    zip_fd.writestr(f"v{folder}/notes.txt", str(folder) * 1000)
+                zip_fd.writestr("v8/OTHER.TXT", "upper")
+            for archive in ("docs.zip", "docs.tar"):
+                if archive == "docs.tar":
+                    with tarfile.open(temp.joinpath(archive), "w") as tar_fd:
+                        for folder in range(8):
+                            path = temp.joinpath(f"v{folder}.txt")
+                            path.write_text(str(folder) * 1000)
+                            tar_fd.add(path, f"v{folder}/notes.txt")
+                destination = temp.joinpath(archive + ".out")
+                destination.mkdir()
+                members = decompress(
+                    temp.joinpath(archive), destination, {".txt"}, workers=4
+                )
+                self.assertEqual(
+                    ["notes.txt"] + (["OTHER.TXT"] if archive == "docs.zip" else []),
+                    [member.filename for member in members],
+                )
+                self.assertEqual(
+                    "7" * 1000, destination.joinpath("notes.txt").read_text()
+                )
+
+    def test_stage_directory(self) -> None:
         files_ = self.archives.parent.joinpath("dir")
-        with tempfile.TemporaryDirectory(dir=self.archives) as temp:
-            copydir(files_, pathlib.Path(temp))
-            actual = files_in_dir(pathlib.Path(temp))
-            self.assertEqual(self.expected_dir, sorted(actual))
+        for strategy in ("hardlink", "symlink", "copy", "auto"):
+            with tempfile.TemporaryDirectory() as temp:
+                staged = stage(files_, pathlib.Path(temp), strategy)
+                self.assertEqual(self.expected_dir, sorted(files_in_dir(temp)))
+                self.assertEqual(len(self.expected_dir), sum(staged.values()))
+                sample = pathlib.Path(temp).joinpath("sample.pdf")
+                same = os.path.samefile(sample, files_.joinpath("sample.pdf"))
+                # auto never shares inode with input file
+                self.assertEqual(strategy in ("hardlink", "symlink"), same)
+                self.assertEqual(strategy == "symlink", sample.is_symlink())
+
+    def test_stage_follows_directory_links(self) -> None:
+        files_ = self.archives.parent.joinpath("dir")
+        with tempfile.TemporaryDirectory() as temp:
+            source = pathlib.Path(temp).joinpath("input")
+            source.mkdir()
+            source.joinpath("linked").symlink_to(files_, target_is_directory=True)
+            destination = pathlib.Path(temp).joinpath("extracted")
+            staged = stage(source, destination, "copy")
+            self.assertEqual(len(self.expected_dir), staged["copy"])
+            self.assertEqual(self.expected_dir, sorted(files_in_dir(destination)))
+            self.assertFalse(destination.joinpath("linked").is_symlink())
+
+    def test_stage_file(self) -> None:
+        file = self.archives.parent.joinpath("dir/sample.pdf")
+        with tempfile.TemporaryDirectory() as temp:
+            destination = pathlib.Path(temp).joinpath("extracted")
+            staged = stage(file, destination, "copy")
+            self.assertEqual({"copy": 1}, staged)
+            self.assertEqual(
+                file.read_bytes(), destination.joinpath("sample.pdf").read_bytes()
+            )
+
+    def test_stage_reflink(self) -> None:
+        file = self.archives.parent.joinpath("dir/sample.pdf")
+        with tempfile.TemporaryDirectory() as temp:
+            destination = pathlib.Path(temp)
+            try:
+                staged = stage(file, destination, "reflink")
+            except DecompressionError as e:
+                # filesystem without copy-on-write support, nothing is left behind
+                self.assertIn("using reflink", str(e))
+                self.assertEqual([], list(destination.iterdir()))
+                return
+            self.assertEqual({"reflink": 1}, staged)
+            self.assertEqual(
+                file.read_bytes(), destination.joinpath("sample.pdf").read_bytes()
+            )
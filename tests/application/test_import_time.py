@@ -0,0 +1,70 @@
+import os
+import pathlib
+import subprocess
+import sys
+import time
+import unittest
+
+ROOT = pathlib.Path(os.path.dirname(os.path.abspath(__file__))).joinpath("../..")
+
+# dependencies which have to be loaded only by the step that needs them
+HEAVY_MODULES = {
+    "stardog",
+    "rdflib",
+    "spacy",
+    "crosslingual_coreference",
+    "networkx",
+    "pandas",
+    "matplotlib",
+    "scipy",
+    "nltk",
+}
+IMPORT_BUDGET = 0.5  # seconds
+STARTUP_BUDGET = 1.0  # seconds
+
+
+def run_python(*args) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(ROOT.resolve())
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Parse `-X importtime` report to {module: cumulative time in seconds}
+    """
+    timings = dict()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        timings[module.strip()] = int(cumulative) / 1e6
+    return timings
+
+
+class TestImportTime(unittest.TestCase):
+    def test_main_module_does_not_import_heavy_dependencies(self):
+        result = run_python("-X", "importtime", "-c", "import src.application.main")
+        self.assertEqual(0, result.returncode, result.stderr.decode())
+        timings = parse_importtime(result.stderr.decode())
+        imported = {module.split(".")[0] for module in timings}
+        self.assertEqual(set(), imported & HEAVY_MODULES)
+        self.assertLess(timings["src.application.main"], IMPORT_BUDGET)
+
+    def test_help_returns_fast(self):
+        start = time.time()
+        result = run_python("src/skg_app.py", "--help")
+        self.assertEqual(0, result.returncode, result.stderr.decode())
+        self.assertLess(time.time() - start, STARTUP_BUDGET)
+
+    def test_argparse_error_returns_fast(self):
+        start = time.time()
+        result = run_python("src/skg_app.py", "--only", "decompress")
+        self.assertEqual(2, result.returncode)
+        self.assertLess(time.time() - start, STARTUP_BUDGET)
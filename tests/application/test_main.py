@@ -4,11 +4,15 @@ import pathlib
 import shutil
 import tempfile
 import unittest
+from unittest import mock
 
 import mock_logger
 import utils
 from src.application.common import Environment
 from src.application.main import main
+from src.database.results_store import ResultsStore
+from src.database.upload import UploadError
+from src.nlp.triples import SVO
 
 
 class TestMain(unittest.TestCase):
@@ -146,6 +150,76 @@ class TestMain(unittest.TestCase):
                 logger.messages,
             )
 
+    def test_decode_streamed_archive(self):
+        zipfile_ = self.archives.joinpath("zipfile.zip")
+        with mock_logger.MockLogger() as logger:
+            self.assertEqual(
+                0,
+                self.main(
+                    [
+                        "--techdoc_path",
+                        str(zipfile_),
+                        "--only",
+                        "decompress",
+                        "decode",
+                        "--stream_archive",
+                    ]
+                ),
+            )
+            self.assertEqual(
+                sorted(["lorem-ipsum.txt", "text1.txt", "text2.txt"]),
+                sorted(utils.files_in_dir(pathlib.Path(self.temp).joinpath("results"))),
+            )
+            self.assertIn(
+                ("INFO", "lorem-ipsum.pdf file has been parsed successfully."),
+                logger.messages,
+            )
+
+    def test_stream_archive_ignored_for_directory(self):
+        directory = self.archives.parent.joinpath("dir")
+        with mock_logger.MockLogger() as logger:
+            self.assertEqual(
+                0,
+                self.main(
+                    [
+                        "--techdoc_path",
+                        str(directory),
+                        "--only",
+                        "decompress",
+                        "decode",
+                        "--stream_archive",
+                    ]
+                ),
+            )
+            self.assertIn(("INFO", "Nothing to be decompressed."), logger.messages)
+            self.assertEqual(
+                ["lorem-ipsum.txt", "sample.txt", "text1.txt", "text2.txt"],
+                sorted(os.listdir(pathlib.Path(self.temp).joinpath("results/decoded"))),
+            )
+
+    def test_copy_upper_case_text_without_decoding(self):
+        directory = pathlib.Path(self.temp).joinpath("input")
+        directory.mkdir()
+        directory.joinpath("NOTES.TXT").write_text("Planner uses map.")
+        with mock_logger.MockLogger() as logger:
+            self.assertEqual(
+                0,
+                self.main(
+                    [
+                        "--techdoc_path",
+                        str(directory),
+                        "--only",
+                        "decompress",
+                        "decode",
+                    ]
+                ),
+            )
+            self.assertNotIn(("INFO", "Decoding NOTES.TXT..."), logger.messages)
+        self.assertEqual(
+            ["NOTES.TXT"],
+            os.listdir(pathlib.Path(self.temp).joinpath("results/decoded")),
+        )
+
     def test_decompress_not_supported_archive(self):
         archive_ = self.archives.joinpath("archive.7z")
         with mock_logger.MockLogger() as logger:
@@ -175,3 +249,132 @@ class TestMain(unittest.TestCase):
                 ),
                 logger.messages,
             )
+
+    def test_staging_failure(self):
+        file = self.archives.parent.joinpath("dir/sample.pdf")
+
+        def cross_device(source, destination):
+            raise OSError(18, "Invalid cross-device link")
+
+        with mock.patch.dict(
+            "src.application.decompression.STAGING_METHODS", hardlink=cross_device
+        ), mock_logger.MockLogger() as logger:
+            self.assertEqual(
+                1,
+                self.main(
+                    ["--techdoc_path", str(file), "--only", "decompress"]
+                    + ["--staging", "hardlink"]
+                ),
+            )
+            self.assertIn("using hardlink", logger.get_messages("ERROR")[0])
+
+    def test_rebuild_graph_from_previous_results(self):
+        previous = pathlib.Path(self.temp).joinpath("previous/information/doc")
+        previous.mkdir(parents=True)
+        previous.joinpath("doc_svo.txt").write_text(
+            "System;depend on;TensorRT;SYSTEM;LIBRARY\n"
+        )
+        previous.joinpath("doc_spo.txt").write_text(
+            "planner;use;map;['path'];;;DATA STRUCTURE\n"
+        )
+        with mock_logger.MockLogger() as logger:
+            self.assertEqual(
+                0,
+                self.main(
+                    ["--techdoc_path", "previous", "--only", "make_graph"],
+                    env={"NLP_WORKERS": "1"},
+                ),
+            )
+            self.assertEqual([], logger.get_messages("ERROR"))
+        graph = pathlib.Path(self.temp).joinpath("results/graph/doc/doc.ttl")
+        content = graph.read_text()
+        self.assertIn("<http://api.stardog.com/depend_on>", content)
+        self.assertIn('"path"', content)
+
+    def test_rebuild_graph_without_previous_results(self):
+        os.mkdir(pathlib.Path(self.temp).joinpath("previous"))
+        with mock_logger.MockLogger() as logger:
+            self.assertEqual(
+                4,
+                self.main(["--techdoc_path", "previous", "--only", "make_graph"]),
+            )
+            self.assertIn(
+                ("ERROR", "No extracted information found in previous."),
+                logger.messages,
+            )
+
+    def test_rebuild_graph_into_results_store(self):
+        previous = pathlib.Path(self.temp).joinpath("previous/information/doc")
+        previous.mkdir(parents=True)
+        previous.joinpath("doc_svo.txt").write_text(
+            "System;depend on;TensorRT;SYSTEM;LIBRARY\n"
+        )
+        args = ["--only", "make_graph", "--results_format", "sqlite"]
+        self.assertEqual(0, self.main(["--techdoc_path", "previous"] + args))
+        results = pathlib.Path(self.temp).joinpath("results")
+        self.assertEqual(["results.sqlite"], os.listdir(results))
+        # store of previous run is accepted as rebuild source
+        with ResultsStore(results.joinpath("results.sqlite")) as store:
+            store.add_document("doc", [], [SVO(subj="a", verb="b", obj="c")])
+        args[-1] = "text"
+        self.assertEqual(
+            0, self.main(["--techdoc_path", "results", "-o", "rebuilt"] + args)
+        )
+        self.assertIn(
+            "<http://api.stardog.com/a>",
+            pathlib.Path(self.temp).joinpath("rebuilt/graph/doc/doc.ttl").read_text(),
+        )
+
+    def test_rebuild_graph_with_canonical_entities(self):
+        previous = pathlib.Path(self.temp).joinpath("previous/information/doc")
+        previous.mkdir(parents=True)
+        previous.joinpath("doc_svo.txt").write_text(
+            "path planner;use;map;;\nPath planners;use;maps;;\n"
+        )
+        args = ["--only", "make_graph", "--canonical_map", "entities.json"]
+        self.assertEqual(0, self.main(["--techdoc_path", "previous"] + args))
+        content = (
+            pathlib.Path(self.temp).joinpath("results/graph/doc/doc.ttl").read_text()
+        )
+        self.assertEqual(3, len(content.splitlines()))
+        self.assertTrue(pathlib.Path(self.temp).joinpath("entities.json").exists())
+
+    def test_invalid_canonical_map(self):
+        pathlib.Path(self.temp).joinpath("previous").mkdir()
+        pathlib.Path(self.temp).joinpath("entities.json").write_text("[broken")
+        args = ["--only", "make_graph", "--canonical_map", "entities.json"]
+        with mock_logger.MockLogger() as logger:
+            self.assertEqual(1, self.main(["--techdoc_path", "previous"] + args))
+            self.assertTrue(
+                logger.get_messages("ERROR")[0].startswith(
+                    "Invalid canonical map entities.json."
+                )
+            )
+
+    def test_pipelined_upload_errors(self):
+        previous = pathlib.Path(self.temp).joinpath("previous/information/doc")
+        previous.mkdir(parents=True)
+        previous.joinpath("doc_svo.txt").write_text(
+            "System;depend on;TensorRT;SYSTEM;LIBRARY\n"
+        )
+        uploader = mock.MagicMock()
+        uploader.start.return_value = uploader
+        uploader.put.side_effect = UploadError("connection refused")
+        uploader.close.side_effect = UploadError("connection refused")
+        args = ["--only", "make_graph", "upload_graph", "--pipelined_upload"]
+        with mock.patch("src.database.upload.UploadEngine.from_config"), mock.patch(
+            "src.database.upload.BackgroundUploader", return_value=uploader
+        ), mock_logger.MockLogger() as logger:
+            self.assertEqual(
+                0,
+                self.main(["--techdoc_path", "previous", "--db_name", "db"] + args),
+            )
+            errors = logger.get_messages("ERROR")
+        # graph is queued from memory, not re-read from written file
+        content = (
+            pathlib.Path(self.temp).joinpath("results/graph/doc/doc.ttl").read_text()
+        )
+        uploader.put.assert_called_once_with("doc.ttl", content)
+        self.assertEqual(2, len(errors))
+        self.assertTrue(errors[0].startswith("Failed to upload graph of doc to db"))
+        self.assertTrue(errors[1].startswith("Pipelined upload failed."))
@@ -4,7 +4,9 @@ import unittest
 from unittest.mock import patch
 import tempfile
 import pathlib
-from src.application.plugin_executor import execute_plugin
+import io
+
+from src.application.plugin_executor import execute_plugin, execute_plugin_stream
 
 
 class TestTextProcessor(unittest.TestCase):
@@ -49,3 +51,34 @@ class TestTextProcessor(unittest.TestCase):
 
         # Cleanup
         temp_dir.cleanup()
+
+    def test_process_stream(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            script_path = pathlib.Path(temp_dir) / "script.py"
+            output_filepath = pathlib.Path(temp_dir) / "output.txt"
+            script_path.write_text(
+                "import sys\n"
+                "assert sys.argv[1] == '-'\n"
+                "with open(sys.argv[2], 'wb') as fd:\n"
+                "    fd.write(sys.argv[3].encode() + b':' + sys.stdin.buffer.read())\n"
+            )
+
+            execute_plugin_stream(
+                script_path, io.BytesIO(b"content"), "input.pdf", output_filepath
+            )
+
+            self.assertEqual(b"input.pdf:content", output_filepath.read_bytes())
+
+    def test_process_stream_failed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            script_path = pathlib.Path(temp_dir) / "script.py"
+            script_path.write_text("import sys\nsys.exit('broken document')\n")
+
+            with self.assertRaises(RuntimeError) as error:
+                execute_plugin_stream(
+                    script_path,
+                    io.BytesIO(b"x" * 1024 * 1024),
+                    "input.pdf",
+                    pathlib.Path(temp_dir) / "output.txt",
+                )
+            self.assertIn("broken document", str(error.exception))
@@ -0,0 +1,86 @@
+import gzip
+import json
+import pathlib
+import tempfile
+import unittest
+
+from src.database.bulk_export import (
+    MANIFEST,
+    Manifest,
+    ManifestError,
+    bulk_contents,
+    export_shards,
+)
+
+
+def statements(name, count):
+    return "".join(f"<s:{name}{i}> <p:rel> <o:{i}> .\n" for i in range(count))
+
+
+class TestBulkExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = pathlib.Path(self.tmp.name).joinpath("bulk")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_export_shards(self):
+        sources = [
+            ("a.ttl", statements("a", 3)),
+            ("b.ttl", statements("b", 2)),
+            ("corpus.nq", "<s:x> <p:rel> <o:y> <g:doc> .\n"),
+        ]
+
+        manifest = export_shards(sources, self.directory, shard_size=2)
+
+        self.assertEqual(6, manifest.statements)
+        self.assertEqual(
+            ["text/turtle", "text/turtle", "text/turtle", "application/n-quads"],
+            sorted(
+                (shard.content_type for shard in manifest.shards),
+                key=lambda type_: type_ != "text/turtle",
+            ),
+        )
+        self.assertTrue(all(shard.statements <= 2 for shard in manifest.shards))
+        lines = list()
+        for shard in manifest.shards:
+            self.assertTrue(shard.file.endswith((".ttl.gz", ".nq.gz")))
+            with gzip.open(self.directory.joinpath(shard.file), "rt") as fd:
+                lines.extend(fd.readlines())
+        self.assertEqual(6, len(lines))
+        with open(self.directory.joinpath(MANIFEST)) as fd:
+            self.assertEqual(6, json.load(fd)["statements"])
+
+    def test_load_manifest(self):
+        exported = export_shards([("a.ttl", statements("a", 3))], self.directory, 2)
+
+        manifest = Manifest.load(self.directory)
+
+        self.assertEqual(exported.shards, manifest.shards)
+        self.assertEqual("gzip", manifest.compression)
+
+    def test_load_manifest_missing_shard(self):
+        manifest = export_shards([("a.ttl", statements("a", 3))], self.directory, 2)
+        self.directory.joinpath(manifest.shards[0].file).unlink()
+
+        with self.assertRaises(ManifestError):
+            Manifest.load(self.directory)
+
+    def test_load_manifest_missing(self):
+        with self.assertRaises(ManifestError):
+            Manifest.load(self.tmp.name)
+
+    def test_bulk_contents(self):
+        export_shards([("a.ttl", statements("a", 3))], self.directory, 2)
+
+        manifest, contents = bulk_contents(self.directory)
+
+        self.assertEqual(len(manifest.shards), len(contents))
+        self.assertEqual(
+            [(shard.file, "text/turtle", "gzip") for shard in manifest.shards],
+            [
+                (content.name, content.content_type, content.content_encoding)
+                for content in contents
+            ],
+        )
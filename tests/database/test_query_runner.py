@@ -0,0 +1,187 @@
+import logging
+import pathlib
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from src.database.query_runner import QueryError, QueryRunner, paged_query
+
+
+class QueryStandIn(ThreadingHTTPServer):
+    """Stardog query endpoint stand-in answering every query with the same rows"""
+
+    def __init__(self, rows):
+        super().__init__(("127.0.0.1", 0), QueryHandler)
+        self.rows = rows
+        self.size = len(rows)
+        self.commit = "c1"
+        self.queries = list()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/db/size"):
+            return self.reply(200, str(self.server.size).encode())
+        self.reply(404)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        query = parse_qs(body.decode())["query"][0]
+        if "invalid" in query:
+            return self.reply(400)
+        if "urn:skg:commit" in query:
+            return self.reply(200, f"commit\r\n{self.server.commit}\r\n".encode())
+        self.server.queries.append(query)
+        rows = self.server.rows
+        page = re.search(r"LIMIT (\d+) OFFSET (\d+)$", query)
+        if page:
+            limit, offset = map(int, page.groups())
+            rows = rows[offset : offset + limit]
+        delimiter = "\t" if "tab-separated" in self.headers["Accept"] else ","
+        lines = [delimiter.join(("s", "o"))] + [delimiter.join(row) for row in rows]
+        self.reply(200, "".join(line + "\r\n" for line in lines).encode())
+
+
+ROWS = [(f"s{i}", f'"value, {i}"') for i in range(5)]
+
+
+class TestQueryRunner(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("SKG")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, name):
+        with open(self.path.joinpath(name), newline="") as fd:
+            return fd.read().splitlines()
+
+    def test_paged_query(self):
+        query = "PREFIX : <http://x/>\nSELECT ?s { ?s :p ?o } ORDER BY ?s"
+        self.assertEqual(
+            "PREFIX : <http://x/>\nSELECT * WHERE {\nSELECT ?s { ?s :p ?o } ORDER BY ?s\n} "
+            "LIMIT 10 OFFSET 20",
+            paged_query(query, 10, 20),
+        )
+
+    def test_stream_results(self):
+        with QueryStandIn(ROWS) as server, QueryRunner(
+            server.endpoint, "db", logger=self.logger
+        ) as runner:
+            result = runner.run("SELECT * { ?s ?p ?o }", self.path.joinpath("r.csv"))
+        self.assertEqual(5, result.rows)
+        self.assertEqual(6, len(self.read("r.csv")))
+
+    def test_paged_results(self):
+        with QueryStandIn(ROWS) as server, QueryRunner(
+            server.endpoint, "db", logger=self.logger, page_size=2
+        ) as runner:
+            result = runner.run(
+                "SELECT * { ?s ?p ?o }", self.path.joinpath("r.tsv"), "tsv"
+            )
+        self.assertEqual(5, result.rows)
+        self.assertEqual(3, len(server.queries))
+        self.assertEqual(
+            ["s\to"] + ["\t".join(row) for row in ROWS], self.read("r.tsv")
+        )
+
+    def test_cached_until_database_changes(self):
+        cache = self.path.joinpath("cache")
+        with QueryStandIn(ROWS) as server, QueryRunner(
+            server.endpoint, "db", logger=self.logger, cache_dir=cache
+        ) as runner:
+            first = runner.run("SELECT * { ?s ?p ?o }", self.path.joinpath("1.csv"))
+            second = runner.run("SELECT * { ?s ?p ?o }", self.path.joinpath("2.csv"))
+            server.size += 1
+            third = runner.run("SELECT * { ?s ?p ?o }", self.path.joinpath("3.csv"))
+            # statements replaced, same number of statements
+            server.commit = "c2"
+            fourth = runner.run("SELECT * { ?s ?p ?o }", self.path.joinpath("4.csv"))
+        self.assertEqual(
+            (False, True, False, False),
+            (first.cached, second.cached, third.cached, fourth.cached),
+        )
+        self.assertEqual(5, second.rows)
+        self.assertEqual(3, len(server.queries))
+        self.assertEqual(self.read("1.csv"), self.read("2.csv"))
+        # entries cached for previous database states are pruned
+        self.assertEqual(1, len(list(cache.iterdir())))
+
+    def test_cache_expires(self):
+        cache = self.path.joinpath("cache")
+        with QueryStandIn(ROWS) as server, QueryRunner(
+            server.endpoint, "db", logger=self.logger, cache_dir=cache, cache_ttl=0
+        ) as runner:
+            runner.run("SELECT * { ?s ?p ?o }", self.path.joinpath("1.csv"))
+            second = runner.run("SELECT * { ?s ?p ?o }", self.path.joinpath("2.csv"))
+        self.assertFalse(second.cached)
+        self.assertEqual(2, len(server.queries))
+
+    def test_failed_query(self):
+        with QueryStandIn(ROWS) as server, QueryRunner(
+            server.endpoint, "db", logger=self.logger
+        ) as runner:
+            with self.assertRaises(QueryError):
+                runner.run("invalid", self.path.joinpath("r.csv"))
+        self.assertEqual([], list(self.path.iterdir()))
+
+    def test_interrupted_query_leaves_no_partial_file(self):
+        with QueryStandIn(ROWS) as server, QueryRunner(
+            server.endpoint, "db", logger=self.logger
+        ) as runner:
+            for error in (OSError, KeyboardInterrupt):
+
+                def interrupted(query, format_, fd):
+                    fd.write("s,o\r\n")
+                    raise error()
+
+                runner._execute = interrupted
+                with self.assertRaises(error):
+                    runner.run("SELECT * { ?s ?p ?o }", self.path.joinpath("r.csv"))
+                self.assertEqual([], list(self.path.iterdir()))
+
+    def test_run_directory(self):
+        queries = self.path.joinpath("queries")
+        queries.mkdir()
+        for name in ("a", "b", "c"):
+            queries.joinpath(f"{name}.rq").write_text(f"SELECT * {{ ?s :{name} ?o }}")
+        queries.joinpath("d.rq").write_text("invalid")
+        with QueryStandIn(ROWS) as server, QueryRunner(
+            server.endpoint, "db", logger=self.logger
+        ) as runner:
+            results = runner.run_directory(
+                queries, self.path.joinpath("out"), workers=3
+            )
+        self.assertEqual(["a.rq", "b.rq", "c.rq", "d.rq"], sorted(results))
+        self.assertIsInstance(results["d.rq"], QueryError)
+        self.assertEqual(
+            ["a.csv", "b.csv", "c.csv"],
+            sorted(path.name for path in self.path.joinpath("out").iterdir()),
+        )
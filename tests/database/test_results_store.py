@@ -0,0 +1,68 @@
+import pathlib
+import tempfile
+import unittest
+
+from src.database.results_store import ResultsStore
+from src.nlp.triples import SVO, SPO
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.temp.name).joinpath("results.sqlite")
+        self.triples = [
+            SVO(subj="System", verb="use", obj="TensorRT", subj_ner="SYSTEM"),
+            SPO(
+                subj="planner",
+                subj_attrs=["path", "global; fast"],
+                pred="use",
+                obj="map",
+                obj_attrs="occupancy",
+                obj_ner="DATA STRUCTURE",
+            ),
+        ]
+
+    def tearDown(self) -> None:
+        self.temp.cleanup()
+
+    def test_round_trip(self):
+        with ResultsStore(self.path, batch_size=1) as store:
+            self.assertEqual(
+                2,
+                store.add_document(
+                    "doc", [("planner", 2)], self.triples, timings=[{"stage": "svo"}]
+                ),
+            )
+            store.add_document("empty", [("planner", 1)], [])
+        with ResultsStore(self.path) as store:
+            self.assertEqual(["doc", "empty"], store.documents())
+            self.assertEqual([("planner", 2)], store.tfidf("doc"))
+            self.assertEqual(
+                [repr(triple) for triple in self.triples],
+                [repr(triple) for triple in store.triples("doc")],
+            )
+            self.assertEqual(["doc"], [name for name, _ in store.iter_documents()])
+
+    def test_graphs(self):
+        with ResultsStore(self.path) as store:
+            store.add_graph("doc", "<a> <b> <c> .\n", ".ttl")
+            self.assertEqual([("doc", ".ttl", "<a> <b> <c> .\n")], list(store.graphs()))
+            self.assertEqual(["doc"], store.documents())
+
+    def test_replace_document(self):
+        with ResultsStore(self.path) as store:
+            store.add_document("doc", [("planner", 2)], self.triples)
+            store.add_graph("doc", "<a> <b> <c> .\n", ".ttl")
+            store.add_document("doc", [("map", 1)], self.triples[:1])
+            store.add_graph("doc", "<a> <b> <d> .\n", ".ttl")
+        with ResultsStore(self.path) as store:
+            self.assertEqual([("map", 1)], store.tfidf("doc"))
+            self.assertEqual(1, len(store.triples("doc")))
+            self.assertEqual([("doc", ".ttl", "<a> <b> <d> .\n")], list(store.graphs()))
+
+    def test_rollback_journal(self):
+        with ResultsStore(self.path) as store:
+            store.add_document("doc", [("planner", 2)], self.triples)
+            (mode,) = store.connection.execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual("delete", mode)
+        self.assertFalse(self.path.with_name(self.path.name + "-wal").exists())
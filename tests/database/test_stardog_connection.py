@@ -1,6 +1,12 @@
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
-from src.database.stardog_connection import StardogConnection
+from src.database.stardog_connection import (
+    ConnectionPool,
+    PooledSessions,
+    StardogConnection,
+    shared_pool,
+)
 
 
 class MockConfig:
@@ -74,3 +80,107 @@ class TestStardogConnection(unittest.TestCase):
             pass
 
         mock_stardog_connection.return_value.close.assert_called_once()
+
+
+class TestConnectionPool(unittest.TestCase):
+    @patch("stardog.Connection")
+    def test_session_reused(self, mock_stardog_connection):
+        mock_stardog_connection.side_effect = lambda *args: MagicMock()
+        pool = ConnectionPool(MockConfig)
+
+        with StardogConnection(MockConfig, db_name="test_db", pool=pool) as first:
+            pass
+        with StardogConnection(MockConfig, db_name="test_db", pool=pool) as second:
+            pass
+
+        self.assertIs(first, second)
+        mock_stardog_connection.assert_called_once()
+        first.close.assert_not_called()
+        pool.close()
+        first.close.assert_called_once()
+
+    @patch("stardog.Connection")
+    def test_session_discarded_after_error(self, mock_stardog_connection):
+        mock_stardog_connection.side_effect = lambda *args: MagicMock()
+        pool = ConnectionPool(MockConfig)
+
+        with self.assertRaises(RuntimeError):
+            with StardogConnection(MockConfig, db_name="test_db", pool=pool) as first:
+                raise RuntimeError()
+        with StardogConnection(MockConfig, db_name="test_db", pool=pool) as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.close.assert_called_once()
+
+    @patch("stardog.Connection")
+    def test_broken_session_replaced(self, mock_stardog_connection):
+        mock_stardog_connection.side_effect = lambda *args: MagicMock()
+        pool = ConnectionPool(MockConfig, health_check_interval=0)
+        first = pool.acquire("test_db")
+        first.size.side_effect = ConnectionError()
+        pool.release(first, "test_db")
+
+        second = pool.acquire("test_db")
+
+        self.assertIsNot(first, second)
+        first.close.assert_called_once()
+
+    @patch("stardog.Admin")
+    @patch("stardog.Connection")
+    def test_idle_session_evicted_when_full(self, mock_connection, mock_admin):
+        mock_connection.side_effect = lambda *args: MagicMock()
+        mock_admin.side_effect = lambda *args: MagicMock()
+        pool = ConnectionPool(MockConfig, max_size=1)
+        connection = pool.acquire("test_db")
+        pool.release(connection, "test_db")
+
+        admin = pool.acquire(is_admin=True)
+
+        connection.close.assert_called_once()
+        with self.assertRaises(TimeoutError):
+            pool.acquire("test_db", timeout=0.01)
+        pool.release(admin, is_admin=True)
+        pool.close()
+        admin.client.close.assert_called_once()
+
+    @patch("stardog.Connection")
+    def test_health_check_outside_lock(self, mock_stardog_connection):
+        mock_stardog_connection.side_effect = lambda *args: MagicMock()
+        pool = ConnectionPool(MockConfig, max_size=2, health_check_interval=0)
+        checking, resume = threading.Event(), threading.Event()
+        stale = pool.acquire("test_db")
+        stale.size.side_effect = lambda **kwargs: checking.set() or resume.wait(5)
+        pool.release(stale, "test_db")
+        worker = threading.Thread(target=pool.acquire, args=("test_db",))
+        worker.start()
+        self.assertTrue(checking.wait(5))
+
+        other = pool.acquire("other_db", timeout=1)
+
+        resume.set()
+        worker.join()
+        self.assertIsNot(stale, other)
+
+    def test_shared_pool(self):
+        self.assertIs(shared_pool(MockConfig), shared_pool(MockConfig))
+
+
+class TestPooledSessions(unittest.TestCase):
+    @patch("stardog.Connection")
+    def test_sessions_borrowed_from_pool(self, mock_stardog_connection):
+        mock_stardog_connection.side_effect = lambda *args: MagicMock()
+        pool = ConnectionPool(MockConfig, max_size=1)
+        sessions = PooledSessions(pool, "test_db", ("admin", "admin"))
+        borrowed = sessions.get()
+        self.assertIs(borrowed, sessions.get())
+        # pool is full, other thread gets private session instead of waiting
+        private = list()
+        worker = threading.Thread(target=lambda: private.append(sessions.get()))
+        worker.start()
+        worker.join()
+        self.assertIsNot(borrowed, private[0])
+        self.assertEqual(("admin", "admin"), private[0].auth)
+        sessions.close()
+        # connection is returned to pool and reused by next engine
+        self.assertIs(borrowed, PooledSessions(pool, "test_db").get())
@@ -0,0 +1,104 @@
+import pathlib
+import tempfile
+import unittest
+
+from src.database.statement_index import StatementIndex
+from src.database.upload import UploadError
+
+
+def lines(*statements):
+    return "".join(f"<{s}> <p> <o> .\n" for s in statements)
+
+
+def changes(changes_):
+    return sorted(line.split()[0] for lines_ in changes_.values() for line in lines_)
+
+
+class TestStatementIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmp.name).joinpath("index.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def commit(self, sources, prune=False, database="db"):
+        with StatementIndex(self.path, database) as index:
+            delta = index.diff(sources, prune=prune)
+            index.commit()
+        return delta
+
+    def test_first_run_adds_everything(self):
+        delta = self.commit([("a.ttl", lines("x", "y")), ("b.ttl", lines("y", "z"))])
+
+        self.assertEqual(["<x>", "<y>", "<z>"], changes(delta.adds))
+        self.assertEqual({}, delta.removes)
+        self.assertEqual(2, delta.documents)
+
+    def test_unchanged_run_is_empty(self):
+        sources = [("a.ttl", lines("x", "y"))]
+        self.commit(sources)
+
+        delta = self.commit(sources)
+
+        self.assertFalse(delta)
+        self.assertEqual(0, delta.documents)
+
+    def test_changed_document(self):
+        self.commit([("a.ttl", lines("x", "y"))])
+
+        delta = self.commit([("a.ttl", lines("y", "z"))])
+
+        self.assertEqual(["<z>"], changes(delta.adds))
+        self.assertEqual(["<x>"], changes(delta.removes))
+
+    def test_shared_statement_removed_with_last_document(self):
+        self.commit([("a.ttl", lines("x", "s")), ("b.ttl", lines("y", "s"))])
+
+        delta = self.commit([("a.ttl", lines("x"))])
+        self.assertEqual(({}, {}), (delta.adds, delta.removes))
+        delta = self.commit([("b.ttl", lines("y"))])
+        self.assertEqual(["<s>"], changes(delta.removes))
+
+    def test_statement_moved_between_documents(self):
+        self.commit([("a.ttl", lines("x", "m")), ("b.ttl", lines("y"))])
+
+        delta = self.commit([("a.ttl", lines("x")), ("b.ttl", lines("y", "m"))])
+
+        self.assertFalse(delta)
+
+    def test_prune_missing_documents(self):
+        self.commit([("a.ttl", lines("x")), ("b.ttl", lines("y"))])
+
+        delta = self.commit([("a.ttl", lines("x"))], prune=True)
+
+        self.assertEqual(["<y>"], changes(delta.removes))
+        with StatementIndex(self.path, "db") as index:
+            self.assertEqual(["a.ttl"], index.documents())
+
+    def test_rollback_keeps_index(self):
+        self.commit([("a.ttl", lines("x"))])
+        with StatementIndex(self.path, "db") as index:
+            index.diff([("a.ttl", lines("z"))])
+
+        delta = self.commit([("a.ttl", lines("x"))])
+
+        self.assertFalse(delta)
+
+    def test_databases_are_separated(self):
+        self.commit([("a.ttl", lines("x"))])
+
+        delta = self.commit([("a.ttl", lines("x"))], database="other")
+
+        self.assertEqual(["<x>"], changes(delta.adds))
+
+    def test_directives_rejected(self):
+        with StatementIndex(self.path, "db") as index:
+            with self.assertRaises(UploadError):
+                index.diff([("a.ttl", "@prefix : <x#> .\n:a :b :c .\n")])
+            self.assertEqual(0, len(index))
+
+    def test_rollback_journal(self):
+        with StatementIndex(self.path, "db") as index:
+            (mode,) = index._conn.execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual("delete", mode)
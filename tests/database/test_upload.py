@@ -0,0 +1,242 @@
+import gzip
+import io
+import logging
+import threading
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.database.stardog_connection import ConnectionPool
+from src.database.upload import (
+    COMMIT_GRAPH,
+    BackgroundUploader,
+    UploadEngine,
+    UploadError,
+    batches,
+)
+
+
+class StardogStandIn(ThreadingHTTPServer):
+    """Stardog transaction API stand-in keeping committed statements in memory"""
+
+    def __init__(self, fail_adds=0, status=500):
+        super().__init__(("127.0.0.1", 0), TransactionHandler)
+        self.lock = threading.Lock()
+        self.transactions = dict()
+        self.committed = list()
+        self.markers = list()  # committed markers, kept apart from graph statements
+        self.rolled_back = 0
+        self.fail_adds = fail_adds
+        self.status = status
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class TransactionHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        _, database, *path = self.path.split("/")
+        with server.lock:
+            if path == ["transaction", "begin"]:
+                transaction = str(uuid.uuid4())
+                server.transactions[transaction] = list()
+                return self.reply(200, transaction.encode())
+            if len(path) == 2 and path[1].startswith("clear"):
+                server.transactions[path[0]].append(("clear", None))
+                return self.reply(200)
+            if len(path) == 2 and path[1] in ("add", "remove"):
+                if server.fail_adds:
+                    server.fail_adds -= 1
+                    return self.reply(server.status)
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                server.transactions[path[0]].extend(
+                    (path[1], line) for line in body.decode().splitlines()
+                )
+                return self.reply(200)
+            if path[:2] == ["transaction", "commit"]:
+                for operation, line in server.transactions.pop(path[2]):
+                    if operation == "clear":
+                        continue
+                    if COMMIT_GRAPH in line:
+                        server.markers.append(line)
+                    elif operation == "add":
+                        server.committed.append(line)
+                    else:
+                        server.committed.remove(line)
+                return self.reply(200)
+            if path[:2] == ["transaction", "rollback"]:
+                server.transactions.pop(path[2])
+                server.rolled_back += 1
+                return self.reply(200)
+        self.reply(404)
+
+
+def graph(name, statements):
+    return name, "".join(f"<{name}> <p> <o{i}> .\n" for i in range(statements))
+
+
+class TestUpload(unittest.TestCase):
+    def setUp(self) -> None:
+        self.logger = logging.getLogger("SKG")
+
+    def test_batches(self):
+        split = list(
+            batches([graph("a.ttl", 3), graph("b.ttl", 4), graph("c.nq", 1)], 5)
+        )
+        self.assertEqual([5, 2, 1], [batch.statements for batch in split])
+        self.assertEqual(["a.ttl", "b.ttl"], split[0].sources)
+        self.assertEqual("application/n-quads", split[2].content_type)
+        prefixed = list(batches([("d.ttl", "@prefix : <x#> .\n:a :b :c .\n")], 1))
+        self.assertEqual(1, len(prefixed))
+        flushed = list(batches([graph("a.ttl", 1), None, graph("b.ttl", 1)], 5))
+        self.assertEqual([["a.ttl"], ["b.ttl"]], [batch.sources for batch in flushed])
+
+    def test_batches_stream_lines(self):
+        name, content = graph("a.ttl", 5)
+        stream = io.StringIO(content)
+        split = batches([(name, stream)], 2)
+        first = next(split)
+        self.assertEqual(["<a.ttl> <p> <o0> .\n", "<a.ttl> <p> <o1> .\n"], first.lines)
+        # only lines of the first batch are consumed
+        self.assertEqual(len(first.lines[0]) * 2, stream.tell())
+        self.assertEqual([2, 1], [batch.statements for batch in split])
+        with self.assertRaises(UploadError):
+            list(batches([("d.ttl", io.StringIO(":a :b :c .\n@prefix : <x#> .\n"))]))
+
+    def test_concurrent_upload(self):
+        sources = [graph(f"doc{i}.ttl", 25) for i in range(8)]
+        with StardogStandIn() as server, UploadEngine(
+            server.endpoint,
+            "db",
+            "admin",
+            "admin",
+            self.logger,
+            batch_size=10,
+            workers=4,
+        ) as engine:
+            result = engine.upload(iter(sources))
+        self.assertEqual(
+            (20, 200, []), (result.batches, result.statements, result.failed)
+        )
+        self.assertEqual(
+            sorted(line for _, content in sources for line in content.splitlines()),
+            sorted(server.committed),
+        )
+        # marker is replaced once, after all batches are committed
+        self.assertEqual(1, len(server.markers))
+
+    def test_upload_with_pooled_sessions(self):
+        with StardogStandIn() as server:
+            config = type(
+                "Config",
+                (),
+                {
+                    "STARDOG_ENDPOINT": server.endpoint,
+                    "STARDOG_USERNAME": "admin",
+                    "STARDOG_PASSWORD": "admin",
+                },
+            )
+            pool = ConnectionPool(config)
+            engine = UploadEngine.from_config(
+                config, "db", pool=pool, logger=self.logger, batch_size=10, workers=1
+            )
+            with engine:
+                result = engine.upload([graph("doc.ttl", 40)])
+            self.assertEqual((4, 40), (result.batches, result.statements))
+            # connections borrowed by upload worker and commit marker update are back
+            self.assertEqual(2, len(pool._idle[("db", False)]))
+            pool.close()
+
+    def test_retry_with_backoff(self):
+        with StardogStandIn(fail_adds=2) as server, UploadEngine(
+            server.endpoint, "db", logger=self.logger, retries=2, backoff=0.01
+        ) as engine:
+            result = engine.upload([graph("doc.ttl", 3)])
+        self.assertEqual(
+            (1, 3, 2), (result.batches, len(server.committed), server.rolled_back)
+        )
+
+    def test_report_failed_batches(self):
+        with StardogStandIn(fail_adds=1, status=401) as server, UploadEngine(
+            server.endpoint, "db", logger=self.logger, retries=3, backoff=0.01
+        ) as engine:
+            result = engine.upload([graph("doc.ttl", 3)])
+        self.assertEqual(
+            ["doc.ttl"], [source for b in result.failed for source in b.sources]
+        )
+        self.assertEqual([], server.committed)
+
+    def test_report_unsplittable_graph(self):
+        with StardogStandIn() as server, UploadEngine(
+            server.endpoint, "db", logger=self.logger, batch_size=2
+        ) as engine:
+            result = engine.upload(
+                [graph("doc.ttl", 3), ("d.ttl", ":a :b :c .\n@prefix : <x#> .\n")]
+            )
+        # statements batched before the directive are still sent
+        self.assertEqual((2, 4, []), (result.batches, result.statements, result.failed))
+        self.assertEqual(1, len(result.errors))
+        self.assertIn("d.ttl", result.errors[0])
+
+    def test_apply_changes_in_single_transaction(self):
+        with StardogStandIn() as server, UploadEngine(
+            server.endpoint, "db", logger=self.logger, batch_size=2
+        ) as engine:
+            _, content = graph("doc.ttl", 5)
+            lines = content.splitlines(keepends=True)
+            engine.apply({"text/turtle": lines}, {})
+            engine.apply(
+                {"text/turtle": ["<n> <p> <o> .\n"]}, {"text/turtle": lines[:4]}
+            )
+        self.assertEqual(
+            sorted([lines[4].strip(), "<n> <p> <o> ."]), sorted(server.committed)
+        )
+        self.assertEqual({}, server.transactions)
+        self.assertEqual(2, len(set(server.markers)))
+
+    def test_background_upload(self):
+        with StardogStandIn() as server:
+            engine = UploadEngine(
+                server.endpoint, "db", logger=self.logger, batch_size=5
+            )
+            with BackgroundUploader(engine, maxsize=1) as uploader:
+                for i in range(4):
+                    uploader.put(*graph(f"doc{i}.ttl", 3))
+            self.assertEqual(12, uploader.result.statements)
+            self.assertEqual(12, len(server.committed))
+
+    def test_background_upload_stopped(self):
+        def broken():
+            raise RuntimeError("broken")
+            yield
+
+        engine = UploadEngine("http://127.0.0.1:1", "db", logger=self.logger)
+        engine.upload = lambda sources: broken().send(None)
+        uploader = BackgroundUploader(engine).start()
+        uploader.thread.join()
+        with self.assertRaises(UploadError):
+            uploader.put(*graph("doc.ttl", 1))
+        with self.assertRaises(UploadError):
+            uploader.close()
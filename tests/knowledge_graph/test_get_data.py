@@ -0,0 +1,93 @@
+import pathlib
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from src.knowledge_graph.get_data import (
+    IN_FLIGHT_PER_WORKER,
+    find_documents,
+    iter_documents,
+    parse_attrs,
+)
+from src.nlp.results_io import save_results
+from src.nlp.triples import SVO, SPO
+
+
+class TestGetData(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp = tempfile.TemporaryDirectory()
+        self.information = pathlib.Path(self.temp.name)
+        for name in ("first", "second"):
+            doc = self.information.joinpath(name)
+            doc.mkdir()
+            doc.joinpath(f"{name}_svo.txt").write_text(f"System;use;{name};SYSTEM;\n\n")
+            doc.joinpath(f"{name}_spo.txt").write_text(
+                f"planner;use;{name};['path', 'global'];map;;\n"
+            )
+            doc.joinpath(f"{name}_tfidf.txt").write_text("planner: 1\n")
+
+    def tearDown(self) -> None:
+        self.temp.cleanup()
+
+    def test_parse_attrs(self):
+        self.assertEqual(["path", "global"], parse_attrs("['path', 'global']"))
+        self.assertEqual([], parse_attrs("[]"))
+        self.assertEqual("map", parse_attrs("map"))
+        self.assertEqual("[broken", parse_attrs("[broken"))
+
+    def test_find_documents(self):
+        documents = find_documents(self.information)
+        self.assertEqual(["first", "second"], [name for name, _ in documents])
+        self.assertEqual(2, len(documents[0][1]))
+
+    def test_iter_documents(self):
+        for workers in (1, 2):
+            documents = list(iter_documents(self.information, workers=workers))
+            self.assertEqual(["first", "second"], [name for name, _ in documents])
+            name, triples = documents[0]
+            self.assertEqual(
+                [
+                    SPO(subj="planner", pred="use", obj="first"),
+                    SVO(subj="System", verb="use", obj="first"),
+                ],
+                triples,
+            )
+            self.assertEqual(["path", "global"], triples[0].subj_attrs)
+            self.assertEqual("map", triples[0].obj_attrs)
+            self.assertEqual("SYSTEM", triples[1].subj_ner)
+
+    def test_iter_documents_bounded(self):
+        names = [f"doc{i:02d}" for i in range(12)]
+        for name in names:
+            doc = self.information.joinpath(name)
+            doc.mkdir()
+            doc.joinpath(f"{name}_svo.txt").write_text(f"System;use;{name};;\n")
+        submitted = list()
+
+        class CountingExecutor(ThreadPoolExecutor):
+            def submit(self, fn, *args):
+                submitted.append(args)
+                return super().submit(fn, *args)
+
+        with mock.patch(
+            "src.knowledge_graph.get_data.ProcessPoolExecutor", CountingExecutor
+        ):
+            documents = iter_documents(self.information, workers=2)
+            self.assertEqual("doc00", next(documents)[0])
+            self.assertEqual(IN_FLIGHT_PER_WORKER * 2, len(submitted))
+            self.assertEqual(
+                names[1:] + ["first", "second"], [name for name, _ in documents]
+            )
+
+    def test_binary_results(self):
+        doc = self.information.joinpath("third")
+        doc.mkdir()
+        save_results(
+            doc.joinpath("third.tdr"),
+            [("planner", 1)],
+            [SPO(subj="planner", subj_attrs=["path"], pred="use", obj="third")],
+        )
+        name, triples = list(iter_documents(self.information))[-1]
+        self.assertEqual("third", name)
+        self.assertEqual(["path"], triples[0].subj_attrs)
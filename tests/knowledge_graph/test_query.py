@@ -0,0 +1,92 @@
+import contextlib
+import io
+import logging
+import pathlib
+import tempfile
+import unittest
+
+from src.knowledge_graph.main import main
+from src.knowledge_graph.query import (
+    LocalGraph,
+    QuerySyntaxError,
+    expand_term,
+    parse_query,
+)
+from src.knowledge_graph.rdf_writer import RDF_TYPE, write_graph
+from src.nlp.triples import SVO, SPO
+
+PREFIX = "http://api.stardog.com/"
+
+
+class TestLocalGraph(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.temp.name).joinpath("doc.ttl")
+        write_graph(
+            [
+                SVO(subj="planner", verb="use", obj="TensorRT", obj_ner="LIBRARY"),
+                SVO(subj="detector", verb="use", obj="TensorRT"),
+                SVO(subj="detector", verb="use", obj="camera", obj_ner="SENSOR"),
+                SPO(subj="planner", pred="use", obj="map", obj_attrs=["occupancy"]),
+            ],
+            self.path,
+        )
+        self.graph = LocalGraph()
+        self.graph.load(self.temp.name)
+
+    def tearDown(self) -> None:
+        self.temp.cleanup()
+
+    def test_indexes(self):
+        self.assertEqual(
+            {f"<{PREFIX}planner>", f"<{PREFIX}detector>"},
+            {
+                s
+                for s, _, _ in self.graph.match(
+                    None, f"<{PREFIX}use>", f"<{PREFIX}TensorRT>"
+                )
+            },
+        )
+        self.assertEqual(
+            {f"<{PREFIX}LIBRARY>"}, self.graph.types(f"<{PREFIX}TensorRT>")
+        )
+        self.assertEqual(
+            {f"<{PREFIX}camera>"}, self.graph.instances(f"<{PREFIX}SENSOR>")
+        )
+        self.assertEqual(len(self.graph), len(list(self.graph.match())))
+        self.assertEqual(0, self.graph.load(self.path))
+
+    def test_basic_graph_pattern(self):
+        variables, patterns = parse_query(
+            "SELECT ?module WHERE { ?module :use ?library . ?library a :LIBRARY . "
+            '?module :use ?data . ?data rdfs:comment "occupancy" }'
+        )
+        self.assertEqual(["?module"], variables)
+        self.assertEqual(
+            [f"<{PREFIX}planner>"],
+            [solution["?module"] for solution in self.graph.query(patterns)],
+        )
+
+    def test_parse_errors(self):
+        for query in ("?a :use", "?a unknown:use ?b", "SELECT ?a { ?a ?b ?c", ""):
+            with self.assertRaises(QuerySyntaxError, msg=query):
+                parse_query(query)
+        self.assertEqual(RDF_TYPE, expand_term("a"))
+
+    def test_query_command(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            code = main(
+                [
+                    "main.py",
+                    "query",
+                    "--graph",
+                    str(self.path),
+                    "?module :use :TensorRT",
+                ],
+                logging.getLogger("SKG"),
+            )
+        self.assertEqual(0, code)
+        header, *rows = stdout.getvalue().splitlines()
+        self.assertEqual("?module", header)
+        self.assertEqual([f"<{PREFIX}detector>", f"<{PREFIX}planner>"], sorted(rows))
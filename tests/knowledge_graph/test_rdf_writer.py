@@ -0,0 +1,160 @@
+import io
+import pathlib
+import tempfile
+import unittest
+
+from rdflib import ConjunctiveGraph, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+
+from src.knowledge_graph.rdf_writer import (
+    CorpusGraph,
+    IRIMinter,
+    RDF_TYPE,
+    RDFS_SEE_ALSO,
+    statements,
+    write_graph,
+    write_statements,
+    local_name,
+    validate_graph,
+)
+from src.nlp.triples import SVO, SPO
+
+
+class TestRDFWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.triples = [
+            SVO(
+                subj="System",
+                verb="depend on",
+                obj="TensorRT",
+                subj_ner="SYSTEM",
+                obj_ner="LIBRARY",
+            ),
+            SPO(
+                subj="planner",
+                subj_attrs=["path", "global"],
+                pred="create",
+                obj="map",
+                obj_attrs="occupancy grid",
+                obj_ner="DATA STRUCTURE",
+            ),
+        ]
+
+    def test_write_graph(self):
+        expected = Graph().parse(
+            data="""
+            PREFIX : <http://api.stardog.com/>
+            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+            :System :depend_on :TensorRT .
+            :System rdfs:seeAlso <https://dbpedia.org/resource/System> .
+            :TensorRT rdfs:seeAlso <https://dbpedia.org/resource/TensorRT> .
+            :System rdf:type :SYSTEM .
+            :TensorRT rdf:type :LIBRARY .
+            :planner :create :map .
+            :planner rdfs:seeAlso <https://dbpedia.org/resource/Planner> .
+            :map rdfs:seeAlso <https://dbpedia.org/resource/Map> .
+            :map rdf:type :DATA_STRUCTURE .
+            :planner rdfs:comment "path" .
+            :planner rdfs:comment "global" .
+            :map rdfs:comment "occupancy grid" .
+            """,
+            format="turtle",
+        )
+        with tempfile.TemporaryDirectory() as temp:
+            destination = pathlib.Path(temp).joinpath("graph.ttl")
+            count = write_graph(self.triples, destination, validate=True)
+            actual = Graph().parse(str(destination), format="turtle")
+        self.assertEqual(len(expected), count)
+        self.assertTrue(isomorphic(expected, actual))
+
+    def test_entity_description_emitted_once(self):
+        triples = [
+            SVO(subj="System", verb="use", obj=obj, subj_ner="SYSTEM")
+            for obj in ["TensorRT", "CUDA", "TensorRT"]
+        ]
+        minter = IRIMinter()
+        emitted = [s for triple in triples for s in minter.statements(triple)]
+        self.assertEqual(len(set(emitted)), len(emitted))
+        system = "<http://api.stardog.com/System>"
+        self.assertEqual(
+            1,
+            len([s for s in emitted if s[0] == system and s[1] == RDFS_SEE_ALSO]),
+        )
+        self.assertEqual(
+            1, len([s for s in emitted if s[0] == system and s[1] == RDF_TYPE])
+        )
+        # relations: 2, seeAlso: System, TensorRT, CUDA, type: SYSTEM
+        self.assertEqual(6, len(emitted))
+
+    def test_escape_iri_and_literals(self):
+        triple = SPO(
+            subj='the "main" <node>',
+            subj_attrs=['quoted "attr" \\ with\nnewline'],
+            pred="use",
+            obj="C++ {library}",
+        )
+        fd = io.StringIO()
+        write_statements(statements(triple), fd)
+        graph = Graph().parse(data=fd.getvalue(), format="turtle")
+        subject = URIRef(
+            "http://api.stardog.com/the_%22main%22_%3Cnode%3E",
+        )
+        self.assertIn(
+            (
+                subject,
+                URIRef("http://www.w3.org/2000/01/rdf-schema#comment"),
+                Literal('quoted "attr" \\ with\nnewline'),
+            ),
+            graph,
+        )
+        self.assertEqual("C++_%7Blibrary%7D", local_name("C++ {library}"))
+
+    def test_skip_incomplete_triples(self):
+        self.assertEqual([], list(statements(SVO(subj="", verb="use", obj="map"))))
+
+
+class TestCorpusGraph(unittest.TestCase):
+    def setUp(self) -> None:
+        self.documents = {
+            "doc1": [SVO(subj="System", verb="use", obj="TensorRT", subj_ner="SYSTEM")],
+            "doc2": [
+                SVO(subj="System", verb="use", obj="TensorRT", subj_ner="SYSTEM"),
+                SVO(subj="System", verb="use", obj="CUDA", subj_ner="SYSTEM"),
+            ],
+        }
+
+    def test_deduplicate_statements_across_documents(self):
+        with tempfile.TemporaryDirectory() as temp:
+            destination = pathlib.Path(temp).joinpath("corpus.ttl")
+            with CorpusGraph(destination) as corpus:
+                counts = [
+                    corpus.add_document(name, triples)
+                    for name, triples in self.documents.items()
+                ]
+            validate_graph(destination)
+            graph = Graph().parse(str(destination), format="turtle")
+        # doc1: relation, 2x seeAlso, type; doc2: new relation, seeAlso CUDA
+        self.assertEqual([4, 2], counts)
+        self.assertEqual(6, corpus.count)
+        self.assertEqual(6, len(graph))
+
+    def test_provenance_named_graphs(self):
+        with tempfile.TemporaryDirectory() as temp:
+            destination = pathlib.Path(temp).joinpath("corpus.nq")
+            with CorpusGraph(destination, provenance=True) as corpus:
+                for name, triples in self.documents.items():
+                    corpus.add_document(name, triples)
+            validate_graph(destination)
+            graph = ConjunctiveGraph()
+            graph.parse(str(destination), format="nquads")
+        contexts = {
+            str(context.identifier): len(context) for context in graph.contexts()
+        }
+        self.assertEqual(
+            {
+                "http://api.stardog.com/document/doc1": 4,
+                "http://api.stardog.com/document/doc2": 6,
+            },
+            contexts,
+        )
@@ -0,0 +1,101 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.nlp.canonicalization import CanonicalMapError, Canonicalizer, normalize
+from src.nlp.triples import SVO, SPO
+
+
+def fake_vectors(terms):
+    """'planner' and 'planning module' point in the same direction"""
+    table = {
+        "path planner": [1.0, 0.0, 0.0],
+        "path planning module": [0.99, 0.1, 0.0],
+        "path map": [0.0, 1.0, 0.0],
+        "motion planner": [1.0, 0.0, 0.0],
+    }
+    return np.array([table.get(term, [0.0, 0.0, 0.0]) for term in terms])
+
+
+class TestCanonicalization(unittest.TestCase):
+    def test_normalize(self):
+        for term, expected in [
+            ("Path  planners", "path planner"),
+            ("batteries", "battery"),
+            ("process", "process"),
+            ("status", "status"),
+            ("switches", "switch"),
+            ("GPS", "gps"),
+            ("series", "series"),
+            ("time series", "time series"),
+            ("species", "species"),
+            ("analysis", "analysis"),
+            ("news", "news"),
+            # capitalized words are proper nouns, not plurals
+            ("Windows", "windows"),
+            ("Kubernetes", "kubernetes"),
+            # capitalized phrase, acronym head is kept
+            ("Path Planners", "path planner"),
+            ("NVIDIA GPUs", "nvidia gpus"),
+            ("windows", "window"),
+        ]:
+            self.assertEqual(expected, normalize(term), term)
+
+    def test_merge_variants(self):
+        canonicalizer = Canonicalizer()
+        triples = canonicalizer.apply(
+            [
+                SVO(subj="path planner", verb="use", obj="maps"),
+                SPO(subj="Path planner", pred="use", obj="map", obj_attrs=["global"]),
+                SVO(subj="path planners", verb="use", obj="Map"),
+            ]
+        )
+        self.assertEqual({"path planner"}, {triple.subj for triple in triples})
+        self.assertEqual({"maps"}, {triple.obj for triple in triples})
+        self.assertEqual(["global"], triples[1].obj_attrs)
+        self.assertEqual(2, len(set(canonicalizer.mapping.values())))
+
+    def test_proper_noun_not_merged(self):
+        canonicalizer = Canonicalizer()
+        triples = canonicalizer.apply(
+            [
+                SVO(subj="driver", verb="run on", obj="Windows"),
+                SVO(subj="dialog", verb="open", obj="windows"),
+                SVO(subj="dialog", verb="open", obj="window"),
+            ]
+        )
+        self.assertEqual("Windows", triples[0].obj)
+        self.assertEqual(triples[1].obj, triples[2].obj)
+        self.assertNotEqual(triples[0].obj, triples[1].obj)
+
+    def test_similarity_with_blocking(self):
+        canonicalizer = Canonicalizer(vectorize=fake_vectors, threshold=0.9)
+        canonicalizer.update(["path planner", "path map"])
+        canonicalizer.update(["path planning module", "motion planner"])
+        self.assertEqual(
+            "path planner", canonicalizer.canonical("path planning module")
+        )
+        self.assertEqual("path map", canonicalizer.canonical("path map"))
+        # different block, not compared
+        self.assertEqual("motion planner", canonicalizer.canonical("motion planner"))
+
+    def test_persistent_mapping(self):
+        with tempfile.TemporaryDirectory() as temp:
+            path = pathlib.Path(temp).joinpath("entities.json")
+            canonicalizer = Canonicalizer.load(path)
+            canonicalizer.update(["Path planner", "path planners"])
+            canonicalizer.save(path)
+            restored = Canonicalizer.load(path, vectorize=fake_vectors)
+        self.assertEqual(canonicalizer.mapping, restored.mapping)
+        self.assertEqual("Path planner", restored.canonical("PATH PLANNER"))
+        self.assertEqual("Path planner", restored.canonical("path planning module"))
+
+    def test_invalid_mapping_file(self):
+        with tempfile.TemporaryDirectory() as temp:
+            path = pathlib.Path(temp).joinpath("entities.json")
+            for content in ('{"planner": ', '["planner"]', '{"planner": 1}'):
+                path.write_text(content)
+                with self.assertRaises(CanonicalMapError):
+                    Canonicalizer.load(path)
@@ -0,0 +1,212 @@
+import logging
+import pathlib
+import tempfile
+import unittest
+
+import nltk.tokenize
+import spacy
+
+from src.application.common import PIPELINE
+from src.nlp.chunking import sentence_chunks, sentence_spans, text_windows
+from src.nlp.information_extraction import named_entity_recognition
+from src.nlp.triples import SVO
+
+
+def punkt_available() -> bool:
+    try:
+        nltk.tokenize.sent_tokenize("First. Second.")
+        return True
+    except LookupError:
+        return False
+
+
+def entity_ruler():
+    model = spacy.blank("en")
+    ruler = model.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [
+            {"label": "LIBRARY", "pattern": "TensorRT"},
+            {"label": "ALGORITHM", "pattern": [{"LOWER": "fastslam"}]},
+        ]
+    )
+    return model
+
+
+class TestChunking(unittest.TestCase):
+    def setUp(self) -> None:
+        self.text = "First sentence. Second one! Third sentence? Fourth."
+
+    def test_sentence_spans(self):
+        self.assertEqual(
+            ["First sentence.", "Second one!", "Third sentence?", "Fourth."],
+            [self.text[start:end] for start, end in sentence_spans(self.text)],
+        )
+
+    def test_chunks_are_sentence_aligned(self):
+        chunks = list(sentence_chunks(self.text, max_chars=30, overlap=0))
+        self.assertEqual(
+            [
+                ("First sentence. Second one!", 0),
+                ("Third sentence? Fourth.", 28),
+            ],
+            chunks,
+        )
+        for chunk, offset in chunks:
+            self.assertEqual(chunk, self.text[offset : offset + len(chunk)])
+
+    def test_chunks_overlap(self):
+        chunks = [chunk for chunk, _ in sentence_chunks(self.text, 30, overlap=1)]
+        self.assertEqual(
+            [
+                "First sentence. Second one!",
+                "Second one! Third sentence?",
+                "Third sentence? Fourth.",
+            ],
+            chunks,
+        )
+
+    def windows(self, content: str, max_bytes: int):
+        with tempfile.TemporaryDirectory() as temp:
+            path = pathlib.Path(temp).joinpath("decoded.txt")
+            path.write_bytes(content.encode("utf-8"))
+            return list(text_windows(path, max_bytes))
+
+    def test_text_windows_are_sentence_aligned(self):
+        windows = self.windows(self.text, max_bytes=30)
+        self.assertEqual(
+            [("First sentence. Second one!", 0), ("Third sentence? Fourth.", 28)],
+            windows,
+        )
+
+    def test_text_windows_prefer_paragraphs(self):
+        text = "First paragraph. Still first.\n\nSecond paragraph. End."
+        self.assertEqual(
+            ["First paragraph. Still first.", "Second paragraph. End."],
+            [window for window, _ in self.windows(text, max_bytes=40)],
+        )
+
+    def test_text_windows_split_multibyte_text(self):
+        text = "zażółć" * 20
+        windows = self.windows(text, max_bytes=16)
+        self.assertTrue(all(len(window.encode()) <= 16 for window, _ in windows))
+        self.assertEqual(text, "".join(window for window, _ in windows))
+
+    def test_text_windows_empty_file(self):
+        self.assertEqual([], self.windows("", max_bytes=16))
+
+    def test_split_sentence_longer_than_chunk(self):
+        text = "word " * 50
+        chunks = list(sentence_chunks(text.strip(), max_chars=32, overlap=0))
+        self.assertTrue(all(len(chunk) <= 32 for chunk, _ in chunks))
+        self.assertEqual(50, sum(len(chunk.split()) for chunk, _ in chunks))
+
+    def test_empty_text(self):
+        self.assertEqual([], list(sentence_chunks("", 100)))
+
+
+class TestChunkedNER(unittest.TestCase):
+    def test_document_longer_than_model_max_length(self):
+        model = entity_ruler()
+        model.max_length = 200
+        text = " ".join(
+            ["Module dependencies: TensorRT.", "AS use FastSLAM for mapping."] * 100
+        )
+        self.assertEqual(
+            {
+                SVO(
+                    subj="System",
+                    verb="depend on",
+                    obj="TensorRT",
+                    subj_ner="SYSTEM",
+                    obj_ner="LIBRARY",
+                ),
+                SVO(
+                    subj="System",
+                    verb="use",
+                    obj="FastSLAM",
+                    subj_ner="SYSTEM",
+                    obj_ner="ALGORITHM",
+                ),
+            },
+            named_entity_recognition(text, model, chunk_size=1000),
+        )
+
+    def test_entity_cut_at_chunk_boundary(self):
+        class CuttingModel:
+            """labels 'Path planner', cut to 'Path' without sentence following it"""
+
+            max_length = 1000
+            nlp = spacy.blank("en")
+
+            def pipe(self, chunks, as_tuples=True, batch_size=1):
+                for chunk, offset in chunks:
+                    doc = self.nlp(chunk)
+                    start = chunk.index("Path")
+                    end = start + (4 if chunk.endswith("fast.") else 12)
+                    doc.ents = [doc.char_span(start, end, label="ALGORITHM")]
+                    yield doc, offset
+
+        text = "Robot uses map. Path planner runs fast. Other text here."
+        # chunks: 'Robot uses map. Path planner runs fast.' and
+        # 'Path planner runs fast. Other text here.'
+        self.assertEqual(2, len(list(sentence_chunks(text, 40))))
+        self.assertEqual(
+            {
+                SVO(
+                    subj="System",
+                    verb="use",
+                    obj="Path planner",
+                    subj_ner="SYSTEM",
+                    obj_ner="ALGORITHM",
+                )
+            },
+            named_entity_recognition(text, CuttingModel(), chunk_size=40),
+        )
+
+    def test_no_model(self):
+        self.assertEqual(set(), named_entity_recognition("TensorRT", None))
+
+
+@unittest.skipUnless(punkt_available(), "NLTK punkt tokenizer data not installed")
+class TestWindowedExtraction(unittest.TestCase):
+    def setUp(self) -> None:
+        from src.nlp.nlp_job_runner import NLPJobRunner
+
+        self.runner = NLPJobRunner(
+            logging.getLogger("SKG"),
+            tfidf_param=2,
+            pipeline=[
+                PIPELINE.CLEAN,
+                PIPELINE.TFIDF,
+                PIPELINE.TOKENIZE,
+                PIPELINE.CONTENT_FILTERING,
+                PIPELINE.BATCH,
+            ],
+            model="blank:en",
+        )
+        self.text = "\n\n".join(
+            [
+                "Path planner uses occupancy map. Planner computes trajectory of vehicle.",
+                "Camera detects obstacles. Lidar measures distance to obstacles nearby.",
+                "Planner sends trajectory to controller. Controller follows trajectory.",
+            ]
+        )
+
+    def output(self):
+        return (
+            list(self.runner.tfidf),
+            sorted(self.runner.filtered_content),
+            sorted(self.runner.sentences),
+        )
+
+    def test_windowed_equals_single_read(self):
+        self.runner.execute(self.text)
+        single = self.output()
+        with tempfile.TemporaryDirectory() as temp:
+            path = pathlib.Path(temp).joinpath("decoded.txt")
+            path.write_text(self.text, encoding="utf-8")
+            self.assertEqual(3, len(list(text_windows(path, 90))))
+            self.runner.execute_windows(
+                lambda: (window for window, _ in text_windows(path, 90))
+            )
+        self.assertEqual(single, self.output())
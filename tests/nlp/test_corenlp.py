@@ -0,0 +1,52 @@
+import socket
+import time
+import unittest
+
+from nltk.parse.corenlp import CoreNLPParser
+
+from src.nlp.corenlp import check_corenlp, is_corenlp_available
+
+
+class SlowTagger:
+    def __init__(self, url, delay, fail=False):
+        self.url = url
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def api_call(self, data, properties=None, timeout=60):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("server not available")
+        return {}
+
+
+class TestCoreNLPHealthCheck(unittest.TestCase):
+    def test_check_does_not_block_caller(self):
+        tagger = SlowTagger("http://test-non-blocking", delay=0.3)
+        start = time.time()
+        health = check_corenlp(tagger)
+        self.assertLess(time.time() - start, 0.1)
+        self.assertTrue(health.result())
+
+    def test_result_cached_per_server(self):
+        tagger = SlowTagger("http://test-cache", delay=0.0)
+        self.assertTrue(is_corenlp_available(tagger))
+        self.assertTrue(is_corenlp_available(tagger))
+        self.assertEqual(1, tagger.calls)
+
+    def test_unavailable_server(self):
+        tagger = SlowTagger("http://test-unavailable", delay=0.0, fail=True)
+        self.assertFalse(is_corenlp_available(tagger))
+
+    def test_unresponsive_server_respects_timeout(self):
+        # server accepts connections but never responds
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen()
+            port = server.getsockname()[1]
+            tagger = CoreNLPParser(url=f"http://127.0.0.1:{port}", tagtype="pos")
+            start = time.time()
+            self.assertFalse(is_corenlp_available(tagger, timeout=0.2))
+            self.assertLess(time.time() - start, 2.0)
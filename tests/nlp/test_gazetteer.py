@@ -0,0 +1,106 @@
+import pathlib
+import tempfile
+import unittest
+
+import spacy
+
+from src.nlp.gazetteer import Gazetteer
+from src.nlp.information_extraction import named_entity_recognition
+from src.nlp.results_io import save_results
+from src.nlp.triples import SVO
+
+
+class CountingModel:
+    """statistical model stand-in recording processed texts"""
+
+    def __init__(self):
+        self.model = spacy.blank("en")
+        self.model.add_pipe("entity_ruler").add_patterns(
+            [{"label": "SENSOR", "pattern": "Lidar"}]
+        )
+        self.max_length = self.model.max_length
+        self.processed = list()
+
+    def pipe(self, texts, as_tuples=False, batch_size=8):
+        for text, context in texts:
+            self.processed.append(text)
+            yield self.model(text), context
+
+
+class TestGazetteer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.gazetteer = Gazetteer(
+            {"TensorRT": "LIBRARY", "path planner": "AUTONOMOUS VEHICLE MODULE"}
+        )
+
+    def test_match_case_insensitive(self):
+        _, spans = self.gazetteer.match("Path Planner depends on tensorrt")
+        self.assertEqual(
+            [("Path Planner", "AUTONOMOUS VEHICLE MODULE"), ("tensorrt", "LIBRARY")],
+            [(span.text, span.label_) for span in spans],
+        )
+
+    def test_requires_model(self):
+        for sentence, expected in [
+            ("Module depends on TensorRT library", False),
+            ("Module depends on some library", True),  # no hit
+            ("TensorRT library provided by NVIDIA", True),  # capitalized unknown
+        ]:
+            self.assertEqual(
+                expected,
+                Gazetteer.requires_model(*self.gazetteer.match(sentence)),
+                sentence,
+            )
+
+    def test_load_term_list(self):
+        with tempfile.TemporaryDirectory() as temp:
+            terms = pathlib.Path(temp).joinpath("terms.txt")
+            terms.write_text(
+                "# term;label\nTensorRT;LIBRARY\nC++;PROGRAMMING LANGUAGE\n"
+            )
+            gazetteer = Gazetteer.load(terms)
+        self.assertEqual(
+            {"TensorRT": "LIBRARY", "C++": "PROGRAMMING LANGUAGE"}, gazetteer.terms
+        )
+
+    def test_mine_previous_results(self):
+        with tempfile.TemporaryDirectory() as temp:
+            doc = pathlib.Path(temp).joinpath("information/doc")
+            doc.mkdir(parents=True)
+            doc.joinpath("doc_svo.txt").write_text(
+                "System;depend on;TensorRT;SYSTEM;LIBRARY\n"
+                "camera;detect;object;;\n"
+                "System;utilize;GPU;SYSTEM;PROCESSING_UNIT\n"
+            )
+            gazetteer = Gazetteer.load(temp)
+        self.assertEqual(
+            {"TensorRT": "LIBRARY", "GPU": "PROCESSING_UNIT"}, gazetteer.terms
+        )
+
+    def test_statistical_model_gated_by_gazetteer(self):
+        model = CountingModel()
+        text = (
+            "Module depends on TensorRT. "
+            "Path planner depends on TensorRT. "
+            "Perception utilize Lidar sensor."
+        )
+        entities = named_entity_recognition(text, model, gazetteer=self.gazetteer)
+        self.assertEqual(["Perception utilize Lidar sensor."], model.processed)
+        self.assertEqual((2, 1), (self.gazetteer.matched, self.gazetteer.routed))
+        self.assertEqual(
+            {
+                SVO(subj="System", verb="depend on", obj="TensorRT"),
+                SVO(subj="System", verb="utilize", obj="Lidar"),
+            },
+            entities,
+        )
+
+    def test_mine_binary_results(self):
+        with tempfile.TemporaryDirectory() as temp:
+            save_results(
+                pathlib.Path(temp).joinpath("doc.tdr"),
+                [],
+                [SVO(subj="System", verb="use", obj="GPU", obj_ner="PROCESSING_UNIT")],
+            )
+            gazetteer = Gazetteer.load(temp)
+        self.assertEqual({"GPU": "PROCESSING_UNIT"}, gazetteer.terms)
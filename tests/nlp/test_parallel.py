@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+
+import spacy
+
+from src.nlp.parallel import ParallelExtractor, shard, ordered_merge
+from src.nlp.triples import SPO, SVO
+
+
+def fake_spo_extract(text, tagger, ner):
+    subj, pred, obj, ner_ = text.split()
+    if subj == obj:
+        return None
+    return SPO(subj=subj, pred=pred, obj=obj, subj_ner=ner_)
+
+
+class TestParallelExtraction(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sentences = [
+            "camera detect object A",
+            "lidar detect object B",
+            "camera detect object C",  # duplicate, first occurrence wins
+            "planner planner planner D",  # invalid
+            "planner use map E",
+        ] * 10
+
+    def test_shard_preserves_order(self):
+        items = list(range(10))
+        shards = shard(items, 3)
+        self.assertEqual([[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]], shards)
+        self.assertEqual([[0], [1]], shard([0, 1], 8))
+        self.assertEqual([], shard([], 4))
+
+    def test_ordered_merge_first_occurrence_wins(self):
+        merged = ordered_merge(
+            [
+                [SVO(subj="a", verb="b", obj="c", subj_ner="FIRST")],
+                [SVO(subj="a", verb="b", obj="c", subj_ner="SECOND")],
+            ]
+        )
+        self.assertEqual(1, len(merged))
+        self.assertEqual("FIRST", merged.pop().subj_ner)
+
+    @patch("src.nlp.parallel.spo_extract", fake_spo_extract)
+    @patch("src.nlp.information_extraction.spo_extract", fake_spo_extract)
+    def test_parallel_spo_equals_serial(self):
+        serial = ParallelExtractor("model", workers=1).spo(self.sentences, None, None)
+        parallel = ParallelExtractor("model", workers=4, min_sentences=1).spo(
+            self.sentences, None, None
+        )
+        self.assertEqual(3, len(parallel))
+        self.assertEqual(
+            sorted((t.subj, t.pred, t.obj, t.subj_ner) for t in serial),
+            sorted((t.subj, t.pred, t.obj, t.subj_ner) for t in parallel),
+        )
+
+    def test_svo_processes_bounded_separately(self):
+        extractor = ParallelExtractor("model", workers=16, min_sentences=1)
+        self.assertEqual(2, extractor.processes)
+        self.assertFalse(
+            ParallelExtractor("model", 16, 1, processes=1).parallel(self.sentences, 1)
+        )
+
+
+class TestProcessExtraction(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sentences = [
+            "The camera detects obstacles.",
+            "The planner uses the occupancy map.",
+            "The lidar measures distance.",
+        ] * 4
+
+    def test_process_pool_lifecycle(self):
+        # blank model runs workers, initializer and shard merge without trained model
+        extractor = ParallelExtractor("blank:en", processes=2, min_sentences=1)
+        try:
+            self.assertEqual(set(), extractor.svo(self.sentences, None, None))
+            pool = extractor._processes
+            self.assertIsNotNone(pool)
+            extractor.svo(self.sentences, None, None)
+            self.assertIs(pool, extractor._processes)
+        finally:
+            extractor.close()
+        self.assertIsNone(extractor._processes)
+
+    @unittest.skipUnless(
+        spacy.util.is_package("en_core_web_sm"), "en_core_web_sm not installed"
+    )
+    def test_process_svo_equals_serial(self):
+        model = spacy.load("en_core_web_sm")
+        serial = ParallelExtractor("en_core_web_sm", processes=1).svo(
+            self.sentences, model, None
+        )
+        extractor = ParallelExtractor("en_core_web_sm", processes=2, min_sentences=1)
+        try:
+            parallel = extractor.svo(self.sentences, model, None)
+        finally:
+            extractor.close()
+        self.assertEqual(
+            sorted(repr(triple) for triple in serial),
+            sorted(repr(triple) for triple in parallel),
+        )
@@ -0,0 +1,54 @@
+import pathlib
+import tempfile
+import unittest
+
+from src.nlp.results_io import ResultsFormatError, load_results, save_results
+from src.nlp.triples import SVO, SPO
+
+
+class TestResultsIO(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.temp.name).joinpath("doc.tdr")
+        self.tfidf = [("planner", 12), ("żółw", 3)]
+        self.triples = [
+            SVO(subj="System", verb="use", obj="TensorRT", subj_ner="SYSTEM"),
+            SPO(
+                subj="planner",
+                subj_attrs=["path", "global; fast"],
+                pred="use",
+                obj="map",
+                obj_attrs="occupancy",
+                obj_ner="DATA STRUCTURE",
+            ),
+            SVO(subj="System", verb="use", obj="TensorRT"),
+        ]
+
+    def tearDown(self) -> None:
+        self.temp.cleanup()
+
+    def test_round_trip(self):
+        self.assertEqual(2, save_results(self.path, self.tfidf, self.triples))
+        tfidf, store = load_results(self.path)
+        self.assertEqual(self.tfidf, tfidf)
+        self.assertEqual(
+            [repr(triple) for triple in self.triples[:2]],
+            [repr(triple) for triple in store],
+        )
+        self.assertIn(SVO(subj="System", verb="use", obj="TensorRT"), store)
+        store.add(SVO(subj="planner", verb="use", obj="map"))
+        self.assertEqual(3, len(store))
+
+    def test_empty_results(self):
+        save_results(self.path, [], [])
+        tfidf, store = load_results(self.path)
+        self.assertEqual(([], 0), (tfidf, len(store)))
+
+    def test_invalid_file(self):
+        self.path.write_bytes(b"planner;use;map")
+        with self.assertRaises(ResultsFormatError):
+            load_results(self.path)
+        save_results(self.path, self.tfidf, self.triples)
+        self.path.write_bytes(self.path.read_bytes()[:-4])
+        with self.assertRaises(ResultsFormatError):
+            load_results(self.path)
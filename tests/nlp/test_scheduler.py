@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+
+from src.nlp.scheduler import SharedModel, Stage, StageScheduler, SchedulingError
+
+
+class TestStageScheduler(unittest.TestCase):
+    def test_run_stages_in_dependency_order(self):
+        stages = [
+            Stage("sum", lambda a, b: {"c": a + b}, ("a", "b"), ("c",)),
+            Stage("double", lambda x: {"a": 2 * x}, ("x",), ("a",)),
+            Stage("square", lambda x: {"b": x * x}, ("x",), ("b",)),
+        ]
+        scheduler = StageScheduler(stages, max_workers=2)
+        self.assertEqual({"x": 3, "a": 6, "b": 9, "c": 15}, scheduler.run({"x": 3}))
+        self.assertEqual(
+            ["double", "square", "sum"],
+            sorted(timing.stage for timing in scheduler.timings),
+        )
+        self.assertEqual("sum", scheduler.timings[-1].stage)
+
+    def test_independent_stages_overlap(self):
+        barrier = threading.Barrier(2, timeout=2)
+
+        def wait_for_sibling(name):
+            def stage(x):
+                barrier.wait()
+                return {name: x}
+
+            return stage
+
+        stages = [
+            Stage("left", wait_for_sibling("left"), ("x",), ("left",)),
+            Stage("right", wait_for_sibling("right"), ("x",), ("right",)),
+        ]
+        data = StageScheduler(stages, max_workers=2).run({"x": 1})
+        self.assertEqual(1, data["left"])
+        self.assertEqual(1, data["right"])
+
+    def test_stage_timings(self):
+        stages = [Stage("sleep", lambda: time.sleep(0.05) or {}, (), ())]
+        scheduler = StageScheduler(stages)
+        scheduler.run({})
+        self.assertGreaterEqual(scheduler.timings[0].duration, 0.05)
+
+    def test_propagate_stage_error(self):
+        def fail(x):
+            raise RuntimeError("stage failed")
+
+        stages = [
+            Stage("fail", fail, ("x",), ("y",)),
+            Stage("next", lambda y: {"z": y}, ("y",), ("z",)),
+        ]
+        with self.assertRaises(RuntimeError):
+            StageScheduler(stages).run({"x": 1})
+
+    def test_unsatisfied_inputs(self):
+        stages = [
+            Stage("a", lambda b: {"a": b}, ("b",), ("a",)),
+            Stage("b", lambda a: {"b": a}, ("a",), ("b",)),
+        ]
+        with self.assertRaises(SchedulingError):
+            StageScheduler(stages).run({})
+
+    def test_duplicated_output(self):
+        stages = [
+            Stage("a", lambda: {"x": 1}, (), ("x",)),
+            Stage("b", lambda: {"x": 2}, (), ("x",)),
+        ]
+        with self.assertRaises(SchedulingError):
+            StageScheduler(stages)
+
+    def test_missing_output(self):
+        stages = [Stage("a", lambda: {}, (), ("x",))]
+        with self.assertRaises(SchedulingError):
+            StageScheduler(stages).run({})
+
+
+class OverlapDetector:
+    """model stand-in recording whether two calls ever ran at the same time"""
+
+    max_length = 100
+
+    def __init__(self):
+        self.active = 0
+        self.overlapped = False
+        self.lock = threading.Lock()
+
+    def _enter(self):
+        with self.lock:
+            self.active += 1
+            self.overlapped |= self.active > 1
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+
+    def __call__(self, text):
+        self._enter()
+        return text.upper()
+
+    def pipe(self, texts):
+        for text in texts:
+            self._enter()
+            yield text.upper()
+
+
+class TestSharedModel(unittest.TestCase):
+    def test_concurrent_stages_serialize_model_calls(self):
+        model = OverlapDetector()
+        shared = SharedModel(model)
+        stages = [
+            Stage(
+                name,
+                lambda x, name=name: {name: [shared(text) for text in x]},
+                ("x",),
+                (name,),
+            )
+            for name in ("svo", "spo")
+        ] + [Stage("ner", lambda x: {"ner": list(shared.pipe(x))}, ("x",), ("ner",))]
+        data = StageScheduler(stages, max_workers=3).run({"x": ["a", "b", "c"]})
+        self.assertEqual(["A", "B", "C"], data["ner"])
+        self.assertEqual(data["svo"], data["spo"])
+        self.assertFalse(model.overlapped)
+        self.assertEqual(100, shared.max_length)
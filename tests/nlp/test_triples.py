@@ -0,0 +1,80 @@
+import pickle
+import unittest
+
+from src.nlp.triples import SVO, SPO, WordAttr, TripleStore
+
+
+class TestTriples(unittest.TestCase):
+    def test_no_instance_dict(self):
+        for struct in (SVO(), SPO(), WordAttr()):
+            self.assertFalse(hasattr(struct, "__dict__"))
+
+    def test_strings_interned(self):
+        first = SVO(subj="".join(["path", " planner"]), verb="use", obj="map")
+        second = SVO(subj="".join(["path ", "planner"]), verb="use", obj="map")
+        self.assertIs(first.subj, second.subj)
+        spo = SPO(subj="".join(["path ", "planner"]), obj_attrs=["".join(["u", "se"])])
+        self.assertIs(first.subj, spo.subj)
+        self.assertIs(first.verb, spo.obj_attrs[0])
+
+    def test_equality_and_hash(self):
+        self.assertEqual(
+            SVO(subj="a", verb="b", obj="c", subj_ner="X"),
+            SVO(subj="a", verb="b", obj="c"),
+        )
+        self.assertEqual(
+            1, len({SPO(subj="a", pred="b", obj="c"), SPO(subj="a", pred="b", obj="c")})
+        )
+        self.assertEqual(WordAttr("a", ["b"]), WordAttr(word="a", attributes=["b"]))
+        self.assertNotEqual(WordAttr("a", ["b"]), WordAttr("a"))
+
+    def test_repr(self):
+        self.assertEqual(
+            "SVO(subj='a', verb='b', obj='c', subj_ner='', obj_ner='')",
+            repr(SVO("a", "b", "c")),
+        )
+
+    def test_pickle(self):
+        spo = SPO(subj="a", subj_attrs=["x", "y"], pred="b", obj="c", obj_ner="N")
+        restored = pickle.loads(pickle.dumps(spo))
+        self.assertEqual(repr(spo), repr(restored))
+        self.assertIs(spo.subj_attrs[0], restored.subj_attrs[0])
+
+
+class TestTripleStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.triples = [
+            SVO(subj="System", verb="use", obj="TensorRT", subj_ner="SYSTEM"),
+            SPO(
+                subj="planner",
+                subj_attrs=["path"],
+                pred="use",
+                obj="map",
+                obj_attrs="",
+                obj_ner="DATA STRUCTURE",
+            ),
+            SVO(subj="System", verb="use", obj="TensorRT", obj_ner="LIBRARY"),
+            SPO(subj="System", pred="use", obj="TensorRT"),
+        ]
+
+    def test_deduplicate(self):
+        store = TripleStore()
+        self.assertEqual(3, store.extend(self.triples))
+        self.assertEqual(3, len(store))
+        self.assertFalse(store.add(SVO(subj="System", verb="use", obj="TensorRT")))
+        self.assertIn(SPO(subj="planner", pred="use", obj="map"), store)
+        self.assertNotIn(SVO(subj="planner", verb="use", obj="map"), store)
+
+    def test_materialize(self):
+        store = TripleStore()
+        store.extend(self.triples)
+        expected = [self.triples[0], self.triples[1], self.triples[3]]
+        self.assertEqual([repr(t) for t in expected], [repr(t) for t in store])
+        self.assertEqual([repr(self.triples[0])], [repr(t) for t in store.svo()])
+        self.assertEqual(2, len(list(store.spo())))
+
+    def test_shared_string_table(self):
+        store = TripleStore()
+        store.extend(self.triples)
+        # "", System, use, TensorRT, SYSTEM, planner, map, DATA STRUCTURE, path
+        self.assertEqual(9, len(store.strings))
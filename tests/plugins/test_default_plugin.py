@@ -1,3 +1,4 @@
+import io
 import os
 import pathlib
 import unittest
@@ -92,6 +93,14 @@ class TestTextParse(unittest.TestCase):
         self.assertEqual(expected, actual)
         self.assertEqual(-1, self.text_provider.pdf_extractor.head)
 
+    def test_text_provider_read_stream(self) -> None:
+        pdf_ = self.resources.joinpath("dir/sample.pdf")
+        with open(pdf_, "rb") as fd:
+            actual = self.text_provider.get_stream_content(fd, ".pdf")
+        self.assertEqual(self.text_provider.get_file_content(pdf_), actual)
+        with self.assertRaises(NotSupportedDocumentFormat):
+            self.text_provider.get_stream_content(io.BytesIO(b""), ".csv")
+
     def test_text_provider_read_docx(self) -> None:
         word_ = self.resources.joinpath("test_500kB.docx")
         expected = (